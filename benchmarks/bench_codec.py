@@ -0,0 +1,103 @@
+"""
+JSON 编解码性能测试，对比标准库 json、ujson、orjson 及 codec 模块当前使用的实现的解析和序列化速度
+未安装的实现自动跳过，在仓库根目录运行：
+
+    python benchmarks/bench_codec.py [--number 20000] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starbot.utils import codec  # noqa: E402
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+DANMU = {
+    "cmd": "DANMU_MSG",
+    "info": [[0, 1, 25, 16777215, 1700000000000, 0, 0, "", 0, 0, 0, "", 0, "{}", "{}"],
+             "这是一条弹幕", [123456, "用户名", 0, 0, 0, 10000, 1, ""],
+             [21, "粉丝牌", "主播", 1, 6067854, "", 0], [10, 0, 9868950, ">50000"], ["", ""], 0, 0]
+}
+
+USER_CARDS = {
+    "code": 0,
+    "message": "0",
+    "data": [
+        {"mid": uid, "name": f"用户{uid}", "sex": "保密", "face": f"https://i0.hdslb.com/bfs/face/{uid:040d}.jpg",
+         "sign": "个性签名" * 5, "rank": 10000, "level": 6, "silence": 0}
+        for uid in range(10)
+    ]
+}
+
+DYNAMIC = {
+    "code": 0,
+    "data": {
+        "item": {
+            "id_str": "123456789012345678",
+            "modules": {
+                "module_author": {"mid": 1, "name": "UP 主", "pub_ts": 1700000000,
+                                  "face": "https://i0.hdslb.com/bfs/face/1.jpg"},
+                "module_dynamic": {
+                    "desc": {
+                        "text": "动态内容" * 50,
+                        "rich_text_nodes": [{"type": "RICH_TEXT_NODE_TYPE_TEXT", "text": "动态内容" * 5}] * 20
+                    },
+                    "major": {"draw": {"items": [
+                        {"src": f"https://i0.hdslb.com/bfs/new_dyn/{i}.jpg", "width": 1080, "height": 1920}
+                        for i in range(9)
+                    ]}}
+                }
+            }
+        }
+    }
+}
+
+
+def get_backends():
+    """
+    获取已安装的 JSON 实现
+
+    Returns:
+        名称、解析函数和序列化函数组成的元组列表
+    """
+    backends = [("json", json.loads, lambda o: json.dumps(o, ensure_ascii=False))]
+    if ujson is not None:
+        backends.append(("ujson", ujson.loads, lambda o: ujson.dumps(o, ensure_ascii=False)))
+    if orjson is not None:
+        backends.append(("orjson", orjson.loads, lambda o: orjson.dumps(o).decode()))
+    backends.append((f"codec ({codec.BACKEND})", codec.loads, codec.dumps))
+    return backends
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON 编解码性能测试")
+    parser.add_argument("--number", type=int, default=20000, help="每轮执行次数")
+    parser.add_argument("--repeat", type=int, default=5, help="重复轮数")
+    args = parser.parse_args()
+
+    for name, payload in (("DANMU_MSG", DANMU), ("user/cards", USER_CARDS), ("dynamic", DYNAMIC)):
+        data = json.dumps(payload, ensure_ascii=False).encode()
+        print(f"{name} ({len(data)} 字节)")
+        for backend, loads, dumps in get_backends():
+            # 解析字节数据，与直播间数据包和接口响应的使用方式一致
+            load_time = min(timeit.repeat(lambda: loads(data), number=args.number, repeat=args.repeat))
+            dump_time = min(timeit.repeat(lambda: dumps(payload), number=args.number, repeat=args.repeat))
+            print(f"  {backend:<16} loads {args.number / load_time:>12,.0f} 次/秒"
+                  f"  dumps {args.number / dump_time:>12,.0f} 次/秒")
+
+
+if __name__ == "__main__":
+    main()
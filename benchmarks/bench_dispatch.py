@@ -0,0 +1,136 @@
+"""
+AsyncEvent 事件发布性能测试，分别测试无监听器、有监听器、有 __ALL__ 监听器及队列模式下的事件发布吞吐量
+同时测试优化前的事件发布实现作为对照，有监听器时的耗时包括创建任务和执行监听器，需在安装 StarBot 依赖后于仓库根目录运行：
+
+    python benchmarks/bench_dispatch.py [--events 200000] [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import functools
+import os
+import sys
+import time
+from typing import Any, Coroutine, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starbot.utils.AsyncEvent import AsyncEvent  # noqa: E402
+
+
+class BaselineEvent:
+    """
+    优化前的事件发布实现，每次发布均转换事件名，并递归发布 __ALL__ 事件
+    """
+
+    __running_tasks = set()
+
+    def __init__(self):
+        self.__handlers: Dict[str, List[Coroutine]] = {}
+
+    def on(self, event_name: str):
+        def decorator(func: Coroutine):
+            self.__handlers.setdefault(event_name.upper(), []).append(func)
+            return func
+
+        return decorator
+
+    def dispatch(self, name: str, data: Any = None):
+        name = name.upper()
+        if name in self.__handlers:
+            for coroutine in self.__handlers[name]:
+                task = asyncio.create_task(coroutine(data))
+                self.__running_tasks.add(task)
+                task.add_done_callback(lambda t: self.__running_tasks.remove(t))
+
+        if name != '__ALL__':
+            self.dispatch('__ALL__', {
+                "name": name,
+                "data": data
+            })
+
+    def stop_workers(self):
+        pass
+
+
+handled = 0
+
+
+async def handler(_):
+    global handled
+    handled += 1
+
+
+def make_no_listener(cls):
+    event = cls()
+    event.on("LIVE")(handler)
+    return event
+
+
+def make_listener(cls):
+    event = cls()
+    event.on("DANMU_MSG")(handler)
+    return event
+
+
+def make_all_listener(cls):
+    event = cls()
+    event.on("__ALL__")(handler)
+    return event
+
+
+def make_queue(events: int) -> AsyncEvent:
+    # 发布期间不让出事件循环，队列长度需大于发布的事件数量，避免事件被丢弃
+    event = AsyncEvent(events + 1)
+    event.on("DANMU_MSG")(handler)
+    return event
+
+
+async def measure(name: str, factory, events: int, repeat: int, expected: int):
+    """
+    多次发布事件并等待监听器执行完成，输出最快一次的吞吐量
+
+    Args:
+        name: 测试项名称
+        factory: 创建事件实例的函数
+        events: 每次发布的事件数量
+        repeat: 重复次数
+        expected: 每次发布后监听器的执行次数
+    """
+    global handled
+    best = float("inf")
+    for _ in range(repeat):
+        event = factory()
+        handled = 0
+        start = time.perf_counter()
+        for i in range(events):
+            event.dispatch("DANMU_MSG", i)
+            # 与直播间每收到一帧数据发布一次 ALL 事件的方式一致
+            if i % 10 == 0:
+                event.dispatch("ALL", i)
+        # 让出事件循环，直至监听器全部执行完成
+        while handled < expected:
+            await asyncio.sleep(0)
+        best = min(best, time.perf_counter() - start)
+        event.stop_workers()
+    print(f"{name:<24} {events / best:>14,.0f} 事件/秒 {best * 1000:>10.1f} 毫秒")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="AsyncEvent 事件发布性能测试")
+    parser.add_argument("--events", type=int, default=200000, help="每次发布的事件数量")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数")
+    args = parser.parse_args()
+
+    all_events = args.events + (args.events + 9) // 10
+    for label, cls in (("优化前", BaselineEvent), ("当前", AsyncEvent)):
+        await measure(f"{label} 无监听器", functools.partial(make_no_listener, cls), args.events, args.repeat, 0)
+        await measure(f"{label} 有监听器", functools.partial(make_listener, cls), args.events, args.repeat, args.events)
+        await measure(
+            f"{label} __ALL__ 监听器", functools.partial(make_all_listener, cls), args.events, args.repeat, all_events
+        )
+    await measure("当前 队列模式", functools.partial(make_queue, args.events), args.events, args.repeat, args.events)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,148 @@
+"""
+直播间数据包解包性能测试，对比 LiveDanmaku.__unpack 与逐段切片的原始解包方式的吞吐量
+使用构造的弹幕、礼物、进场等通知数据包，以 brotli 压缩为一帧后反复解包，需在安装 StarBot 依赖后于仓库根目录运行：
+
+    python benchmarks/bench_unpack.py [--frames 200] [--packs 50] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import random
+import struct
+import sys
+import time
+
+import brotli
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starbot.core.live import LiveDanmaku  # noqa: E402
+
+HEADER = struct.Struct(">IHHII")
+
+
+def make_notice(cmd: str, data: dict) -> bytes:
+    """
+    构造通知数据包
+
+    Args:
+        cmd: 事件名
+        data: 事件数据
+
+    Returns:
+        带包头的通知数据包
+    """
+    body = json.dumps({"cmd": cmd, "data": data}, ensure_ascii=False).encode()
+    return HEADER.pack(16 + len(body), 16, 0, LiveDanmaku.DATAPACK_TYPE_NOTICE, 1) + body
+
+
+def make_frame(packs: int) -> bytes:
+    """
+    构造一帧 brotli 压缩的数据，包含弹幕、礼物和进场等随机通知数据包
+
+    Args:
+        packs: 数据包数量
+
+    Returns:
+        带包头的压缩数据帧
+    """
+    notices = []
+    for _ in range(packs):
+        uid = random.randint(1, 10 ** 9)
+        kind = random.random()
+        if kind < 0.5:
+            notices.append(make_notice("DANMU_MSG", {
+                "info": [[0, 1, 25, 16777215, int(time.time() * 1000), 0, 0, "", 0, 0, 0, "", 0, "{}", "{}"],
+                         "弹幕内容" * random.randint(1, 5), [uid, f"用户{uid}", 0, 0, 0, 10000, 1, ""],
+                         [21, "粉丝牌", "主播", 1, 6067854, "", 0], [10, 0, 9868950, ">50000"], ["", ""], 0, 0]
+            }))
+        elif kind < 0.7:
+            notices.append(make_notice("SEND_GIFT", {
+                "uid": uid, "uname": f"用户{uid}", "giftName": "小花花", "num": random.randint(1, 10),
+                "price": 100, "coin_type": "gold", "total_coin": 100, "face": "https://i0.hdslb.com/face.jpg"
+            }))
+        else:
+            notices.append(make_notice("INTERACT_WORD", {
+                "uid": uid, "uname": f"用户{uid}", "msg_type": 1, "roomid": 1, "timestamp": int(time.time())
+            }))
+
+    body = brotli.compress(b"".join(notices))
+    return HEADER.pack(16 + len(body), 16, LiveDanmaku.PROTOCOL_VERSION_BROTLI_JSON,
+                       LiveDanmaku.DATAPACK_TYPE_NOTICE, 0) + body
+
+
+def unpack_baseline(data: bytes) -> list:
+    """
+    逐段切片并解码为字符串后解析的原始解包方式，作为对照
+    """
+    ret = []
+    offset = 0
+    header = struct.unpack(">IHHII", data[:16])
+    if header[2] == LiveDanmaku.PROTOCOL_VERSION_BROTLI_JSON:
+        real_data = brotli.decompress(data[16:])
+    else:
+        real_data = data
+
+    while offset < len(real_data):
+        header = struct.unpack(">IHHII", real_data[offset:offset + 16])
+        length = header[0]
+        recv_data = {"protocol_version": header[2], "datapack_type": header[3], "data": None}
+        chunk_data = real_data[(offset + 16):(offset + length)]
+        if header[2] == 0 or header[2] == 2:
+            recv_data["data"] = json.loads(chunk_data.decode())
+        ret.append(recv_data)
+        offset += length
+    return ret
+
+
+def measure(name: str, func, frames: list, packs: int, repeat: int):
+    """
+    多次执行解包并输出最快一次的吞吐量
+
+    Args:
+        name: 测试项名称
+        func: 解包函数
+        frames: 数据帧列表
+        packs: 每帧数据包数量
+        repeat: 重复次数
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for frame in frames:
+            func(frame)
+        best = min(best, time.perf_counter() - start)
+    total = len(frames) * packs
+    print(f"{name:<32} {total / best:>12,.0f} 包/秒 {best * 1000:>10.1f} 毫秒")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="直播间数据包解包性能测试")
+    parser.add_argument("--frames", type=int, default=200, help="数据帧数量")
+    parser.add_argument("--packs", type=int, default=50, help="每帧数据包数量")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数")
+    args = parser.parse_args()
+
+    random.seed(0)
+    frames = [make_frame(args.packs) for _ in range(args.frames)]
+
+    async def handler(_):
+        pass
+
+    # 全部事件均有监听器时，所有数据包都会被解析
+    room_all = LiveDanmaku(1)
+    room_all.on("__ALL__")(handler)
+    # 仅监听弹幕和礼物，支持跳过无监听器的事件时，进场数据包不解析直接丢弃
+    room_partial = LiveDanmaku(1)
+    room_partial.on("DANMU_MSG")(handler)
+    room_partial.on("SEND_GIFT")(handler)
+
+    print(f"{args.frames} 帧, 每帧 {args.packs} 个数据包")
+    measure("baseline (切片 + json)", unpack_baseline, frames, args.packs, args.repeat)
+    measure("__unpack (全部解析)", room_all._LiveDanmaku__unpack, frames, args.packs, args.repeat)
+    measure("__unpack (仅监听弹幕和礼物)", room_partial._LiveDanmaku__unpack, frames, args.packs, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
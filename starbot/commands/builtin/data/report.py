@@ -13,7 +13,7 @@ from loguru import logger
 from ....core.datasource import DataSource
 from ....core.model import PushType
 from ....painter.LiveReportGenerator import LiveReportGenerator
-from ....utils import config, redis
+from ....utils import config, redis, render
 
 prefix = config.get("COMMAND_PREFIX")
 
@@ -58,5 +58,8 @@ async def live_report(app: Ariadne, source: Source, sender: Union[Friend, Group]
             , up.targets
         ))[0]
 
-        base64str = LiveReportGenerator.generate(live_report_param, target.live_report)
+        base64str = await render.run_shared(
+            LiveReportGenerator.get_key(live_report_param, target.live_report),
+            LiveReportGenerator.generate, live_report_param, target.live_report
+        )
         await app.send_message(sender, MessageChain(Image(base64=base64str)))
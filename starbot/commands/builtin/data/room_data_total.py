@@ -13,9 +13,10 @@ from loguru import logger
 
 from ....core.datasource import DataSource
 from ....core.model import PushType
-from ....painter.PicGenerator import PicGenerator, Color
-from ....utils import config, redis
-from ....utils.utils import timestamp_format, get_unames_and_faces_by_uids, mask_round
+from ....painter.DataCardGenerator import DataCardGenerator
+from ....painter.PicGenerator import Color
+from ....utils import config, redis, render
+from ....utils.utils import timestamp_format, get_unames_and_faces_by_uids
 
 prefix = config.get("COMMAND_PREFIX")
 
@@ -53,23 +54,16 @@ async def room_data_total(app: Ariadne, source: Source, sender: Union[Friend, Gr
         if up.room_id is None:
             continue
 
-        width = 1000
-        height = 100000
-        face_size = 100
-
         uname, face = await get_unames_and_faces_by_uids([str(up.uid)])
         uname = uname[0]
         face = face[0]
 
-        pic = PicGenerator(width, height)
-        pic.set_pos(175, 80).draw_rounded_rectangle(0, 0, width, height, 35, Color.WHITE).copy_bottom(35)
-
-        pic.draw_img_alpha(mask_round(face.resize((face_size, face_size)).convert("RGBA")), (50, 50))
-        pic.draw_section(f"{uname} 的直播间总数据").set_pos(50, 150 + pic.row_space)
-        pic.draw_tip(f"UID: {up.uid}   房间号: {up.room_id}")
-        pic.draw_tip(f"数据自主播注册之日起开始累计")
-        pic.draw_tip(f"查询时间: {timestamp_format(int(time.time()), '%Y/%m/%d %H:%M:%S')}")
-        pic.draw_text("")
+        title = f"{uname} 的直播间总数据"
+        lines = []
+        lines.append(("tip", f"UID: {up.uid}   房间号: {up.room_id}"))
+        lines.append(("tip", f"数据自主播注册之日起开始累计"))
+        lines.append(("tip", f"查询时间: {timestamp_format(int(time.time()), '%Y/%m/%d %H:%M:%S')}"))
+        lines.append(("text", ""))
 
         danmu_count = await redis.get_room_danmu_all(up.room_id)
         danmu_person_count = await redis.len_user_danmu_all(up.room_id)
@@ -85,33 +79,35 @@ async def room_data_total(app: Ariadne, source: Source, sender: Union[Friend, Gr
         commander_count = await redis.get_room_commander_all(up.room_id)
         governor_count = await redis.get_room_governor_all(up.room_id)
         guard_person_count = await redis.len_user_guard_all(up.room_id)
-        pic.draw_text(
+        lines.append((
+            "text",
             ["收获弹幕总数: ", str(danmu_count), " 条 (", str(danmu_person_count), " 人)"],
             [Color.BLACK, Color.LINK, Color.BLACK, Color.LINK, Color.BLACK]
-        )
-        pic.draw_text(
+        ))
+        lines.append((
+            "text",
             ["收到盲盒总数: ", str(box_count), " 个 (", str(box_person_count), " 人)"],
             [Color.BLACK, Color.LINK, Color.BLACK, Color.LINK, Color.BLACK]
-        )
-        pic.draw_text(["盲盒总盈亏: ", str(box_profit), " 元"], [Color.BLACK, box_profit_color, Color.BLACK])
-        pic.draw_text(
+        ))
+        lines.append(("text", ["盲盒总盈亏: ", str(box_profit), " 元"], [Color.BLACK, box_profit_color, Color.BLACK]))
+        lines.append((
+            "text",
             ["收获礼物总价值: ", str(gift_profit), " 元 (", str(gift_person_count), " 人)"],
             [Color.BLACK, Color.LINK, Color.BLACK, Color.LINK, Color.BLACK]
-        )
-        pic.draw_text(
+        ))
+        lines.append((
+            "text",
             ["收获 SC (醒目留言) 总价值: ", str(sc_profit), " 元 (", str(sc_person_count), " 人)"],
             [Color.BLACK, Color.LINK, Color.BLACK, Color.LINK, Color.BLACK]
-        )
-        pic.draw_text(
+        ))
+        lines.append((
+            "text",
             ["收获大航海总月数: ", f"舰长×{captain_count}   ", f"提督×{commander_count}   ", f"总督×{governor_count}"],
             [Color.BLACK, Color.DEEPSKYBLUE, Color.FUCHSIA, Color.CRIMSON]
-        )
-        pic.draw_text(["开通大航海总人数: ", str(guard_person_count)], [Color.BLACK, Color.LINK])
+        ))
+        lines.append(("text", ["开通大航海总人数: ", str(guard_person_count)], [Color.BLACK, Color.LINK]))
 
-        # 底部版权信息，请务必保留此处
-        pic.draw_text("")
-        pic.draw_text_right(25, "Designed By StarBot", Color.GRAY)
-        pic.draw_text_right(25, "https://github.com/Starlwr/StarBot", Color.LINK)
-        pic.crop_and_paste_bottom()
+        lines.append(("text", ""))
 
-        await app.send_message(sender, MessageChain(Image(base64=pic.base64())))
+        base64str = await render.run(DataCardGenerator.generate, lines, face, title)
+        await app.send_message(sender, MessageChain(Image(base64=base64str)))
@@ -15,9 +15,8 @@ from loguru import logger
 
 from ....core.datasource import DataSource
 from ....core.model import PushType
-from ....painter.PicGenerator import PicGenerator, Color
 from ....painter.RankingGenerator import RankingGenerator
-from ....utils import config, redis
+from ....utils import config, redis, render
 from ....utils.utils import remove_command_param_placeholder, get_unames_and_faces_by_uids, timestamp_format
 
 prefix = config.get("COMMAND_PREFIX")
@@ -100,30 +99,16 @@ async def ranking_double(app: Ariadne,
         counts = [x[1] for x in data]
         unames, faces = await get_unames_and_faces_by_uids(uids)
 
-        width = 1000
-        height = 100000
-        margin = 50
-        pic = PicGenerator(width, height)
-        pic.set_pos(margin, margin).draw_rounded_rectangle(0, 0, width, height, 35, Color.WHITE).copy_bottom(35)
-
-        pic.draw_section(f"{up.uname} 房间的{type_map[_type][3]}排行")
-        pic.draw_text(f"第 {start + 1} 名 ~ 第 {start + len(uids)} 名   ( 第 {page} 页 / 共 {page_length} 页 )")
-        pic.draw_tip(f"UID: {up.uid}   房间号: {up.room_id}")
-        pic.draw_tip(f"查询时间: {timestamp_format(int(time.time()), '%Y/%m/%d %H:%M:%S')}")
+        title = f"{up.uname} 房间的{type_map[_type][3]}排行"
+        subtitle = f"第 {start + 1} 名 ~ 第 {start + len(uids)} 名   ( 第 {page} 页 / 共 {page_length} 页 )"
+        tips = [
+            f"UID: {up.uid}   房间号: {up.room_id}",
+            f"查询时间: {timestamp_format(int(time.time()), '%Y/%m/%d %H:%M:%S')}"
+        ]
         if page != page_length:
-            pic.draw_tip(f"继续查看下一页请发送 \"{prefix}{type_map[_type][3]}榜 {page + 1}\"")
-        pic.draw_text("")
+            tips.append(f"继续查看下一页请发送 \"{prefix}{type_map[_type][3]}榜 {page + 1}\"")
 
-        pic.draw_img_alpha(
-            RankingGenerator.get_double_ranking(
-                pic.row_space, faces, unames, counts, pic.width - (margin * 2), top_count
-            )
+        base64str = await render.run(
+            RankingGenerator.generate, title, subtitle, tips, faces, unames, counts, top_count, True
         )
-
-        # 底部版权信息，请务必保留此处
-        pic.draw_text("")
-        pic.draw_text_right(25, "Designed By StarBot", Color.GRAY)
-        pic.draw_text_right(25, "https://github.com/Starlwr/StarBot", Color.LINK)
-        pic.crop_and_paste_bottom()
-
-        await app.send_message(sender, MessageChain(Image(base64=pic.base64())))
+        await app.send_message(sender, MessageChain(Image(base64=base64str)))
@@ -1,5 +1,6 @@
 import asyncio
 import json
+import math
 import signal
 import sys
 from json import JSONDecodeError
@@ -11,13 +12,14 @@ from graia.saya import Saya
 from loguru import logger
 
 from .datasource import DataSource
+from .live import HeartbeatScheduler
 from .dynamic import dynamic_spider
 from .server import http_init
 from .user import User, RelationType
 from ..exception import LiveException, ResponseCodeException
 from ..exception.DataSourceException import DataSourceException
 from ..exception.RedisException import RedisException
-from ..utils import redis, config
+from ..utils import redis, config, stats, danmu_cloud, render, profile
 from ..utils.network import request, get_session
 from ..utils.utils import get_credential, get_live_info_by_uids
 
@@ -139,9 +141,9 @@ class StarBot:
         # 获取账号信息
         try:
             response = await request("GET", "https://api.bilibili.com/x/space/v2/myinfo", credential=get_credential())
-            profile = response["profile"]
-            uid = profile["mid"]
-            uname = profile["name"]
+            user_profile = response["profile"]
+            uid = user_profile["mid"]
+            uname = user_profile["name"]
             config.set("LOGIN_UID", uid)
             logger.opt(colors=True).info(f"<green>B 站账号登录成功, UID: <cyan>{uid}</>, 昵称: <cyan>{uname}</></>")
         except ResponseCodeException as ex:
@@ -169,9 +171,12 @@ class StarBot:
         except RedisException as ex:
             logger.error(ex.msg)
             return 5
+        await redis.migrate_user_all()
+        await redis.migrate_user_guard_all()
 
         # 通过 UID 列表批量获取信息
         infos = await get_live_info_by_uids(self.__datasource.get_uid_list())
+        need_reset_rooms = []
         for uid in infos:
             base = infos[uid]
             uid = int(uid)
@@ -186,18 +191,20 @@ class StarBot:
                                          f"{'<green>直播中</>' if status == 1 else '<red>未开播</>'}")
 
             if status == 1 and start_time != await redis.get_live_start_time(up.room_id):
-                await up.accumulate_and_reset_data()
+                need_reset_rooms.append(up.room_id)
 
             await redis.set_live_status(up.room_id, status)
             await redis.set_live_start_time(up.room_id, start_time)
 
+        # 批量累计并重置新开播直播间的上一场直播数据
+        await redis.accumulate_and_reset_data_bulk(need_reset_rooms)
+
         # 连接直播间
+        # 连接速率和同时连接数由直播间连接许可控制，此处无需等待间隔
         async def connect_room_task():
-            interval = config.get("CONNECTION_INTERVAL")
             for u in self.__datasource.get_up_list():
                 try:
-                    if await u.connect():
-                        await asyncio.sleep(interval)
+                    await u.connect()
                 except LiveException as e:
                     logger.error(e.msg)
 
@@ -206,7 +213,9 @@ class StarBot:
             try:
                 wait_time = config.get("WAIT_FOR_ALL_CONNECTION_TIMEOUT")
                 if wait_time == 0:
-                    wait_time = (len(self.__datasource.get_up_list()) + 5) // 5 * 2
+                    rate = config.get("LIVE_CONNECT_RATE")
+                    up_count = len(self.__datasource.get_up_list())
+                    wait_time = math.ceil(up_count / rate) * 2 + 10 if rate > 0 else (up_count + 5) // 5 * 2
                 await asyncio.wait_for(self.__datasource.wait_for_connects(), wait_time)
             except asyncio.exceptions.TimeoutError:
                 logger.warning("等待连接所有直播间超时, 请检查是否存在未连接成功的直播间")
@@ -292,6 +301,8 @@ class StarBot:
             count = int(await redis.zscore(key, 0))
             await redis.zrem(key, 0)
             await redis.hincrby("RoomDanmuTotal", room_id, -count)
+        for key in await redis.keys("UserDanmuAll:*"):
+            await redis.zrem(key, 0)
 
         # 启动消息推送模块
         Ariadne.options["default_account"] = self.__datasource.bots[0].qq
@@ -328,6 +339,9 @@ class StarBot:
         logger.disable("graia.saya")
         logger.disable("launart")
 
+        # 绘图进程需在创建事件循环及其他线程前启动
+        render.start()
+
         bcc = create(Broadcast)
         loop = bcc.loop
         if loop.run_until_complete(self.__main()):
@@ -337,4 +351,11 @@ class StarBot:
         except NotImplementedError:
             pass
         loop.run_forever()
+        if stats.enabled():
+            loop.run_until_complete(stats.close())
+        if danmu_cloud.enabled():
+            loop.run_until_complete(danmu_cloud.close())
+        loop.run_until_complete(profile.close())
+        HeartbeatScheduler.close()
+        render.close()
         loop.close()
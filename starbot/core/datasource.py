@@ -1,6 +1,5 @@
 import abc
 import asyncio
-import json
 from typing import Union, Tuple, List, Dict, Optional
 
 import aiomysql
@@ -12,7 +11,7 @@ from .model import LiveOn, LiveOff, LiveReport, DynamicUpdate, PushTarget, PushT
 from .room import Up
 from .sender import Bot
 from ..exception import LiveException, DataSourceException
-from ..utils import config
+from ..utils import config, codec
 
 
 class DataSource(metaclass=abc.ABCMeta):
@@ -139,13 +138,20 @@ class DataSource(metaclass=abc.ABCMeta):
 
     async def wait_for_connects(self):
         """
-        等待所有 Up 实例连接直播间完毕
+        等待所有 Up 实例连接直播间完毕，连接进度每增加 10% 输出一次
         """
+        total = len(self.__up_list)
+        last_step = -1
         while True:
             await asyncio.sleep(1)
 
-            flags = [u.is_connecting() for u in self.__up_list]
-            if not any(flags):
+            connecting = sum(1 for u in self.__up_list if u.is_connecting())
+            percent = (total - connecting) * 100 // total if total else 100
+            if percent // 10 != last_step:
+                last_step = percent // 10
+                logger.info(f"直播间连接进度: {total - connecting}/{total} ({percent}%)")
+
+            if connecting == 0:
                 break
 
 
@@ -234,7 +240,7 @@ class JsonDataSource(DataSource):
                 raise DataSourceException(f"读取 JSON 文件异常 {ex}")
 
         try:
-            self.__config = json.loads(self.__json_str)
+            self.__config = codec.loads(self.__json_str)
         except Exception:
             raise DataSourceException("提供的 JSON 字符串格式不正确")
 
@@ -5,12 +5,14 @@
 
 import asyncio
 import base64
-import json
 import random
+import re
 import struct
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from typing import List
+from typing import List, NamedTuple, Any, Dict, Optional, Callable, Coroutine, Set
 
 import aiohttp
 import brotli
@@ -18,11 +20,13 @@ from aiohttp.client_ws import ClientWebSocketResponse
 from loguru import logger
 
 from ..exception.LiveException import LiveException
-from ..utils import config, wbi
+from ..exception.ResponseCodeException import ResponseCodeException
+from ..utils import config, wbi, codec, redis
 from ..utils.AsyncEvent import AsyncEvent
 from ..utils.Credential import Credential
 from ..utils.Danmaku import Danmaku
-from ..utils.network import get_session, request
+from ..utils.RateLimiter import RateLimiter
+from ..utils.network import get_session, request, is_rate_limited, is_backlogged
 from ..utils.utils import get_api, get_credential
 
 API = get_api("live")
@@ -94,6 +98,203 @@ class LiveCodec(Enum):
     DEFAULT = '0,1'
 
 
+class DataPack(NamedTuple):
+    """
+    直播间 Websocket 数据包
+    """
+
+    protocol_version: int
+    """协议版本"""
+
+    datapack_type: int
+    """数据包类型"""
+
+    data: Any
+    """数据包内容"""
+
+
+class HeartbeatScheduler:
+    """
+    直播间心跳调度器，使用时间轮统一调度所有直播间连接的心跳发送和超时检测
+    每个连接分配至当前连接数最少的槽位，使心跳均匀分布在心跳间隔内发送
+    时间轮状态绑定创建时的事件循环，在其他事件循环中注册或调用 close 后重新创建
+    """
+
+    INTERVAL = 30
+    """心跳间隔，单位：秒"""
+
+    __wheel: List[Dict[Any, Callable[[], Coroutine]]] = []
+    __slot_of: Dict[Any, int] = {}
+    __position = 0
+    __task: Optional[asyncio.Task] = None
+    __running_tasks: Set[asyncio.Task] = set()
+
+    @classmethod
+    def register(cls, owner: Any, callback: Callable[[], Coroutine]):
+        """
+        注册心跳任务，注册后立即执行一次，此后每个心跳间隔执行一次，重复注册时替换原有心跳任务
+        仅在距当前位置半个至一个心跳间隔的槽位中选择，使注册后第二次执行与首次执行的间隔不超过一个心跳间隔
+
+        Args:
+            owner: 心跳任务所有者
+            callback: 心跳异步函数
+        """
+        if cls.__task is not None and cls.__task.get_loop() is not asyncio.get_running_loop():
+            cls.close()
+        if not cls.__wheel:
+            cls.__wheel = [{} for _ in range(cls.INTERVAL)]
+
+        cls.unregister(owner)
+        candidates = [(cls.__position + i) % cls.INTERVAL for i in range(cls.INTERVAL // 2, cls.INTERVAL + 1)]
+        slot = min(candidates, key=lambda i: len(cls.__wheel[i]))
+        cls.__wheel[slot][owner] = callback
+        cls.__slot_of[owner] = slot
+        cls.__execute(callback)
+
+        if cls.__task is None or cls.__task.done():
+            cls.__task = asyncio.create_task(cls.__run())
+
+    @classmethod
+    def unregister(cls, owner: Any):
+        """
+        移除心跳任务
+
+        Args:
+            owner: 心跳任务所有者
+        """
+        slot = cls.__slot_of.pop(owner, None)
+        if slot is not None:
+            cls.__wheel[slot].pop(owner, None)
+
+    @classmethod
+    def close(cls):
+        """
+        停止时间轮并清空全部心跳任务
+        """
+        if cls.__task is not None:
+            cls.__task.cancel()
+            cls.__task = None
+        for task in list(cls.__running_tasks):
+            task.cancel()
+        cls.__running_tasks = set()
+        cls.__wheel = []
+        cls.__slot_of = {}
+        cls.__position = 0
+
+    @classmethod
+    def __execute(cls, callback: Callable[[], Coroutine]):
+        task = asyncio.create_task(callback())
+        cls.__running_tasks.add(task)
+        task.add_done_callback(cls.__running_tasks.discard)
+
+    @classmethod
+    async def __run(cls):
+        """
+        时间轮主循环，每秒执行一个槽位中的全部心跳任务
+        """
+        while True:
+            await asyncio.sleep(1)
+            cls.__position = (cls.__position + 1) % cls.INTERVAL
+            for callback in list(cls.__wheel[cls.__position].values()):
+                cls.__execute(callback)
+
+
+class ReconnectScheduler:
+    """
+    直播间重连调度器，统一计算所有直播间的重连等待时长，并统计断线后的恢复耗时
+    重连等待时长按指数增长并加入随机抖动，避免网络波动后大量直播间同时重连
+    """
+
+    __down_since: Dict[Any, float] = {}
+    __outage_start = 0.0
+    __outage_rooms = 0
+    __last_outage: Dict[str, float] = {"duration": 0.0, "rooms": 0, "max_recovery": 0.0}
+    __max_recovery = 0.0
+
+    @classmethod
+    def get_delay(cls, attempt: int, base: float) -> float:
+        """
+        计算重连等待时长，在指数增长的等待时长的一半至全部之间随机取值
+
+        Args:
+            attempt: 连续失败次数，从 1 开始
+            base: 首次重连等待时长，单位：秒
+
+        Returns:
+            重连等待时长，单位：秒
+        """
+        delay = min(base * 2 ** min(attempt - 1, 16), config.get("LIVE_RECONNECT_MAX_DELAY"))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    @classmethod
+    def mark_down(cls, owner: Any):
+        """
+        记录连接断开，重复记录时保留首次断开的时间
+
+        Args:
+            owner: 断开的连接
+        """
+        if owner in cls.__down_since:
+            return
+
+        now = time.time()
+        if not cls.__down_since:
+            cls.__outage_start = now
+            cls.__outage_rooms = 0
+            cls.__max_recovery = 0.0
+        cls.__down_since[owner] = now
+        cls.__outage_rooms += 1
+
+    @classmethod
+    def mark_up(cls, owner: Any) -> Optional[float]:
+        """
+        记录连接恢复，所有断开的连接均已恢复时输出本次断线的恢复耗时
+
+        Args:
+            owner: 恢复的连接
+
+        Returns:
+            此连接的恢复耗时，此前未记录断开时返回 None，单位：秒
+        """
+        down_time = cls.__down_since.pop(owner, None)
+        if down_time is None:
+            return None
+
+        now = time.time()
+        recovery = now - down_time
+        cls.__max_recovery = max(cls.__max_recovery, recovery)
+        if not cls.__down_since:
+            cls.__last_outage = {
+                "duration": now - cls.__outage_start, "rooms": cls.__outage_rooms, "max_recovery": cls.__max_recovery
+            }
+            logger.success(f"{cls.__outage_rooms} 个断开的直播间已全部重新连接, 耗时 {now - cls.__outage_start:.1f} 秒")
+        return recovery
+
+    @classmethod
+    def forget(cls, owner: Any):
+        """
+        移除断开记录，用于主动断开的连接
+
+        Args:
+            owner: 连接
+        """
+        cls.__down_since.pop(owner, None)
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        """
+        获取断线恢复统计信息
+
+        Returns:
+            包含当前断开的直播间数、当前断线已持续时长和上一次断线恢复情况的字典
+        """
+        return {
+            "down": len(cls.__down_since),
+            "outage_duration": time.time() - cls.__outage_start if cls.__down_since else 0.0,
+            "last_outage": dict(cls.__last_outage)
+        }
+
+
 class LiveRoom:
     """
     直播类，获取各种直播间的操作均在里边
@@ -653,14 +854,44 @@ class LiveDanmaku(AsyncEvent):
     STATUS_CLOSED = 4
     STATUS_ERROR = 5
 
+    __HEADER = struct.Struct(">IHHII")
+    __VIEW = struct.Struct(">I")
+    __decode_executor: Optional[ThreadPoolExecutor] = None
+    __connect_limiter: Optional[RateLimiter] = None
+
+    __CMD_PATTERN = re.compile(rb'\s*{\s*"cmd"\s*:\s*"([^"\\]*)"')
+
+    EVENT_POLICIES = {
+        "VERIFICATION_SUCCESSFUL": AsyncEvent.POLICY_CRITICAL,
+        "TIMEOUT": AsyncEvent.POLICY_CRITICAL,
+        "LIVE": AsyncEvent.POLICY_DRAIN,
+        "PREPARING": AsyncEvent.POLICY_DRAIN,
+        "DANMU_MSG": AsyncEvent.POLICY_KEEP,
+        "SEND_GIFT": AsyncEvent.POLICY_KEEP,
+        "SUPER_CHAT_MESSAGE": AsyncEvent.POLICY_KEEP,
+        "GUARD_BUY": AsyncEvent.POLICY_KEEP,
+        "VIEW": AsyncEvent.POLICY_COALESCE,
+        "WATCHED_CHANGE": AsyncEvent.POLICY_COALESCE,
+        "ONLINE_RANK_COUNT": AsyncEvent.POLICY_COALESCE,
+        "ONLINE_RANK_V2": AsyncEvent.POLICY_COALESCE,
+        "ROOM_REAL_TIME_MESSAGE_UPDATE": AsyncEvent.POLICY_COALESCE,
+        "LIKE_INFO_V3_UPDATE": AsyncEvent.POLICY_COALESCE
+    }
+    """事件队列模式下各事件的默认处理策略，计入直播数据统计的事件不丢弃，开播和下播事件等待此前的事件处理完成后再处理，未指定的事件队列已满时丢弃"""
+
     def __init__(self, room_display_id: int, credential: Credential = None, retry_after: float = 1):
         """
         Args:
             room_display_id: 房间展示 ID
             credential: 凭据。默认：None
-            retry_after: 连接出错后重试间隔时间（秒）。默认：1
+            retry_after: 连接出错后首次重试间隔时间（秒），此后每次失败翻倍。默认：1
         """
-        super().__init__()
+        super().__init__(
+            config.get("LIVE_EVENT_QUEUE_SIZE"),
+            config.get("LIVE_EVENT_QUEUE_WORKERS"),
+            {**self.EVENT_POLICIES, **config.get("LIVE_EVENT_QUEUE_POLICIES")},
+            hard_limit=config.get("LIVE_EVENT_QUEUE_HARD_LIMIT")
+        )
 
         self.credential = credential if credential is not None else Credential()
         self.room_display_id = room_display_id
@@ -668,10 +899,18 @@ class LiveDanmaku(AsyncEvent):
         self.retry_after = retry_after
         self.__uid = config.get("LOGIN_UID")
         self.__room_real_id = None
+        self.__chat_conf = None
         self.__status = 0
         self.__ws = None
-        self.__tasks = []
-        self.__heartbeat_timer = 60.0
+        self.__heartbeat_time = 0.0
+        self.__heartbeat_waiting = False
+        self.__dropped = Counter()
+        self.__rate_second = 0
+        self.__rate_count = 0
+        self.__rate = 0
+        self.__admitted = False
+        self.__retry_count = 0
+        self.__connected_once = False
         self.err_reason = ""
 
     def get_status(self) -> int:
@@ -683,6 +922,15 @@ class LiveDanmaku(AsyncEvent):
         """
         return self.__status
 
+    def get_dropped_counts(self) -> Dict[str, int]:
+        """
+        获取因无监听器而未解析直接丢弃的数据包数量
+
+        Returns:
+            各 cmd 被丢弃的数据包数量
+        """
+        return dict(self.__dropped)
+
     async def connect(self):
         """
         连接直播间
@@ -696,7 +944,10 @@ class LiveDanmaku(AsyncEvent):
         if self.get_status() == self.STATUS_CLOSING:
             raise LiveException('正在关闭连接, 不可调用')
 
-        await self.__main()
+        try:
+            await self.__main()
+        finally:
+            self.__release_admission()
 
     async def disconnect(self):
         """
@@ -708,12 +959,13 @@ class LiveDanmaku(AsyncEvent):
         self.__status = self.STATUS_CLOSING
         logger.debug(f'正在关闭直播间 {self.room_display_id} 的连接')
 
-        # 取消所有任务
-        while len(self.__tasks) > 0:
-            self.__tasks.pop().cancel()
+        # 取消心跳任务
+        HeartbeatScheduler.unregister(self)
+        ReconnectScheduler.forget(self)
 
         self.__status = self.STATUS_CLOSED
         await self.__ws.close()
+        self.stop_workers()
 
         logger.debug(f'直播间 {self.room_display_id} 的连接已关闭')
 
@@ -724,17 +976,49 @@ class LiveDanmaku(AsyncEvent):
         self.__status = self.STATUS_CONNECTING
 
         room = LiveRoom(self.room_display_id, self.credential)
-        # 获取真实房间号和开播时间
-        logger.debug(f"正在获取直播间 {self.room_display_id} 的真实房间号")
-        info = await room.get_room_play_info()
-        self.__room_real_id = info["room_id"]
-        self.live_time = info["live_time"]
-        logger.debug(f"获取成功, 真实房间号: {self.__room_real_id}")
-
-        # 获取直播服务器配置
-        logger.debug(f"正在获取直播间 {self.room_display_id} 的聊天服务器配置")
-        conf = await room.get_chat_conf_new()
-        logger.debug(f"直播间 {self.room_display_id} 的聊天服务器配置获取成功")
+        # 获取真实房间号和聊天服务器配置，失败后等待重试
+        while True:
+            # 等待连接许可，获取连接信息和建立连接均计入同时连接数
+            await self.__admit()
+            try:
+                # 首次连接时获取真实房间号和开播时间，重新连接时直接使用已获取的真实房间号，开播时间由开播和下播事件更新
+                if self.__room_real_id is None:
+                    logger.debug(f"正在获取直播间 {self.room_display_id} 的真实房间号")
+                    info, error = None, None
+                    try:
+                        info = await room.get_room_play_info()
+                    except Exception as e:
+                        if isinstance(e, ResponseCodeException) and not is_rate_limited(e):
+                            raise
+                        error = e
+
+                    if info is not None:
+                        self.__room_real_id = info["room_id"]
+                        self.live_time = info["live_time"]
+                        await redis.set_room_real_id(
+                            self.room_display_id, self.__room_real_id, config.get("LIVE_ROOM_REAL_ID_CACHE_TTL")
+                        )
+                        logger.debug(f"获取成功, 真实房间号: {self.__room_real_id}")
+                    else:
+                        self.__room_real_id = await redis.get_room_real_id(self.room_display_id)
+                        if self.__room_real_id == 0:
+                            raise error or LiveException('获取直播间信息失败, 可能触发了风控')
+                        logger.warning(f"获取直播间 {self.room_display_id} 的信息失败, 使用缓存的真实房间号: {self.__room_real_id}")
+
+                # 获取直播服务器配置，重新连接时直接使用已获取的配置，配置中的主机均连接失败后再重新获取
+                if self.__chat_conf is None:
+                    self.__chat_conf = await self.__get_chat_conf(room)
+                conf = self.__chat_conf
+                break
+            except Exception as e:
+                logger.warning(f'获取直播间 {self.room_display_id} 的连接信息失败 : {e}')
+                # 接口多次重试后仍未返回数据时，同样视为触发风控
+                rate_limited = is_rate_limited(e) or isinstance(e, LiveException)
+                self.__release_admission(rate_limited)
+                # 除风控外的接口错误码重试无效，直接退出
+                if isinstance(e, ResponseCodeException) and not rate_limited:
+                    raise
+                await self.__wait_for_retry()
 
         # 连接直播间
         logger.debug(f"开始连接直播间 {self.room_display_id}")
@@ -750,15 +1034,43 @@ class LiveDanmaku(AsyncEvent):
             self.err_reason = '心跳响应超时'
             await self.__ws.close()
 
+        # 在循环外注册，避免每次重连重复注册监听器
+        @self.on('VERIFICATION_SUCCESSFUL')
+        async def on_verification_successful(data):
+            """
+            连接成功，注册心跳任务
+            """
+            ws = self.__ws
+            heartbeat = self.__pack(
+                b'[object Object]', self.PROTOCOL_VERSION_HEARTBEAT, self.DATAPACK_TYPE_HEARTBEAT
+            )
+            HeartbeatScheduler.register(self, lambda: self.__heartbeat(ws, heartbeat))
+
         while True:
             self.err_reason = ''
-            # 重置心跳计时器
-            self.__heartbeat_timer = 0
-            if not available_hosts:
-                self.err_reason = '已尝试所有主机但仍无法连接'
-                break
+            # 重置心跳状态
+            self.__heartbeat_time = 0.0
+            self.__heartbeat_waiting = False
+
+            await self.__admit()
 
             if host is None:
+                if not available_hosts:
+                    # 已尝试所有主机，重新获取聊天服务器配置
+                    try:
+                        conf = await self.__get_chat_conf(room, True)
+                        self.__chat_conf = conf
+                        available_hosts = conf["host_list"]
+                    except Exception as e:
+                        logger.warning(f'重新获取直播间 {self.room_display_id} 的聊天服务器配置失败 : {e}')
+                        self.__release_admission(is_rate_limited(e) or isinstance(e, LiveException))
+                        await self.__wait_for_retry()
+                        continue
+                    if not available_hosts:
+                        self.__release_admission()
+                        await self.__wait_for_retry()
+                        continue
+
                 host = available_hosts.pop()
 
             port = host['wss_port']
@@ -777,13 +1089,6 @@ class LiveDanmaku(AsyncEvent):
                     proxy = random.choice(config_proxy)
 
                 async with session.ws_connect(uri, headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.5845.97 Safari/537.36 Core/1.116.462.400 QQBrowser/13.3.6197.400"}, proxy=proxy) as ws:
-                    @self.on('VERIFICATION_SUCCESSFUL')
-                    async def on_verification_successful(data):
-                        """
-                        连接成功，新建心跳任务
-                        """
-                        self.__tasks.append(asyncio.create_task(self.__heartbeat(ws)))
-
                     self.__ws = ws
                     logger.debug(f"连接直播间 {self.room_display_id} 的主机成功, 准备发送认证信息")
                     await self.__send_verify_data(ws, conf['token'])
@@ -814,21 +1119,148 @@ class LiveDanmaku(AsyncEvent):
 
             except Exception as e:
                 logger.warning(f'直播间 {self.room_display_id} 连接失败 : {e}')
+                self.__release_admission(is_rate_limited(e))
+                HeartbeatScheduler.unregister(self)
+                if self.__connected_once:
+                    ReconnectScheduler.mark_down(self)
+
+                # 认证失败时，聊天服务器配置或 WBI 密钥可能已失效，清空主机列表以重新获取
+                if self.err_reason == '认证失败':
+                    wbi.invalidate_wbi_keys()
+                    available_hosts = []
+
+                # 更换主机后重试
+                host = None
+                self.__status = self.STATUS_ERROR
+                await self.__wait_for_retry()
 
-                if len(available_hosts) == 0:
-                    logger.error(f'无法连接直播间 {self.room_display_id} 的服务器')
-                    self.err_reason = '无法连接服务器'
-                    break
+    async def __wait_for_retry(self):
+        """
+        等待重连，等待时长随连续失败次数指数增长
+        """
+        self.__retry_count += 1
+        delay = ReconnectScheduler.get_delay(self.__retry_count, self.retry_after)
+        logger.warning(f'将在 {delay:.1f} 秒后重新连接直播间 {self.room_display_id} ...')
+        await asyncio.sleep(delay)
 
-                logger.warning(f'将在 {self.retry_after} 秒后重新连接直播间 {self.room_display_id} ...')
-                self.__status = self.STATUS_ERROR
-                await asyncio.sleep(self.retry_after)
+    async def __get_chat_conf(self, room: LiveRoom, refresh: bool = False) -> Dict[str, Any]:
+        """
+        获取聊天服务器配置，缓存有效期内直接使用缓存
+
+        Args:
+            room: 直播间实例
+            refresh: 是否忽略缓存重新获取。默认：False
+
+        Returns:
+            聊天服务器配置
+        """
+        if not refresh:
+            conf = await redis.get_live_chat_conf(self.room_display_id)
+            if conf is not None:
+                logger.debug(f"使用直播间 {self.room_display_id} 缓存的聊天服务器配置")
+                return conf
+
+        logger.debug(f"正在获取直播间 {self.room_display_id} 的聊天服务器配置")
+        conf = await room.get_chat_conf_new()
+        if conf is None:
+            raise LiveException('获取聊天服务器配置失败, 可能触发了风控')
+        logger.debug(f"直播间 {self.room_display_id} 的聊天服务器配置获取成功")
+
+        ttl = config.get("LIVE_CHAT_CONF_CACHE_TTL")
+        if ttl > 0:
+            await redis.set_live_chat_conf(self.room_display_id, conf, ttl)
+        else:
+            await redis.delete_live_chat_conf(self.room_display_id)
+
+        return conf
+
+    @classmethod
+    def __get_connect_limiter(cls) -> RateLimiter:
+        if LiveDanmaku.__connect_limiter is None:
+            LiveDanmaku.__connect_limiter = RateLimiter(
+                config.get("LIVE_CONNECT_RATE"), config.get("LIVE_CONNECT_BURST"), config.get("LIVE_CONNECT_CONCURRENCY")
+            )
+        return LiveDanmaku.__connect_limiter
+
+    @classmethod
+    def get_connect_stats(cls) -> Dict[str, Any]:
+        """
+        获取直播间连接许可的统计信息
+
+        Returns:
+            统计信息字典
+        """
+        return cls.__get_connect_limiter().get_stats()
+
+    async def __admit(self):
+        """
+        等待获取连接许可，限制同时进行的连接数和连接速率
+        """
+        if not self.__admitted:
+            await self.__get_connect_limiter().acquire()
+            self.__admitted = True
+
+    def __release_admission(self, rate_limited: bool = False):
+        """
+        释放连接许可
+
+        Args:
+            rate_limited: 是否因触发风控而连接失败，为 True 时降低连接速率。默认：False
+        """
+        if not self.__admitted:
+            return
+        self.__admitted = False
+
+        limiter = self.__get_connect_limiter()
+        limiter.release()
+        if rate_limited:
+            limiter.backoff()
+            logger.warning(f"连接直播间触发风控, 连接速率已降低至每秒 {limiter.get_rate():.2f} 个")
+
+    def __need_offload(self, data: bytes) -> bool:
+        """
+        判断数据包是否需要在线程中解压和解析，数据包较大或直播间热度较高时在线程中处理
+
+        Args:
+            data: 数据
+
+        Returns:
+            是否需要在线程中处理
+        """
+        size_limit = config.get("LIVE_DECODE_THREAD_SIZE")
+        rate_limit = config.get("LIVE_DECODE_THREAD_RATE")
+        return len(data) >= size_limit or 0 < rate_limit <= self.__rate
+
+    def __count_rate(self, count: int):
+        """
+        统计直播间上一秒收到的数据包数量
+
+        Args:
+            count: 本次收到的数据包数量
+        """
+        now = int(time.time())
+        if now != self.__rate_second:
+            self.__rate = self.__rate_count if now - self.__rate_second == 1 else 0
+            self.__rate_second = now
+            self.__rate_count = 0
+        self.__rate_count += count
+
+    @classmethod
+    def __get_decode_executor(cls) -> ThreadPoolExecutor:
+        if LiveDanmaku.__decode_executor is None:
+            LiveDanmaku.__decode_executor = ThreadPoolExecutor(config.get("LIVE_DECODE_THREADS"), "live-decode")
+        return LiveDanmaku.__decode_executor
 
     async def __handle_data(self, data):
         """
-        处理数据
+        处理数据，需在线程中处理的数据包处理完成后才会继续读取此直播间的下一个数据包，保证事件顺序不变
         """
-        data = self.__unpack(data)
+        if self.__need_offload(data):
+            executor = self.__get_decode_executor()
+            data = await asyncio.get_running_loop().run_in_executor(executor, self.__unpack, data)
+        else:
+            data = self.__unpack(data)
+        self.__count_rate(len(data))
         # logger.debug(f"直播间 {self.room_display_id} 收到信息: {data}")
 
         for info in data:
@@ -837,74 +1269,113 @@ class LiveDanmaku(AsyncEvent):
                 'room_real_id': self.__room_real_id
             }
             # 依次处理并调用用户指定函数
-            if info["datapack_type"] == LiveDanmaku.DATAPACK_TYPE_VERIFY_SUCCESS_RESPONSE:
+            if info.datapack_type == LiveDanmaku.DATAPACK_TYPE_VERIFY_SUCCESS_RESPONSE:
                 # 认证反馈
-                if info["data"]["code"] == 0:
+                if info.data["code"] == 0:
                     # 认证成功反馈
                     self.__status = self.STATUS_ESTABLISHED
+                    self.__get_connect_limiter().recover()
+                    self.__release_admission()
+                    self.__retry_count = 0
+                    self.__connected_once = True
+                    recovery = ReconnectScheduler.mark_up(self)
+                    if recovery is not None:
+                        logger.info(f"直播间 {self.room_display_id} 断线 {recovery:.1f} 秒后恢复连接")
                     callback_info['type'] = 'VERIFICATION_SUCCESSFUL'
                     callback_info['data'] = None
                     self.dispatch('VERIFICATION_SUCCESSFUL', callback_info)
                     self.dispatch('ALL', callback_info)
+                else:
+                    # 认证失败，断开连接后重新获取认证信息
+                    logger.warning(f"直播间 {self.room_display_id} 认证失败: {info.data}")
+                    self.err_reason = '认证失败'
+                    await self.__ws.close()
 
-            elif info["datapack_type"] == LiveDanmaku.DATAPACK_TYPE_HEARTBEAT_RESPONSE:
+            elif info.datapack_type == LiveDanmaku.DATAPACK_TYPE_HEARTBEAT_RESPONSE:
                 # 心跳包反馈，返回直播间人气
                 # logger.debug(f"直播间 {self.room_display_id} 收到心跳包反馈")
-                # 重置心跳计时器
-                self.__heartbeat_timer = 30.0
+                # 重置心跳状态
+                self.__heartbeat_waiting = False
                 callback_info["type"] = 'VIEW'
-                callback_info["data"] = info["data"]["view"]
+                callback_info["data"] = info.data["view"]
                 self.dispatch('VIEW', callback_info)
                 self.dispatch('ALL', callback_info)
 
-            elif info["datapack_type"] == LiveDanmaku.DATAPACK_TYPE_NOTICE:
+            elif info.datapack_type == LiveDanmaku.DATAPACK_TYPE_NOTICE:
                 # 直播间弹幕、礼物等信息
-                if "cmd" not in info["data"]:
+                if "cmd" not in info.data:
                     continue
 
-                callback_info["type"] = info["data"]["cmd"]
+                callback_info["type"] = info.data["cmd"]
 
                 # DANMU_MSG 事件名特殊：DANMU_MSG:4:0:2:2:2:0，需取出事件名，暂不知格式
                 if callback_info["type"].find('DANMU_MSG') > -1:
                     callback_info["type"] = 'DANMU_MSG'
-                    info["data"]["cmd"] = 'DANMU_MSG'
+                    info.data["cmd"] = 'DANMU_MSG'
+
+                # 开播和下播时更新开播时间，重新连接时不再重新获取
+                if callback_info["type"] == 'LIVE':
+                    self.live_time = info.data.get("live_time", int(time.time()))
+                elif callback_info["type"] == 'PREPARING':
+                    self.live_time = 0
 
-                callback_info["data"] = info["data"]
+                callback_info["data"] = info.data
                 self.dispatch(callback_info["type"], callback_info)
                 self.dispatch('ALL', callback_info)
 
             else:
                 logger.warning(f"直播间 {self.room_display_id} 检测到未知的数据包类型, 无法处理")
 
+        # 事件队列已满时暂停读取数据，等待队列中的事件处理后再继续
+        await self.wait_for_queue()
+
     async def __send_verify_data(self, ws: ClientWebSocketResponse, token: str):
         # uid = config.get("LOGIN_UID")
         verify_data = {"uid": self.__uid, "roomid": self.__room_real_id, "protover": 3,
                        "buvid": config.get("BUVID3"), "platform": "web", "type": 2, "key": token}
-        data = json.dumps(verify_data).encode()
+        data = codec.dumps(verify_data).encode()
         await self.__send(data, self.PROTOCOL_VERSION_HEARTBEAT, self.DATAPACK_TYPE_VERIFY, ws)
 
-    async def __heartbeat(self, ws: ClientWebSocketResponse):
-        """
-        定时发送心跳包
+    async def __heartbeat(self, ws: ClientWebSocketResponse, heartbeat: bytes):
         """
-        heartbeat = self.__pack(b'[object Object]', self.PROTOCOL_VERSION_HEARTBEAT, self.DATAPACK_TYPE_HEARTBEAT)
-        heartbeat_url = "https://live-trace.bilibili.com/xlive/rdata-interface/v1/heartbeat/webHeartBeat?pf=web&hb="
-        hb = str(base64.b64encode(f"60|{self.room_display_id}|1|0".encode("utf-8")), "utf-8")
-        while True:
-            if self.__heartbeat_timer == 0:
-                # logger.debug(f"直播间 {self.room_display_id} 发送心跳包")
-                await ws.send_bytes(heartbeat)
-                try:
-                    await request("GET", heartbeat_url, {"hb": hb, "pf": "web"}, credential=get_credential())
-                except Exception as ex:
-                    pass
-            elif self.__heartbeat_timer <= -30:
-                # 视为已异常断开连接，发布 TIMEOUT 事件
-                self.dispatch('TIMEOUT')
-                break
+        发送心跳包，由心跳调度器每个心跳间隔调用一次，上次发送的心跳包未收到响应时视为已异常断开连接
 
-            await asyncio.sleep(1.0)
-            self.__heartbeat_timer -= 1
+        Args:
+            ws: Websocket 连接
+            heartbeat: 心跳包数据
+        """
+        # 距离上次发送心跳包时间过短时跳过，避免重复注册等情况下连续发送心跳包时误判超时
+        now = time.monotonic()
+        if now - self.__heartbeat_time < HeartbeatScheduler.INTERVAL / 4:
+            return
+
+        if ws.closed:
+            HeartbeatScheduler.unregister(self)
+            return
+
+        if self.__heartbeat_waiting:
+            # 视为已异常断开连接，发布 TIMEOUT 事件
+            HeartbeatScheduler.unregister(self)
+            self.dispatch('TIMEOUT')
+            return
+
+        self.__heartbeat_time = now
+        self.__heartbeat_waiting = True
+        try:
+            await ws.send_bytes(heartbeat)
+        except Exception:
+            return
+
+        if config.get("LIVE_WEB_HEARTBEAT"):
+            heartbeat_url = "https://live-trace.bilibili.com/xlive/rdata-interface/v1/heartbeat/webHeartBeat?pf=web&hb="
+            # 网页端观看心跳可丢弃，请求积压时跳过，避免心跳任务堆积
+            if is_backlogged(heartbeat_url):
+                return
+            hb = str(base64.b64encode(f"60|{self.room_display_id}|1|0".encode("utf-8")), "utf-8")
+            try:
+                await request("GET", heartbeat_url, {"hb": hb, "pf": "web"}, credential=get_credential())
+            except Exception:
+                pass
 
     async def __send(self, data: bytes, protocol_version: int,
                      datapack_type: int, ws: ClientWebSocketResponse):
@@ -931,54 +1402,73 @@ class LiveDanmaku(AsyncEvent):
         send_data = struct.pack(">I", len(send_data) + 4) + send_data
         return bytes(send_data)
 
-    @staticmethod
-    def __unpack(data: bytes):
+    def __need_parse(self, data: bytes, start: int, end: int) -> bool:
+        """
+        不解析 JSON，直接从数据包开头提取 cmd 字段，判断数据包是否存在监听器需要解析
+        无监听器的数据包会被丢弃并计数，无法提取 cmd 字段时视为需要解析
+
+        Args:
+            data: 数据
+            start: 数据包内容起始位置
+            end: 数据包内容结束位置
+
+        Returns:
+            是否需要解析
         """
-        解包数据
+        match = self.__CMD_PATTERN.match(data, start, end)
+        if match is None:
+            return True
+
+        cmd = match.group(1).decode(errors="ignore")
+        if cmd.find('DANMU_MSG') > -1:
+            cmd = 'DANMU_MSG'
+        if self.has_listener(cmd) or self.has_listener('ALL'):
+            return True
+
+        self.__dropped[cmd] += 1
+        return False
+
+    def __unpack(self, data: bytes) -> List[DataPack]:
+        """
+        解包数据，使用 memoryview 遍历数据包，避免切片产生的多次拷贝，无监听器的通知数据包不进行解析
         """
         ret = []
-        offset = 0
-        header = struct.unpack(">IHHII", data[:16])
+        header = LiveDanmaku.__HEADER.unpack_from(data)
         if header[2] == LiveDanmaku.PROTOCOL_VERSION_BROTLI_JSON:
-            real_data = brotli.decompress(data[16:])
+            real_data = brotli.decompress(memoryview(data)[16:])
         else:
             real_data = data
 
         if header[2] == LiveDanmaku.PROTOCOL_VERSION_HEARTBEAT and \
                 header[3] == LiveDanmaku.DATAPACK_TYPE_HEARTBEAT_RESPONSE:
-            real_data = real_data[16:]
             # 心跳包协议特殊处理
-            recv_data = {
-                "protocol_version": header[2],
-                "datapack_type": header[3],
-                "data": {
-                    "view": struct.unpack('>I', real_data[0:4])[0]
-                }
-            }
-            ret.append(recv_data)
+            ret.append(DataPack(header[2], header[3], {"view": LiveDanmaku.__VIEW.unpack_from(real_data, 16)[0]}))
             return ret
 
-        while offset < len(real_data):
-            header = struct.unpack(">IHHII", real_data[offset:offset + 16])
-            length = header[0]
-            recv_data = {
-                "protocol_version": header[2],
-                "datapack_type": header[3],
-                "data": None
-            }
-            chunk_data = real_data[(offset + 16):(offset + length)]
-            if header[2] == 0:
-                recv_data["data"] = json.loads(chunk_data.decode())
-            elif header[2] == 2:
-                recv_data["data"] = json.loads(chunk_data.decode())
-            elif header[2] == 1:
-                if header[3] == LiveDanmaku.DATAPACK_TYPE_HEARTBEAT_RESPONSE:
-                    recv_data["data"] = {
-                        "view": struct.unpack(">I", chunk_data)[0]}
-                elif header[3] == LiveDanmaku.DATAPACK_TYPE_VERIFY_SUCCESS_RESPONSE:
-                    recv_data["data"] = json.loads(chunk_data.decode())
-            ret.append(recv_data)
+        view = memoryview(real_data)
+        offset = 0
+        while offset < len(view):
+            length, _, protocol_version, datapack_type, _ = LiveDanmaku.__HEADER.unpack_from(view, offset)
+            if length < 16:
+                logger.warning("检测到长度异常的数据包, 已丢弃剩余数据")
+                break
+
+            if datapack_type == LiveDanmaku.DATAPACK_TYPE_NOTICE and \
+                    not self.__need_parse(real_data, offset + 16, offset + length):
+                offset += length
+                continue
+
+            data = None
+            if protocol_version == 0 or protocol_version == 2:
+                data = codec.loads(view[offset + 16:offset + length])
+            elif protocol_version == 1:
+                if datapack_type == LiveDanmaku.DATAPACK_TYPE_HEARTBEAT_RESPONSE:
+                    data = {"view": LiveDanmaku.__VIEW.unpack_from(view, offset + 16)[0]}
+                elif datapack_type == LiveDanmaku.DATAPACK_TYPE_VERIFY_SUCCESS_RESPONSE:
+                    data = codec.loads(view[offset + 16:offset + length])
+            ret.append(DataPack(protocol_version, datapack_type, data))
             offset += length
+        view.release()
         return ret
 
 
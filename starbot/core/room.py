@@ -13,7 +13,7 @@ from .model import PushTarget
 from .user import User
 from ..exception import LiveException, ResponseCodeException
 from ..painter.DynamicPicGenerator import DynamicPicGenerator
-from ..utils import config, redis
+from ..utils import config, redis, stats, danmu_cloud
 from ..utils.network import request
 from ..utils.utils import get_credential, timestamp_format, get_unames_and_faces_by_uids
 
@@ -81,8 +81,12 @@ class Up(BaseModel):
         self.__bot = bot
 
     async def accumulate_and_reset_data(self):
-        await redis.accumulate_data(self.room_id)
-        await redis.reset_data(self.room_id)
+        # 缓冲中的统计数据与累计和重置在同一事务中写入，写入失败时不重置并重试，避免本场直播的数据计入下一场直播
+        for _ in range(3):
+            if await danmu_cloud.flush(self.room_id) and await stats.flush(self.room_id, True):
+                return
+            await asyncio.sleep(config.get("STATS_FLUSH_INTERVAL") / 1000)
+        logger.error(f"直播间 {self.room_id} 的统计数据多次写入失败, 未累计和重置本场直播数据")
 
     def is_connecting(self):
         return (self.__room is not None) and (self.__room.get_status() != 2)
@@ -301,14 +305,24 @@ class Up(BaseModel):
                 uid = base[2][0]
                 content = base[1]
 
+                # 弹幕词云所需弹幕记录，开启流式统计时直接交给切词模块
+                is_text = isinstance(base[0][13], str)
+                if is_text and danmu_cloud.enabled():
+                    danmu_cloud.add(self.room_id, content)
+                record_content = is_text and not danmu_cloud.enabled()
+
+                if stats.enabled():
+                    stats.record_danmu(self.room_id, uid, is_text, content if record_content else None)
+                    return
+
                 # 弹幕统计
                 await redis.incr_room_danmu_count(self.room_id)
                 if uid != 0:
                     await redis.incr_user_danmu_count(self.room_id, uid)
 
-                # 弹幕词云所需弹幕记录
-                if isinstance(base[0][13], str):
+                if record_content:
                     await redis.add_room_danmu(self.room_id, content)
+                if is_text:
                     await redis.incr_room_danmu_time(self.room_id, int(time.time()))
 
         gift_items = [
@@ -334,10 +348,13 @@ class Up(BaseModel):
 
                 # 礼物统计
                 if base["total_coin"] != 0 and base["discount_price"] != 0:
-                    await redis.incr_room_gift_profit(self.room_id, price)
-                    await redis.incr_user_gift_profit(self.room_id, uid, price)
+                    if stats.enabled():
+                        stats.record_gift(self.room_id, uid, price)
+                    else:
+                        await redis.incr_room_gift_profit(self.room_id, price)
+                        await redis.incr_user_gift_profit(self.room_id, uid, price)
 
-                    await redis.incr_room_gift_time(self.room_id, int(time.time()), price)
+                        await redis.incr_room_gift_time(self.room_id, int(time.time()), price)
 
                 # 盲盒统计
                 if base["blind_gift"] is not None:
@@ -346,6 +363,10 @@ class Up(BaseModel):
                     gift_price = base["discount_price"] / 1000
                     profit = float("{:.1f}".format((gift_price * gift_num) - box_price))
 
+                    if stats.enabled():
+                        stats.record_box(self.room_id, uid, gift_num, profit)
+                        return
+
                     await redis.incr_room_box_count(self.room_id, gift_num)
                     await redis.incr_user_box_count(self.room_id, uid, gift_num)
                     box_profit_after = await redis.incr_room_box_profit(self.room_id, profit)
@@ -367,6 +388,10 @@ class Up(BaseModel):
                 uid = base["uid"]
                 price = base["price"]
 
+                if stats.enabled():
+                    stats.record_sc(self.room_id, uid, price)
+                    return
+
                 # SC 统计
                 await redis.incr_room_sc_profit(self.room_id, price)
                 await redis.incr_user_sc_profit(self.room_id, uid, price)
@@ -393,6 +418,10 @@ class Up(BaseModel):
                     "提督": "Commander",
                     "总督": "Governor"
                 }
+                if stats.enabled():
+                    stats.record_guard(type_mapping[guard_type], self.room_id, uid, month)
+                    return
+
                 await redis.incr_room_guard_count(type_mapping[guard_type], self.room_id, month)
                 await redis.incr_user_guard_count(type_mapping[guard_type], self.room_id, uid, month)
 
@@ -471,6 +500,27 @@ class Up(BaseModel):
         """
         live_report_param = {}
 
+        # 写入尚未写入的统计数据和弹幕词频，保证直播报告数据完整
+        await stats.flush(self.room_id)
+        await danmu_cloud.flush(self.room_id)
+
+        # 需要获取的排行榜及其人数，大航海列表获取全部
+        rankings = {}
+        for name in ["danmu", "box", "box_profit", "gift", "sc"]:
+            if self.__any_live_report_item_enabled(f"{name}_ranking"):
+                rankings[name] = max(map(lambda t: t.live_report.__getattribute__(f"{name}_ranking"), self.targets))
+        if self.__any_live_report_item_enabled("guard_list"):
+            rankings.update({"captain": 0, "commander": 0, "governor": 0})
+
+        # 通过管道一次性读取 Redis 中的直播数据
+        redis_start = time.perf_counter()
+        danmu = self.__any_live_report_item_enabled("danmu_cloud")
+        data = await redis.get_live_report_data(
+            self.room_id, self.uid, self.uname, rankings,
+            danmu and not danmu_cloud.enabled(), danmu and danmu_cloud.enabled()
+        )
+        redis_cost = time.perf_counter() - redis_start
+
         # 主播信息
         live_report_param.update({
             "uname": self.uname,
@@ -478,8 +528,8 @@ class Up(BaseModel):
         })
 
         # 直播时间段和直播时长
-        start_time = await redis.get_live_start_time(self.room_id)
-        end_time = await redis.get_live_end_time(self.room_id)
+        start_time = data["start_time"]
+        end_time = data["end_time"]
         if end_time == 0:
             end_time = int(time.time())
         seconds = end_time - start_time
@@ -496,208 +546,127 @@ class Up(BaseModel):
             "second": second
         })
 
-        locked = False
-        room_info = {}
-        fans_medal_info = {}
-        guards_info = {}
+        async def get_room_infos():
+            """
+            并发获取基础数据变动所需的直播间信息
+            """
+            start = time.perf_counter()
+            results = await asyncio.gather(
+                self.__live_room.get_room_info_v2(),
+                self.__live_room.get_fans_medal_info(self.uid),
+                self.__live_room.get_guards_info(self.uid),
+                return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, ResponseCodeException):
+                    if result.code == 19002005:
+                        logger.warning(f"{self.uname} ({self.room_id}) 的直播间已加密")
+                    else:
+                        logger.error(f"{self.uname} ({self.room_id}) 的直播间信息获取失败, 错误信息: {result.code} ({result.msg})")
+                    return None, time.perf_counter() - start
+                if isinstance(result, BaseException):
+                    raise result
+            return results, time.perf_counter() - start
 
-        # 基础数据变动
-        if self.__any_live_report_item_enabled(["fans_change", "fans_medal_change", "guard_change"]):
-            try:
-                room_info = await self.__live_room.get_room_info_v2()
-                fans_medal_info = await self.__live_room.get_fans_medal_info(self.uid)
-                guards_info = await self.__live_room.get_guards_info(self.uid)
-            except ResponseCodeException as ex:
-                if ex.code == 19002005:
-                    locked = True
-                    logger.warning(f"{self.uname} ({self.room_id}) 的直播间已加密")
-
-            if not locked:
-                if await redis.exists_fans_count(self.room_id, start_time):
-                    fans_count = await redis.get_fans_count(self.room_id, start_time)
-                else:
-                    fans_count = -1
-                if await redis.exists_fans_medal_count(self.room_id, start_time):
-                    fans_medal_count = await redis.get_fans_medal_count(self.room_id, start_time)
-                else:
-                    fans_medal_count = -1
-                if await redis.exists_guard_count(self.room_id, start_time):
-                    guard_count = await redis.get_guard_count(self.room_id, start_time)
-                else:
-                    guard_count = -1
+        async def get_ranking_infos():
+            """
+            并发获取排行榜和大航海列表所需的昵称和头像
+            """
+            start = time.perf_counter()
+            names = [name for name in rankings if data[f"{name}_ranking"]]
+            results = await asyncio.gather(
+                *[get_unames_and_faces_by_uids([x[0] for x in data[f"{name}_ranking"]]) for name in names]
+            )
+            return dict(zip(names, results)), time.perf_counter() - start
+
+        tasks = [get_ranking_infos()]
+        need_room_infos = self.__any_live_report_item_enabled(["fans_change", "fans_medal_change", "guard_change"])
+        if need_room_infos:
+            tasks.append(get_room_infos())
+        results = await asyncio.gather(*tasks)
+        ranking_infos, ranking_cost = results[0]
+        room_infos, room_info_cost = results[1] if need_room_infos else (None, 0.0)
 
-                fans_medal_count_after = fans_medal_info["fans_medal_light_count"]
+        # 基础数据变动
+        if room_infos is not None:
+            room_info, fans_medal_info, guards_info = room_infos
 
-                live_report_param.update({
-                    # 粉丝变动
-                    "fans_before": fans_count,
-                    "fans_after": room_info["attention"],
-                    # 粉丝团（粉丝勋章数）变动
-                    "fans_medal_before": fans_medal_count,
-                    "fans_medal_after": fans_medal_count_after,
-                    # 大航海变动
-                    "guard_before": guard_count,
-                    "guard_after": guards_info["info"]["num"]
-                })
+            live_report_param.update({
+                # 粉丝变动
+                "fans_before": data["fans_count"],
+                "fans_after": room_info["attention"],
+                # 粉丝团（粉丝勋章数）变动
+                "fans_medal_before": data["fans_medal_count"],
+                "fans_medal_after": fans_medal_info["fans_medal_light_count"],
+                # 大航海变动
+                "guard_before": data["guard_count"],
+                "guard_after": guards_info["info"]["num"]
+            })
 
         # 直播数据
-        box_profit = await redis.get_room_box_profit(self.room_id)
-        count = await redis.len_box_profit_record()
-        await redis.add_box_profit_record(start_time, self.uid, self.uname, box_profit)
-        rank = await redis.rank_box_profit_record(start_time, self.uid, self.uname)
+        count = data["box_profit_record_count"]
+        rank = data["box_profit_record_rank"]
         percent = float("{:.2f}".format(float("{:.4f}".format(rank / count)) * 100)) if count != 0 else 100
 
         live_report_param.update({
             # 弹幕相关
-            "danmu_count": await redis.get_room_danmu_count(self.room_id),
-            "danmu_person_count": await redis.len_user_danmu_count(self.room_id),
-            "danmu_diagram": await redis.get_room_danmu_time(self.room_id),
+            "danmu_count": data["danmu_count"],
+            "danmu_person_count": data["danmu_person_count"],
+            "danmu_diagram": data["danmu_diagram"],
             # 盲盒相关
-            "box_count": await redis.get_room_box_count(self.room_id),
-            "box_person_count": await redis.len_user_box_count(self.room_id),
-            "box_profit": box_profit,
+            "box_count": data["box_count"],
+            "box_person_count": data["box_person_count"],
+            "box_profit": data["box_profit"],
             "box_beat_percent": percent,
-            "box_profit_diagram": await redis.get_room_box_profit_record(self.room_id),
-            "box_diagram": await redis.get_room_box_time(self.room_id),
+            "box_profit_diagram": data["box_profit_diagram"],
+            "box_diagram": data["box_diagram"],
             # 礼物相关
-            "gift_profit": await redis.get_room_gift_profit(self.room_id),
-            "gift_person_count": await redis.len_user_gift_profit(self.room_id),
-            "gift_diagram": await redis.get_room_gift_time(self.room_id),
+            "gift_profit": data["gift_profit"],
+            "gift_person_count": data["gift_person_count"],
+            "gift_diagram": data["gift_diagram"],
             # SC（醒目留言）相关
-            "sc_profit": await redis.get_room_sc_profit(self.room_id),
-            "sc_person_count": await redis.len_user_sc_profit(self.room_id),
-            "sc_diagram": await redis.get_room_sc_time(self.room_id),
+            "sc_profit": data["sc_profit"],
+            "sc_person_count": data["sc_person_count"],
+            "sc_diagram": data["sc_diagram"],
             # 大航海相关
-            "captain_count": await redis.get_room_captain_count(self.room_id),
-            "commander_count": await redis.get_room_commander_count(self.room_id),
-            "governor_count": await redis.get_room_governor_count(self.room_id),
-            "guard_diagram": await redis.get_room_guard_time(self.room_id)
+            "captain_count": data["captain_count"],
+            "commander_count": data["commander_count"],
+            "governor_count": data["governor_count"],
+            "guard_diagram": data["guard_diagram"]
         })
 
-        # 弹幕排行
-        if self.__any_live_report_item_enabled("danmu_ranking"):
-            ranking_count = max(map(lambda t: t.live_report.danmu_ranking, self.targets))
-            danmu_ranking = await redis.rev_range_user_danmu_count(self.room_id, 0, ranking_count - 1)
-
-            if danmu_ranking:
-                uids = [x[0] for x in danmu_ranking]
-                counts = [x[1] for x in danmu_ranking]
-                unames, faces = await get_unames_and_faces_by_uids(uids)
-
+        # 弹幕、盲盒数量、盲盒盈亏、礼物、SC（醒目留言）排行
+        for name in ["danmu", "box", "box_profit", "gift", "sc"]:
+            if name in ranking_infos:
+                unames, faces = ranking_infos[name]
                 live_report_param.update({
-                    "danmu_ranking_faces": faces,
-                    "danmu_ranking_unames": unames,
-                    "danmu_ranking_counts": counts
-                })
-
-        # 盲盒数量排行
-        if self.__any_live_report_item_enabled("box_ranking"):
-            ranking_count = max(map(lambda t: t.live_report.box_ranking, self.targets))
-            box_ranking = await redis.rev_range_user_box_count(self.room_id, 0, ranking_count - 1)
-
-            if box_ranking:
-                uids = [x[0] for x in box_ranking]
-                counts = [x[1] for x in box_ranking]
-                unames, faces = await get_unames_and_faces_by_uids(uids)
-
-                live_report_param.update({
-                    "box_ranking_faces": faces,
-                    "box_ranking_unames": unames,
-                    "box_ranking_counts": counts
-                })
-
-        # 盲盒盈亏排行
-        if self.__any_live_report_item_enabled("box_profit_ranking"):
-            ranking_count = max(map(lambda t: t.live_report.box_profit_ranking, self.targets))
-            box_profit_ranking = await redis.rev_range_user_box_profit(self.room_id, 0, ranking_count - 1)
-
-            if box_profit_ranking:
-                uids = [x[0] for x in box_profit_ranking]
-                counts = [x[1] for x in box_profit_ranking]
-                unames, faces = await get_unames_and_faces_by_uids(uids)
-
-                live_report_param.update({
-                    "box_profit_ranking_faces": faces,
-                    "box_profit_ranking_unames": unames,
-                    "box_profit_ranking_counts": counts
-                })
-
-        # 礼物排行
-        if self.__any_live_report_item_enabled("gift_ranking"):
-            ranking_count = max(map(lambda t: t.live_report.gift_ranking, self.targets))
-            gift_ranking = await redis.rev_range_user_gift_profit(self.room_id, 0, ranking_count - 1)
-
-            if gift_ranking:
-                uids = [x[0] for x in gift_ranking]
-                counts = [x[1] for x in gift_ranking]
-                unames, faces = await get_unames_and_faces_by_uids(uids)
-
-                live_report_param.update({
-                    "gift_ranking_faces": faces,
-                    "gift_ranking_unames": unames,
-                    "gift_ranking_counts": counts
-                })
-
-        # SC（醒目留言）排行
-        if self.__any_live_report_item_enabled("sc_ranking"):
-            ranking_count = max(map(lambda t: t.live_report.sc_ranking, self.targets))
-            sc_ranking = await redis.rev_range_user_sc_profit(self.room_id, 0, ranking_count - 1)
-
-            if sc_ranking:
-                uids = [x[0] for x in sc_ranking]
-                counts = [x[1] for x in sc_ranking]
-                unames, faces = await get_unames_and_faces_by_uids(uids)
-
-                live_report_param.update({
-                    "sc_ranking_faces": faces,
-                    "sc_ranking_unames": unames,
-                    "sc_ranking_counts": counts
+                    f"{name}_ranking_faces": faces,
+                    f"{name}_ranking_unames": unames,
+                    f"{name}_ranking_counts": [x[1] for x in data[f"{name}_ranking"]]
                 })
 
         # 开通大航海观众列表
-        if self.__any_live_report_item_enabled("guard_list"):
-            captains = await redis.rev_range_user_captain_count(self.room_id)
-            commanders = await redis.rev_range_user_commander_count(self.room_id)
-            governors = await redis.rev_range_user_governor_count(self.room_id)
-
-            if captains:
-                uids = [x[0] for x in captains]
-                counts = [x[1] for x in captains]
-                unames, faces = await get_unames_and_faces_by_uids(uids)
-
-                captain_infos = [[faces[i], unames[i], counts[i]] for i in range(len(counts))]
-                live_report_param.update({
-                    "captain_infos": captain_infos,
-                })
-
-            if commanders:
-                uids = [x[0] for x in commanders]
-                counts = [x[1] for x in commanders]
-                unames, faces = await get_unames_and_faces_by_uids(uids)
-
-                commander_infos = [[faces[i], unames[i], counts[i]] for i in range(len(counts))]
+        for name in ["captain", "commander", "governor"]:
+            if name in ranking_infos:
+                unames, faces = ranking_infos[name]
+                counts = [x[1] for x in data[f"{name}_ranking"]]
                 live_report_param.update({
-                    "commander_infos": commander_infos,
-                })
-
-            if governors:
-                uids = [x[0] for x in governors]
-                counts = [x[1] for x in governors]
-                unames, faces = await get_unames_and_faces_by_uids(uids)
-
-                governor_infos = [[faces[i], unames[i], counts[i]] for i in range(len(counts))]
-                live_report_param.update({
-                    "governor_infos": governor_infos,
+                    f"{name}_infos": [[faces[i], unames[i], counts[i]] for i in range(len(counts))]
                 })
 
         # 弹幕词云
-        if self.__any_live_report_item_enabled("danmu_cloud"):
-            all_danmu = await redis.get_room_danmu(self.room_id)
-
+        if "all_danmu" in data:
+            live_report_param.update({
+                "all_danmu": data["all_danmu"]
+            })
+        if "danmu_words" in data:
             live_report_param.update({
-                "all_danmu": all_danmu
+                "danmu_words": data["danmu_words"]
             })
 
+        logger.info(f"{self.uname} ({self.room_id}) 的直播报告数据计算完毕, Redis 读取耗时: {redis_cost:.3f} 秒, "
+                    f"直播间信息获取耗时: {room_info_cost:.3f} 秒, 排行榜昵称和头像获取耗时: {ranking_cost:.3f} 秒")
+
         return live_report_param
 
     def __eq__(self, other):
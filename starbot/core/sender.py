@@ -1,13 +1,15 @@
 import asyncio
+import base64
 import time
 from asyncio import AbstractEventLoop
 from typing import Optional, List, Dict, Any, Union, Callable, Tuple
 
 from graia.ariadne import Ariadne
 from graia.ariadne.connection.config import config as AriadneConfig, HttpClientConfig, WebsocketClientConfig
+from graia.ariadne.connection.util import UploadMethod
 from graia.ariadne.exception import RemoteException, AccountMuted, UnknownTarget
 from graia.ariadne.message.chain import MessageChain
-from graia.ariadne.message.element import At, AtAll
+from graia.ariadne.message.element import At, AtAll, Image
 from graia.ariadne.model import LogConfig, MemberPerm
 from loguru import logger
 from pydantic import BaseModel, PrivateAttr
@@ -17,7 +19,7 @@ from .room import Up
 from ..exception import NoPermissionException
 from ..exception.AtAllLimitedException import AtAllLimitedException
 from ..painter.LiveReportGenerator import LiveReportGenerator
-from ..utils import config, redis
+from ..utils import config, redis, render
 
 
 class Bot(BaseModel):
@@ -140,16 +142,53 @@ class Bot(BaseModel):
         if config.get("MASTER_QQ"):
             await self.__bot.send_friend_message(config.get("MASTER_QQ"), "补发任务已完成~")
 
-    async def send_message(self, msg: Message):
+    async def __upload_images(self,
+                              chain: MessageChain,
+                              method: UploadMethod,
+                              images: Dict[Tuple[UploadMethod, str], Image]) -> MessageChain:
+        """
+        上传消息链中的 Base64 图片，并替换为上传后的图片 ID，已上传过的图片直接使用上次上传的结果
+        上传失败时保留原 Base64 图片
+
+        Args:
+            chain: 消息链
+            method: 图片上传类型
+            images: 已上传的图片，键为图片上传类型和图片 Base64 字符串
+
+        Returns:
+            替换图片后的消息链
+        """
+        if not any(isinstance(e, Image) and e.base64 for e in chain.content):
+            return chain
+
+        elements = []
+        for element in chain.content:
+            if isinstance(element, Image) and element.base64:
+                key = method, element.base64
+                if key not in images:
+                    try:
+                        images[key] = await self.__bot.upload_image(base64.b64decode(element.base64), method)
+                    except Exception as ex:
+                        logger.warning(f"上传图片失败, 将直接发送图片: {ex}")
+                        images[key] = element
+                element = images[key]
+            elements.append(element)
+
+        return MessageChain(elements)
+
+    async def send_message(self, msg: Message, images: Optional[Dict[Tuple[UploadMethod, str], Image]] = None):
         """
         消息发送
 
         Args:
             msg: Message 实例
+            images: 已上传的图片，传入后消息中的 Base64 图片会先上传再发送，向多个推送目标发送同一图片时仅需上传一次。默认：None
         """
         if msg.type == PushType.Friend:
             for message in msg.get_message_chains():
                 try:
+                    if images is not None:
+                        message = await self.__upload_images(message, UploadMethod.Friend, images)
                     await self.__bot.send_friend_message(msg.id, message)
                     logger.info(f"{self.qq} -> 好友[{msg.id}] : {message.safe_display}")
                 except RemoteException as ex:
@@ -167,6 +206,8 @@ class Bot(BaseModel):
                             self.__queue.append((msg.id, message, msg.get_time()))
                         logger.error(f"受风控影响, 要发送的消息已暂存, 请解除风控后使用 \"补发\" 命令恢复, 群号: {msg.id}")
                         continue
+                    if images is not None:
+                        message = await self.__upload_images(message, UploadMethod.Group, images)
                     await self.__bot.send_group_message(msg.id, message)
                     self.__banned = False
                     logger.info(f"{self.qq} -> 群[{msg.id}] : {message.safe_display}")
@@ -294,9 +335,10 @@ class Bot(BaseModel):
         if not isinstance(up, Up):
             return
 
+        images = {}
         for target in up.targets:
             if target_filter(target):
-                await self.send_message(Message(id=target.id, content=msg, type=target.type))
+                await self.send_message(Message(id=target.id, content=msg, type=target.type), images)
 
     async def __send_push_message(self, up: Up,
                                   type_selector: Callable[[PushTarget], Union[LiveOn, LiveOff, DynamicUpdate]],
@@ -313,6 +355,7 @@ class Bot(BaseModel):
             return
 
         logger.debug(f"{up.uname} 已配置推送群: ({', '.join(map(lambda t: str(t.id), up.targets))})")
+        images = {}
         for target in up.targets:
             select = type_selector(target)
             if not isinstance(select, (LiveOn, LiveOff, DynamicUpdate)):
@@ -323,7 +366,7 @@ class Bot(BaseModel):
                 message = select.message
                 for arg, val in args.items():
                     message = message.replace(arg, str(val))
-                await self.send_message(Message(id=target.id, content=message, type=target.type))
+                await self.send_message(Message(id=target.id, content=message, type=target.type), images)
 
     async def send_live_on(self, up: Up, args: Dict[str, Any]):
         """
@@ -374,11 +417,31 @@ class Bot(BaseModel):
             up: 要发送的 UP 主实例
             param: 直播报告参数
         """
-        for target in filter(lambda t: t.live_report.enabled, up.targets):
-            base64str = LiveReportGenerator.generate(param, target.live_report)
-            await self.send_message(
-                Message(id=target.id, content="".join(["{base64pic=", base64str, "}"]), type=target.type)
-            )
+        targets = [(t, LiveReportGenerator.get_key(param, t.live_report)) for t in up.targets if t.live_report.enabled]
+
+        # 直播报告配置相同的推送目标共享同一张直播报告图片
+        reports: Dict[str, asyncio.Task] = {}
+        for target, key in targets:
+            if key not in reports:
+                reports[key] = asyncio.create_task(
+                    render.run_shared(key, LiveReportGenerator.generate, param, target.live_report)
+                )
+
+        # 等待全部直播报告绘制完成，单张直播报告绘制失败时不影响其他推送目标
+        results = dict(zip(reports.keys(), await asyncio.gather(*reports.values(), return_exceptions=True)))
+
+        images = {}
+        for target, key in targets:
+            base64str = results[key]
+            if isinstance(base64str, BaseException):
+                logger.error(f"直播报告绘制失败, 已跳过推送, 房间号: {param['room_id']}, 群号: {target.id}, 异常: {base64str!r}")
+                continue
+            try:
+                await self.send_message(
+                    Message(id=target.id, content="".join(["{base64pic=", base64str, "}"]), type=target.type), images
+                )
+            except Exception as ex:
+                logger.exception(f"直播报告推送失败, 群号: {target.id}", ex)
 
     async def send_dynamic_update(self, up: Up, args: Dict[str, Any]):
         """
@@ -3,11 +3,11 @@
 源仓库: https://github.com/MoyuScript/bilibili-api
 """
 
-import json
 import time
 from enum import Enum
 from typing import List
 
+from ..utils import codec
 from ..utils.Credential import Credential
 from ..utils.network import request
 from ..utils.utils import get_api
@@ -259,8 +259,8 @@ class User:
         # card 字段自动转换成 JSON
         if 'cards' in data:
             for card in data["cards"]:
-                card["card"] = json.loads(card["card"])
-                card["extend_json"] = json.loads(card["extend_json"])
+                card["card"] = codec.loads(card["card"])
+                card["extend_json"] = codec.loads(card["extend_json"])
         return data
 
     async def get_subscribed_bangumis(self, pn: int = 1, type_: BangumiType = BangumiType.BANGUMI):
@@ -364,7 +364,7 @@ class User:
             "msg[receiver_type]": 1,
             "msg[msg_type]": 1,
             "msg[msg_status]": 0,
-            "msg[content]": json.dumps({"content": text}),
+            "msg[content]": codec.dumps({"content": text}),
             "msg[dev_id]": "B9A37BF3-AA9D-4076-A4D3-366AC8C4C5DB",
             "msg[new_face_version]": "0",
             "msg[timestamp]": int(time.time()),
@@ -0,0 +1,57 @@
+from typing import Optional, Tuple, List, Any
+
+from PIL import Image
+
+from .PicGenerator import Color, PicGenerator
+from ..utils.utils import mask_round
+
+
+class DataCardGenerator:
+    """
+    数据卡片图片生成器，用于生成直播间数据、用户数据和帮助等命令图片
+    卡片内容以绘制指令列表传入，指令为绘制方法名称和参数组成的元组，使卡片可在绘图进程中绘制
+    """
+    __draw_methods = {
+        "chapter": "draw_chapter",
+        "section": "draw_section",
+        "tip": "draw_tip",
+        "text": "draw_text",
+        "multiline": "draw_text_multiline"
+    }
+
+    @classmethod
+    def generate(cls,
+                 lines: List[Tuple[Any, ...]],
+                 face: Optional[Image.Image] = None,
+                 title: str = "") -> str:
+        """
+        生成数据卡片图片
+
+        Args:
+            lines: 绘制指令列表，如 ("text", "文字", Color.BLACK)，可用的绘制方法名称为 chapter、section、tip、text、multiline
+            face: 头像图片，传入时在卡片左上角绘制头像，并在头像右侧绘制标题。默认：None
+            title: 标题，仅传入头像时绘制。默认：""
+
+        Returns:
+            数据卡片图片的 Base64 字符串
+        """
+        width = 1000
+        face_size = 100
+        pic = PicGenerator(width)
+
+        if face is not None:
+            pic.set_pos(175, 80).draw_background(Color.WHITE, 35)
+            pic.draw_img_alpha(mask_round(face.resize((face_size, face_size)).convert("RGBA")), (50, 50))
+            pic.draw_section(title).set_pos(50, 150 + pic.row_space)
+        else:
+            pic.set_pos(50, 50).draw_background(Color.WHITE, 35)
+
+        for method, *args in lines:
+            getattr(pic, cls.__draw_methods[method])(*args)
+
+        # 底部版权信息，请务必保留此处
+        pic.draw_text_right(25, "Designed By StarBot", Color.GRAY)
+        pic.draw_text_right(25, "https://github.com/Starlwr/StarBot", Color.LINK)
+        pic.crop_and_paste_bottom()
+
+        return pic.base64()
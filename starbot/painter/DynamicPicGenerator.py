@@ -1,15 +1,17 @@
 import asyncio
-import json
 import os
+import time
 from datetime import datetime
 from typing import Optional, Union, Tuple, List, Dict, Any
 
 from PIL import Image, ImageDraw, ImageFont
 from PIL.Image import Resampling
 from emoji import is_emoji
+from loguru import logger
 
 from .PicGenerator import Color, PicGenerator
-from ..utils import config
+from ..exception import ResponseException
+from ..utils import config, codec, image_cache, render
 from ..utils.network import request
 from ..utils.utils import open_url_image, timestamp_format, split_list, limit_str_length, \
     mask_round, mask_rounded_rectangle, get_credential
@@ -20,11 +22,15 @@ class DynamicPicGenerator:
     动态图片生成器
     """
     __resource_base_path = os.path.dirname(os.path.dirname(__file__))
+    __width = 740
+    __text_margin = 25
+    __img_margin = 10
+    __prefetch_semaphore: Optional[asyncio.Semaphore] = None
 
     @classmethod
     async def generate(cls, param: Dict[str, Any]) -> str:
         """
-        根据传入动态信息生成动态图片
+        根据传入动态信息生成动态图片，先并发获取绘制所需的全部图片和动态内容，再在绘图进程中绘制
 
         Args:
             param: 动态信息
@@ -32,12 +38,30 @@ class DynamicPicGenerator:
         Returns:
             动态图片的 Base64 字符串
         """
-        width = 740
-        height = 100000
-        text_margin = 25
-        img_margin = 10
-        generator = PicGenerator(width, height)
-        pic = generator.set_pos(175, 60).draw_rounded_rectangle(0, 0, width, height, 35, Color.WHITE).copy_bottom(35)
+        images, modules = await cls.__prefetch(param)
+        return await render.run(cls.draw, param, images, modules)
+
+    @classmethod
+    def draw(cls,
+             param: Dict[str, Any],
+             images: Dict[Tuple[str, str], Image.Image],
+             modules: Dict[int, List[Dict[str, Any]]]) -> str:
+        """
+        使用已获取的图片和动态内容绘制动态图片
+
+        Args:
+            param: 动态信息
+            images: 图片 URL 和预处理方式的名称组成的元组与图片组成的字典
+            modules: 动态 ID 和动态内容各区块信息列表组成的字典
+
+        Returns:
+            动态图片的 Base64 字符串
+        """
+        width = cls.__width
+        text_margin = cls.__text_margin
+        img_margin = cls.__img_margin
+        generator = PicGenerator(width)
+        pic = generator.set_pos(175, 60).draw_background(Color.WHITE, 35)
 
         # 提取参数
         desc = param["desc"]
@@ -46,25 +70,25 @@ class DynamicPicGenerator:
         dynamic_type = desc["type"]
 
         user_profile = desc["user_profile"]
-        card = json.loads(param["card"])
+        card = codec.loads(param["card"])
         display = param["display"]
 
         # 动态头部
-        face, pendant = await asyncio.gather(open_url_image(user_profile["info"]["face"]),
-                                             open_url_image(user_profile["pendant"]["image"]))
+        face = cls.__get_image(images, user_profile["info"]["face"], "face100")
+        pendant = images.get((user_profile["pendant"]["image"], "pendant170"))
         official = user_profile["card"]["official_verify"]["type"]
         vip = user_profile["vip"]["nickname_color"] != ""
         uname = user_profile["info"]["uname"]
         timestamp = desc["timestamp"]
 
-        await cls.__draw_header(pic, face, pendant, official, vip, uname, timestamp)
+        cls.__draw_header(pic, face, pendant, official, vip, uname, timestamp)
 
         # 动态主体
         pic.set_pos(x=text_margin)
         pic.set_row_space(10)
 
-        await cls.__draw_by_type(pic, dynamic_type, card, dynamic_id, display,
-                                 text_margin, img_margin, False, origin_dynamic_id)
+        cls.__draw_by_type(pic, images, modules, dynamic_type, card, dynamic_id, display,
+                           text_margin, img_margin, False, origin_dynamic_id)
 
         # 底部版权信息，请务必保留此处
         pic.move_pos(0, 15)
@@ -83,6 +107,24 @@ class DynamicPicGenerator:
         else:
             return pic.base64()
 
+    @classmethod
+    def __get_image(cls, images: Dict[Tuple[str, str], Image.Image], url: str, variant: str = "") -> Image.Image:
+        """
+        从已获取的图片中取出图片
+
+        Args:
+            images: 图片 URL 和预处理方式的名称组成的元组与图片组成的字典
+            url: 图片 URL
+            variant: 预处理方式的名称。默认：""
+
+        Returns:
+            图片
+        """
+        image = images.get((url, variant))
+        if image is None:
+            raise ResponseException(f"读取图片失败: {url}")
+        return image
+
     @classmethod
     def __remove_illegal_char(cls, s: str) -> str:
         """
@@ -96,35 +138,330 @@ class DynamicPicGenerator:
         """
         return s.replace(chr(8203), "").replace(chr(65039), "")
 
+    @staticmethod
+    def __transform_face(img: Image.Image) -> Image.Image:
+        """
+        将头像缩放为 100 像素并裁剪为圆形
+        """
+        return mask_round(img.resize((100, 100), Resampling.LANCZOS).convert("RGBA"))
+
+    @staticmethod
+    def __transform_pendant(img: Image.Image) -> Image.Image:
+        """
+        将头像挂件缩放为 170 像素
+        """
+        return img.resize((170, 170), Resampling.LANCZOS).convert("RGBA")
+
     @classmethod
-    async def __draw_header(cls,
-                            pic: PicGenerator,
-                            face: Image.Image,
-                            pendant: Image.Image,
-                            official: int,
-                            vip: bool,
-                            uname: str,
-                            timestamp: int) -> PicGenerator:
+    def __get_prefetch_semaphore(cls) -> asyncio.Semaphore:
+        """
+        获取限制预取并发数量的信号量，所有动态共用，避免同时推送多条动态时并发请求过多
+        """
+        if cls.__prefetch_semaphore is None:
+            cls.__prefetch_semaphore = asyncio.Semaphore(config.get("DYNAMIC_PREFETCH_CONCURRENCY"))
+        return cls.__prefetch_semaphore
+
+    @classmethod
+    async def __get_modules(cls, dynamic_type: int, dynamic_id: int) -> List[Dict[str, Any]]:
+        """
+        请求动态内容各区块信息
+
+        Args:
+            dynamic_type: 动态类型
+            dynamic_id: 动态 ID
+
+        Returns:
+            动态内容各区块信息列表，带图动态和纯文字动态的标题会插入在开头
+        """
+        if dynamic_type == 2 or dynamic_type == 4:
+            # 有些动态带有标题，不显示标题会缺少上下文
+            modules_url =f"https://api.bilibili.com/x/polymer/web-dynamic/v1/detail?timezone_offset=-480&id={dynamic_id}&features=itemOpusStyle,opusBigCover,onlyfansVote"
+            modules = (await request("GET", modules_url, credential=get_credential()))["item"]["modules"]["module_dynamic"]["major"]["opus"]
+            title = modules["title"]
+            modules = modules["summary"]
+            if modules:
+                modules = modules["rich_text_nodes"]
+                if title is not None:
+                    modules.insert(0, {
+                        'orig_text': f"{title}\n",
+                        'text': f"{title}\n",
+                        'type': 'RICH_TEXT_NODE_TYPE_TEXT'
+                    })
+            else:
+                modules = []
+        else :
+            modules_url = f"https://api.bilibili.com/x/polymer/web-dynamic/v1/detail?timezone_offset=-480&id={dynamic_id}"
+            modules = (await request("GET", modules_url, credential=get_credential()))["item"]["modules"]["module_dynamic"]["desc"]
+            modules = modules["rich_text_nodes"] if modules else []
+
+        return modules
+
+    @classmethod
+    def __get_picture_layout(cls, picture_count: int, width: int, img_margin: int) -> Tuple[int, int]:
+        """
+        计算图片区域的布局
+
+        Args:
+            picture_count: 图片数量
+            width: 画布宽度
+            img_margin: 图片外边距
+
+        Returns:
+            每行图片数量和每张图片的边长组成的元组，仅有一张图片时边长为 0，表示按原比例绘制
+        """
+        if picture_count == 1:
+            return 1, 0
+        elif picture_count == 2 or picture_count == 4:
+            return 2, int((width - (img_margin * 3)) / 2)
+        else:
+            return 3, int((width - (img_margin * 4)) / 3)
+
+    @classmethod
+    def __get_picture_urls(cls, pictures: List[Dict[str, Any]], width: int, img_margin: int) -> List[str]:
+        """
+        获取图片区域中各图片的 URL，多张图片时请求服务端裁剪后的缩略图
+
+        Args:
+            pictures: 图片信息字典
+            width: 画布宽度
+            img_margin: 图片外边距
+
+        Returns:
+            图片 URL 列表
+        """
+        line_count, size = cls.__get_picture_layout(len(pictures), width, img_margin)
+
+        urls = []
+        for picture in pictures:
+            src = picture['img_src']
+            if line_count == 1:
+                urls.append(f"{src}@518w.webp")
+            elif picture["img_height"] / picture["img_width"] >= 3:
+                urls.append(f"{src}@{size}w_{size}h_!header.webp")
+            else:
+                urls.append(f"{src}@{size}w_{size}h_1e_1c.webp")
+        return urls
+
+    @classmethod
+    def __get_article_urls(cls, urls: List[str], width: int, img_margin: int) -> List[str]:
+        """
+        获取专栏封面的 URL，多张封面时请求服务端裁剪后的缩略图
+
+        Args:
+            urls: 专栏封面原图 URL 列表
+            width: 画布宽度
+            img_margin: 图片外边距
+
+        Returns:
+            专栏封面 URL 列表
+        """
+        if len(urls) == 1:
+            return [f"{urls[0]}@518w.webp"]
+
+        size = int((width - (img_margin * 4)) / 3)
+        return [f"{url}@{size}w_{size}h_1e_1c.webp" for url in urls]
+
+    @classmethod
+    def __get_add_on_img_height(cls, width: int) -> int:
+        """
+        计算附加卡片中图片的边长
+
+        Args:
+            width: 画布宽度
+
+        Returns:
+            附加卡片中图片的边长
+        """
+        return int(width / 4) - 20
+
+    @classmethod
+    def __collect_image_urls(cls,
+                             dynamic_type: int,
+                             card: Dict[str, Any],
+                             display: Dict[str, Any],
+                             width: int,
+                             img_margin: int) -> List[str]:
+        """
+        遍历动态信息，收集绘制时需要的全部图片 URL，不包含头像、头像挂件和表情
+
+        Args:
+            dynamic_type: 动态类型
+            card: 动态信息
+            display: 动态绘制附加信息
+            width: 画布宽度
+            img_margin: 图片外边距
+
+        Returns:
+            图片 URL 列表
+        """
+        urls = []
+
+        if dynamic_type == 1:
+            if "origin" in card:
+                urls.extend(cls.__collect_image_urls(card["item"]["orig_type"], codec.loads(card["origin"]),
+                                                     display["origin"], width, img_margin))
+        elif dynamic_type == 2:
+            if card["item"]["pictures"]:
+                urls.extend(cls.__get_picture_urls(card["item"]["pictures"], width, img_margin))
+        elif dynamic_type == 8:
+            urls.append(f"{card['pic']}@480w.webp")
+        elif dynamic_type == 64:
+            urls.extend(cls.__get_article_urls(card["origin_image_urls"], width, img_margin))
+        elif dynamic_type == 256:
+            urls.append(card["cover"])
+        elif dynamic_type == 2048:
+            urls.append(card["sketch"]["cover_url"])
+        elif dynamic_type == 4200 or dynamic_type == 4300:
+            urls.append(f"{card['cover']}@203w_127h_1e_1c.webp")
+        elif dynamic_type == 4308:
+            urls.append(f"{card['live_play_info']['cover']}@203w_127h_1e_1c.webp")
+
+        img_height = cls.__get_add_on_img_height(width)
+        add_on_card = display["add_on_card_info"] if "add_on_card_info" in display else []
+        for info in add_on_card:
+            card_type = info["add_on_card_show_type"]
+            if card_type == 1:
+                for good in codec.loads(info["goods_card"])["list"]:
+                    urls.append(f"{good['img']}@{img_height}w_{img_height}h_1e_1c.webp")
+            elif card_type == 2:
+                base = info["attach_card"]
+                if base["type"] in ["decoration", "game"]:
+                    urls.append(f"{base['cover_url']}@{img_height}w_{img_height}h_1e_1c.webp")
+            elif card_type == 5:
+                urls.append(f"{info['ugc_attach_card']['image_url']}@480w.webp")
+
+        return urls
+
+    @classmethod
+    async def __prefetch(cls, param: Dict[str, Any]) -> Tuple[Dict[Tuple[str, str], Image.Image],
+                                                               Dict[int, List[Dict[str, Any]]]]:
+        """
+        绘制前并发获取动态及转发源动态所需的全部图片和动态内容，单项获取失败或超时不影响其他项
+        全部完成后重新获取一次失败的项，仍失败时抛出异常
+
+        Args:
+            param: 动态信息
+
+        Returns:
+            图片字典和动态内容字典组成的元组，图片字典以图片 URL 和预处理方式的名称组成的元组为键，动态内容字典以动态 ID 为键
+        """
+        start = time.time()
+        timeout = config.get("DYNAMIC_PREFETCH_TIMEOUT")
+        semaphore = cls.__get_prefetch_semaphore()
+
+        desc = param["desc"]
+        dynamic_id = desc["dynamic_id"]
+        origin_dynamic_id = desc["orig_dy_id"] if "orig_dy_id" in desc else None
+        dynamic_type = desc["type"]
+        user_profile = desc["user_profile"]
+        card = codec.loads(param["card"])
+
+        images = {}
+        transforms = {}
+        modules = {}
+
+        async def fetch_image(url: str, variant: str = "", transform=None):
+            """
+            获取图片，同一图片仅获取一次
+
+            Args:
+                url: 图片 URL
+                variant: 预处理方式的名称。默认：""
+                transform: 解码后的预处理函数。默认：None
+            """
+            key = (url, variant)
+            if not url or key in transforms:
+                return
+            transforms[key] = transform
+            try:
+                async with semaphore:
+                    image = await asyncio.wait_for(image_cache.open_image(url, variant, transform), timeout)
+                if image is not None:
+                    images[key] = image
+            except asyncio.TimeoutError:
+                logger.warning(f"获取动态 {dynamic_id} 的图片 {url} 超时")
+            except Exception as e:
+                logger.warning(f"获取动态 {dynamic_id} 的图片 {url} 失败: {e}")
+
+        def emoji_urls(result: List[Dict[str, Any]]) -> List[str]:
+            return [module["emoji"]["icon_url"] for module in result if module["type"] == "RICH_TEXT_NODE_TYPE_EMOJI"]
+
+        async def fetch_modules(modules_type: int, modules_id: int):
+            """
+            获取动态内容，获取后立即获取其中的表情
+
+            Args:
+                modules_type: 动态类型
+                modules_id: 动态 ID
+            """
+            try:
+                async with semaphore:
+                    result = await asyncio.wait_for(cls.__get_modules(modules_type, modules_id), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"获取动态 {modules_id} 的内容超时")
+                return
+            except Exception as e:
+                logger.warning(f"获取动态 {modules_id} 的内容失败: {e}")
+                return
+
+            modules[modules_id] = result
+            await asyncio.gather(*[fetch_image(url) for url in emoji_urls(result)])
+
+        modules_params = [(dynamic_type, dynamic_id)]
+        if dynamic_type == 1 and "origin" in card and origin_dynamic_id is not None:
+            modules_params.append((card["item"]["orig_type"], origin_dynamic_id))
+
+        tasks = [
+            fetch_image(user_profile["info"]["face"], "face100", cls.__transform_face),
+            fetch_image(user_profile["pendant"]["image"], "pendant170", cls.__transform_pendant),
+            *[fetch_modules(modules_type, modules_id) for modules_type, modules_id in modules_params],
+            *[fetch_image(url) for url in cls.__collect_image_urls(
+                dynamic_type, card, param["display"], cls.__width, cls.__img_margin
+            )]
+        ]
+        await asyncio.gather(*tasks)
+
+        # 重新获取一次失败的项，仍失败时抛出异常
+        for modules_type, modules_id in modules_params:
+            if modules_id not in modules:
+                modules[modules_id] = await cls.__get_modules(modules_type, modules_id)
+                for url in emoji_urls(modules[modules_id]):
+                    transforms.setdefault((url, ""), None)
+        missing = [key for key in transforms if key not in images]
+        if missing:
+            images.update(zip(missing, await asyncio.gather(*[
+                open_url_image(url, variant, transforms[(url, variant)]) for url, variant in missing
+            ])))
+
+        logger.debug(f"动态 {dynamic_id} 的 {len(transforms) + len(modules)} 项资源获取完成, "
+                     f"耗时 {time.time() - start:.2f} 秒")
+
+        return images, modules
+
+    @classmethod
+    def __draw_header(cls,
+                      pic: PicGenerator,
+                      face: Image.Image,
+                      pendant: Image.Image,
+                      official: int,
+                      vip: bool,
+                      uname: str,
+                      timestamp: int) -> PicGenerator:
         """
         绘制动态头部
 
         Args:
             pic: 绘图器实例
-            face: 头像图片
-            pendant: 头像挂件图片
+            face: 缩放为 100 像素并裁剪为圆形的头像图片
+            pendant: 缩放为 170 像素的头像挂件图片
             official: 认证类型
             vip: 是否为大会员
             uname: 昵称
             timestamp: 动态时间戳
         """
-        face_size = (100, 100)
-        face = face.resize(face_size, Resampling.LANCZOS).convert("RGBA")
-        face = mask_round(face)
         pic.draw_img_alpha(face, (50, 50))
 
         if pendant is not None:
-            pendant_size = (170, 170)
-            pendant = pendant.resize(pendant_size, Resampling.LANCZOS).convert('RGBA')
             pic.draw_img_alpha(pendant, (15, 15))
             pic.move_pos(15, 0)
 
@@ -146,21 +483,25 @@ class DynamicPicGenerator:
         return pic
 
     @classmethod
-    async def __draw_by_type(cls,
-                             pic: PicGenerator,
-                             dynamic_type: int,
-                             card: Dict[str, Any],
-                             dynamic_id: int,
-                             display: Dict[str, Any],
-                             text_margin: int,
-                             img_margin: int,
-                             forward: bool,
-                             origin_dynamic_id: Optional[int] = None):
+    def __draw_by_type(cls,
+                       pic: PicGenerator,
+                       images: Dict[Tuple[str, str], Image.Image],
+                       modules_map: Dict[int, List[Dict[str, Any]]],
+                       dynamic_type: int,
+                       card: Dict[str, Any],
+                       dynamic_id: int,
+                       display: Dict[str, Any],
+                       text_margin: int,
+                       img_margin: int,
+                       forward: bool,
+                       origin_dynamic_id: Optional[int] = None):
         """
         根据动态类型绘制动态图片
 
         Args:
             pic: 绘图器实例
+            images: 已获取的图片字典
+            modules_map: 动态 ID 和动态内容各区块信息列表组成的字典
             dynamic_type: 动态类型
             card: 动态信息
             dynamic_id: 动态 ID
@@ -168,120 +509,90 @@ class DynamicPicGenerator:
             text_margin: 文字外边距
             img_margin: 图片外边距
             forward: 当前是否为转发动态的源动态
+            origin_dynamic_id: 转发源动态 ID。默认：None
         """
+        modules = modules_map.get(dynamic_id, [])
 
-        async def download_img(mod: Dict[str, Any]):
-            """
-            下载表情图片
-
-            Args:
-                mod: 表情区块字典
-            """
-            mod["img"] = await open_url_image(mod["emoji"]["icon_url"])
-        
-        if dynamic_type == 2 or dynamic_type == 4:
-            # 有些动态带有标题，不显示标题会缺少上下文
-            modules_url =f"https://api.bilibili.com/x/polymer/web-dynamic/v1/detail?timezone_offset=-480&id={dynamic_id}&features=itemOpusStyle,opusBigCover,onlyfansVote"
-            modules = (await request("GET", modules_url, credential=get_credential()))["item"]["modules"]["module_dynamic"]["major"]["opus"]
-            title = modules["title"]
-            modules = modules["summary"]
-            if modules:
-                modules = modules["rich_text_nodes"]
-                if title is not None:
-                    modules.insert(0, {
-                        'orig_text': f"{title}\n",
-                        'text': f"{title}\n",
-                        'type': 'RICH_TEXT_NODE_TYPE_TEXT'
-                    })
-            else:
-                modules = []
-        else :
-            modules_url = f"https://api.bilibili.com/x/polymer/web-dynamic/v1/detail?timezone_offset=-480&id={dynamic_id}"
-            modules = (await request("GET", modules_url, credential=get_credential()))["item"]["modules"]["module_dynamic"]["desc"]
-            modules = modules["rich_text_nodes"] if modules else []
-
-        # 下载表情
-        download_picture_tasks = []
+        # 表情
         for module in modules:
             if module["type"] == "RICH_TEXT_NODE_TYPE_EMOJI":
-                download_picture_tasks.append(download_img(module))
-        await asyncio.gather(*download_picture_tasks)
+                module["img"] = cls.__get_image(images, module["emoji"]["icon_url"])
 
         if dynamic_type == 1:
             # 转发动态
-            await cls.__draw_content(pic, modules, text_margin, forward)
+            cls.__draw_content(pic, modules, text_margin, forward)
 
             if "origin" in card:
-                origin = json.loads(card["origin"])
+                origin = codec.loads(card["origin"])
                 origin_type = card["item"]["orig_type"]
                 origin_display = display["origin"]
 
                 origin_name = card["origin_user"]["info"]["uname"]
                 origin_name_at_param = [{"type": "RICH_TEXT_NODE_TYPE_AT", "text": f"@{origin_name}"}]
-                await cls.__draw_content(pic, origin_name_at_param, text_margin, True)
+                cls.__draw_content(pic, origin_name_at_param, text_margin, True)
 
-                await cls.__draw_by_type(pic, origin_type, origin, origin_dynamic_id, origin_display,
-                                         text_margin, img_margin, True)
+                cls.__draw_by_type(pic, images, modules_map, origin_type, origin, origin_dynamic_id, origin_display,
+                                   text_margin, img_margin, True)
         elif dynamic_type == 2:
             # 带图动态
-            await cls.__draw_content(pic, modules, text_margin, forward)
+            cls.__draw_content(pic, modules, text_margin, forward)
             if card["item"]["pictures"]:
-                await cls.__draw_picture_area(pic, card["item"]["pictures"], img_margin, forward)
+                cls.__draw_picture_area(pic, images, card["item"]["pictures"], img_margin, forward)
         elif dynamic_type == 4:
             # 纯文字动态
-            await cls.__draw_content(pic, modules, text_margin, forward)
+            cls.__draw_content(pic, modules, text_margin, forward)
         elif dynamic_type == 8:
             # 视频
-            await cls.__draw_content(pic, modules, text_margin, forward)
-            await cls.__draw_video_cover(pic, card["pic"], card["duration"], img_margin, forward)
+            cls.__draw_content(pic, modules, text_margin, forward)
+            cls.__draw_video_cover(pic, images, card["pic"], card["duration"], img_margin, forward)
             title_param = [{"type": "RICH_TEXT_NODE_TYPE_TEXT", "text": card["title"]}]
-            await cls.__draw_content(pic, title_param, img_margin, forward)
+            cls.__draw_content(pic, title_param, img_margin, forward)
         elif dynamic_type == 64:
             # 专栏
             title_param = [{"type": "RICH_TEXT_NODE_TYPE_TEXT", "text": card["title"]}]
-            await cls.__draw_content(pic, title_param, text_margin, forward)
-            await cls.__draw_article_cover(pic, card["origin_image_urls"], img_margin, forward)
+            cls.__draw_content(pic, title_param, text_margin, forward)
+            cls.__draw_article_cover(pic, images, card["origin_image_urls"], img_margin, forward)
             summary = limit_str_length(card['summary'].replace("\n", " "), 60)
             summary_param = [{"type": "RICH_TEXT_NODE_TYPE_TEXT", "text": summary}]
-            await cls.__draw_content(pic, summary_param, text_margin, forward)
+            cls.__draw_content(pic, summary_param, text_margin, forward)
         elif dynamic_type == 256:
             # 音频
-            await cls.__draw_content(pic, modules, text_margin, forward)
+            cls.__draw_content(pic, modules, text_margin, forward)
             title = limit_str_length(card["title"], 15)
-            await cls.__draw_audio_area(pic, card["cover"], title, card["typeInfo"], text_margin, forward)
+            cls.__draw_audio_area(pic, images, card["cover"], title, card["typeInfo"], text_margin, forward)
         elif dynamic_type == 2048:
             # 分享
-            await cls.__draw_content(pic, modules, text_margin, forward)
+            cls.__draw_content(pic, modules, text_margin, forward)
             title = limit_str_length(card["sketch"]["title"], 15)
             desc = limit_str_length(card["sketch"]["desc_text"], 18)
-            await cls.__draw_share_area(pic, card["sketch"]["cover_url"], title, desc, text_margin, forward)
+            cls.__draw_share_area(pic, images, card["sketch"]["cover_url"], title, desc, text_margin, forward)
         elif dynamic_type == 4200:
             # 直播
             title = limit_str_length(card["title"], 14)
             desc = f"{card['area_v2_name']} · {card['watched_show']}"
-            await cls.__draw_live_area(pic, card["cover"], title, desc, text_margin, forward)
+            cls.__draw_live_area(pic, images, card["cover"], title, desc, text_margin, forward)
         elif dynamic_type == 4300:
             # 收藏
             title = limit_str_length(card["title"], 14)
             desc = limit_str_length(f"{card['media_count']}个内容", 17)
-            await cls.__draw_live_area(pic, card["cover"], title, desc, text_margin, forward)
+            cls.__draw_live_area(pic, images, card["cover"], title, desc, text_margin, forward)
         elif dynamic_type == 4308:
             # 直播
             base = card["live_play_info"]
             title = limit_str_length(base["title"], 14)
             desc = f"{base['area_name']} {base['online']}人气"
-            await cls.__draw_live_area(pic, base["cover"], title, desc, text_margin, forward)
+            cls.__draw_live_area(pic, images, base["cover"], title, desc, text_margin, forward)
         else:
             notice_param = [{"type": "RICH_TEXT_NODE_TYPE_TEXT", "text": "暂不支持的动态类型"}]
-            await cls.__draw_content(pic, notice_param, text_margin, forward)
+            cls.__draw_content(pic, notice_param, text_margin, forward)
 
         # 附加卡片
         add_on_card = display["add_on_card_info"] if "add_on_card_info" in display else []
 
-        await cls.__draw_add_on_card(pic, add_on_card, text_margin, forward)
+        cls.__draw_add_on_card(pic, images, add_on_card, text_margin, forward)
 
     @classmethod
-    async def __get_content_line_imgs(cls, modules: List[Dict[str, Any]], width: int) -> List[Image.Image]:
+    def __get_content_line_imgs(cls, modules: List[Dict[str, Any]], width: int) -> List[Image.Image]:
         """
         逐行绘制动态内容主体
 
@@ -405,11 +716,11 @@ class DynamicPicGenerator:
         return imgs
 
     @classmethod
-    async def __draw_content(cls,
-                             pic: PicGenerator,
-                             modules: List[Dict[str, Any]],
-                             text_margin: int,
-                             forward: bool) -> PicGenerator:
+    def __draw_content(cls,
+                       pic: PicGenerator,
+                       modules: List[Dict[str, Any]],
+                       text_margin: int,
+                       forward: bool) -> PicGenerator:
         """
         绘制动态主体内容
 
@@ -421,7 +732,7 @@ class DynamicPicGenerator:
         """
         pic.set_pos(x=text_margin)
 
-        content_imgs = await cls.__get_content_line_imgs(modules, pic.width - (text_margin * 2))
+        content_imgs = cls.__get_content_line_imgs(modules, pic.width - (text_margin * 2))
 
         if forward and content_imgs:
             heights = (content_imgs[0].height + pic.row_space) * len(content_imgs)
@@ -432,16 +743,18 @@ class DynamicPicGenerator:
         return pic
 
     @classmethod
-    async def __draw_picture_area(cls,
-                                  pic: PicGenerator,
-                                  pictures: List[Dict[str, Any]],
-                                  img_margin: int,
-                                  forward: bool) -> PicGenerator:
+    def __draw_picture_area(cls,
+                            pic: PicGenerator,
+                            images: Dict[Tuple[str, str], Image.Image],
+                            pictures: List[Dict[str, Any]],
+                            img_margin: int,
+                            forward: bool) -> PicGenerator:
         """
         绘制动态主体下方图片区域
 
         Args:
             pic: 绘图器实例
+            images: 已获取的图片字典
             pictures: 图片信息字典
             img_margin: 图片外边距
             forward: 当前是否为转发动态的源动态
@@ -450,33 +763,9 @@ class DynamicPicGenerator:
 
         # 下载图片
         picture_count = len(pictures)
-        if picture_count == 1:
-            line_count = 1
-            size = 0
-        elif picture_count == 2 or picture_count == 4:
-            line_count = 2
-            size = int((pic.width - (img_margin * 3)) / 2)
-        else:
-            line_count = 3
-            size = int((pic.width - (img_margin * 4)) / 3)
+        line_count, size = cls.__get_picture_layout(picture_count, pic.width, img_margin)
 
-        download_picture_tasks = []
-        for picture in pictures:
-            if line_count == 1:
-                download_picture_tasks.append(open_url_image(f"{picture['img_src']}@518w.webp"))
-            elif line_count == 2:
-                src = picture['img_src']
-                if picture["img_height"] / picture["img_width"] >= 3:
-                    download_picture_tasks.append(open_url_image(f"{src}@{size}w_{size}h_!header.webp"))
-                else:
-                    download_picture_tasks.append(open_url_image(f"{src}@{size}w_{size}h_1e_1c.webp"))
-            else:
-                src = picture['img_src']
-                if picture["img_height"] / picture["img_width"] >= 3:
-                    download_picture_tasks.append(open_url_image(f"{src}@{size}w_{size}h_!header.webp"))
-                else:
-                    download_picture_tasks.append(open_url_image(f"{src}@{size}w_{size}h_1e_1c.webp"))
-        imgs = await asyncio.gather(*download_picture_tasks)
+        imgs = [cls.__get_image(images, url) for url in cls.__get_picture_urls(pictures, pic.width, img_margin)]
 
         img_list = []
         for i, img in enumerate(imgs):
@@ -518,17 +807,19 @@ class DynamicPicGenerator:
         return pic
 
     @classmethod
-    async def __draw_video_cover(cls,
-                                 pic: PicGenerator,
-                                 url: str,
-                                 duration: int,
-                                 img_margin: int,
-                                 forward: bool) -> PicGenerator:
+    def __draw_video_cover(cls,
+                           pic: PicGenerator,
+                           images: Dict[Tuple[str, str], Image.Image],
+                           url: str,
+                           duration: int,
+                           img_margin: int,
+                           forward: bool) -> PicGenerator:
         """
         绘制视频封面
 
         Args:
             pic: 绘图器实例
+            images: 已获取的图片字典
             url: 视频封面 URL
             duration: 视频时长
             img_margin: 图片外边距
@@ -536,7 +827,7 @@ class DynamicPicGenerator:
         """
         pic.set_pos(x=img_margin)
 
-        cover = await open_url_image(f"{url}@480w.webp")
+        cover = cls.__get_image(images, f"{url}@480w.webp")
         cover = cover.resize(((pic.width - (img_margin * 2)),
                               int((pic.width - (img_margin * 4)) / (cover.size[0] / cover.size[1]))),
                              Resampling.LANCZOS)
@@ -569,16 +860,18 @@ class DynamicPicGenerator:
         return pic
 
     @classmethod
-    async def __draw_article_cover(cls,
-                                   pic: PicGenerator,
-                                   urls: List[str],
-                                   img_margin: int,
-                                   forward: bool) -> PicGenerator:
+    def __draw_article_cover(cls,
+                             pic: PicGenerator,
+                             images: Dict[Tuple[str, str], Image.Image],
+                             urls: List[str],
+                             img_margin: int,
+                             forward: bool) -> PicGenerator:
         """
         绘制专栏封面
 
         Args:
             pic: 绘图器实例
+            images: 已获取的图片字典
             urls: 专栏封面 URL 列表
             img_margin: 图片外边距
             forward: 当前是否为转发动态的源动态
@@ -587,14 +880,7 @@ class DynamicPicGenerator:
 
         img_count = len(urls)
 
-        download_picture_tasks = []
-        for url in urls:
-            if img_count == 1:
-                download_picture_tasks.append(open_url_image(f"{url}@518w.webp"))
-            else:
-                size = int((pic.width - (img_margin * 4)) / 3)
-                download_picture_tasks.append(open_url_image(f"{url}@{size}w_{size}h_1e_1c.webp"))
-        imgs = await asyncio.gather(*download_picture_tasks)
+        imgs = [cls.__get_image(images, url) for url in cls.__get_article_urls(urls, pic.width, img_margin)]
 
         if img_count == 1:
             img = imgs[0]
@@ -616,39 +902,43 @@ class DynamicPicGenerator:
         return pic
 
     @classmethod
-    async def __draw_audio_area(cls,
-                                pic: PicGenerator,
-                                cover_url: str,
-                                title: str,
-                                audio_type: str,
-                                margin: int,
-                                forward: bool) -> PicGenerator:
+    def __draw_audio_area(cls,
+                          pic: PicGenerator,
+                          images: Dict[Tuple[str, str], Image.Image],
+                          cover_url: str,
+                          title: str,
+                          audio_type: str,
+                          margin: int,
+                          forward: bool) -> PicGenerator:
         """
         绘制音频卡片
 
         Args:
             pic: 绘图器实例
+            images: 已获取的图片字典
             cover_url: 音频封面 URL
             title: 音频标题
             audio_type: 音频类型
             margin: 外边距
             forward: 当前是否为转发动态的源动态
         """
-        return await cls.__draw_share_area(pic, cover_url, title, audio_type, margin, forward)
+        return cls.__draw_share_area(pic, images, cover_url, title, audio_type, margin, forward)
 
     @classmethod
-    async def __draw_share_area(cls,
-                                pic: PicGenerator,
-                                cover_url: str,
-                                title: str,
-                                desc: str,
-                                margin: int,
-                                forward: bool) -> PicGenerator:
+    def __draw_share_area(cls,
+                          pic: PicGenerator,
+                          images: Dict[Tuple[str, str], Image.Image],
+                          cover_url: str,
+                          title: str,
+                          desc: str,
+                          margin: int,
+                          forward: bool) -> PicGenerator:
         """
         绘制分享卡片
 
         Args:
             pic: 绘图器实例
+            images: 已获取的图片字典
             cover_url: 封面 URL
             title: 标题
             desc: 描述
@@ -657,7 +947,7 @@ class DynamicPicGenerator:
         """
         pic.set_pos(x=margin)
 
-        cover = await open_url_image(cover_url)
+        cover = cls.__get_image(images, cover_url)
         cover_size = int(pic.width / 4)
         cover = cover.resize((cover_size, cover_size), Resampling.LANCZOS).convert("RGBA")
         cover = mask_rounded_rectangle(cover)
@@ -679,18 +969,20 @@ class DynamicPicGenerator:
         return pic
 
     @classmethod
-    async def __draw_live_area(cls,
-                               pic: PicGenerator,
-                               cover_url: str,
-                               title: str,
-                               area: str,
-                               margin: int,
-                               forward: bool) -> PicGenerator:
+    def __draw_live_area(cls,
+                         pic: PicGenerator,
+                         images: Dict[Tuple[str, str], Image.Image],
+                         cover_url: str,
+                         title: str,
+                         area: str,
+                         margin: int,
+                         forward: bool) -> PicGenerator:
         """
         绘制直播卡片
 
         Args:
             pic: 绘图器实例
+            images: 已获取的图片字典
             cover_url: 直播封面 URL
             title: 直播标题
             area: 直播分区
@@ -699,7 +991,7 @@ class DynamicPicGenerator:
         """
         pic.set_pos(x=margin)
 
-        cover = await open_url_image(f"{cover_url}@203w_127h_1e_1c.webp")
+        cover = cls.__get_image(images, f"{cover_url}@203w_127h_1e_1c.webp")
 
         if forward:
             heights = cover.height + pic.row_space
@@ -717,16 +1009,18 @@ class DynamicPicGenerator:
         return pic
 
     @classmethod
-    async def __draw_add_on_card(cls,
-                                 pic: PicGenerator,
-                                 infos: List[Dict[str, Any]],
-                                 margin: int,
-                                 forward: bool) -> PicGenerator:
+    def __draw_add_on_card(cls,
+                           pic: PicGenerator,
+                           images: Dict[Tuple[str, str], Image.Image],
+                           infos: List[Dict[str, Any]],
+                           margin: int,
+                           forward: bool) -> PicGenerator:
         """
         绘制附加卡片
 
         Args:
             pic: 绘图器实例
+            images: 已获取的图片字典
             infos: 附加卡片信息
             margin: 外边距
             forward: 当前是否为转发动态的源动态
@@ -736,7 +1030,7 @@ class DynamicPicGenerator:
         card_height = int(pic.width / 4)
 
         padding = 10
-        img_height = card_height - padding * 2
+        img_height = cls.__get_add_on_img_height(pic.width)
         edge = pic.width - margin - padding
 
         for info in infos:
@@ -757,13 +1051,11 @@ class DynamicPicGenerator:
             card_type = info["add_on_card_show_type"]
             if card_type == 1:
                 # 淘宝
-                goods = json.loads(info["goods_card"])["list"]
+                goods = codec.loads(info["goods_card"])["list"]
 
-                download_picture_tasks = []
-                for good in goods:
-                    url = good["img"]
-                    download_picture_tasks.append(open_url_image(f"{url}@{img_height}w_{img_height}h_1e_1c.webp"))
-                imgs = await asyncio.gather(*download_picture_tasks)
+                imgs = [
+                    cls.__get_image(images, f"{good['img']}@{img_height}w_{img_height}h_1e_1c.webp") for good in goods
+                ]
 
                 if len(goods) == 1:
                     img = mask_rounded_rectangle(imgs[0])
@@ -800,7 +1092,7 @@ class DynamicPicGenerator:
                     desc_first = base["desc_first"]
                     desc_second = base["desc_second"]
 
-                    cover = await open_url_image(f"{url}@{img_height}w_{img_height}h_1e_1c.webp")
+                    cover = cls.__get_image(images, f"{url}@{img_height}w_{img_height}h_1e_1c.webp")
                     cover = mask_rounded_rectangle(cover)
 
                     x, y = pic.xy
@@ -820,7 +1112,7 @@ class DynamicPicGenerator:
                     pic.set_pos(x=margin).move_pos(0, img_height + pic.row_space)
             elif card_type == 3:
                 # 投票
-                vote = json.loads(info["vote_card"])
+                vote = codec.loads(info["vote_card"])
                 desc = limit_str_length(vote["desc"], 15)
                 join_num = vote["join_num"]
                 icon = Image.open(f"{cls.__resource_base_path}/resource/tick_big.png")
@@ -836,7 +1128,7 @@ class DynamicPicGenerator:
                 url = base["image_url"]
                 title = limit_str_length(base["title"], 12)
                 desc_second = base["desc_second"]
-                cover = await open_url_image(f"{url}@480w.webp")
+                cover = cls.__get_image(images, f"{url}@480w.webp")
                 cover = cover.resize((int(img_height / cover.height * cover.width), img_height), Resampling.LANCZOS)
                 cover = mask_rounded_rectangle(cover)
 
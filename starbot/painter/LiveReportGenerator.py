@@ -1,14 +1,13 @@
 import base64
 import bisect
+import hashlib
 import io
 import math
 import os
-from collections import Counter
 from datetime import datetime
 from io import BytesIO
 from typing import Union, Tuple, List, Dict, Any
 
-import jieba
 import numpy as np
 from PIL import Image
 from loguru import logger
@@ -21,16 +20,30 @@ from .PicGenerator import Color, PicGenerator
 from .RankingGenerator import RankingGenerator
 from ..core.model import LiveReport
 from ..utils import config
+from ..utils.danmu_cloud import cut_words
 from ..utils.utils import split_list, limit_str_length, mask_round, timestamp_format
 
-jieba.setLogLevel(jieba.logging.INFO)
-
 
 class LiveReportGenerator:
     """
     直播报告生成器
     """
 
+    @classmethod
+    def get_key(cls, param: Dict[str, Any], model: LiveReport) -> str:
+        """
+        获取直播报告图片的键，同一场直播的直播报告参数和直播报告配置均相同时，生成的直播报告图片相同
+
+        Args:
+            param: 直播报告参数
+            model: 直播报告配置实例
+
+        Returns:
+            直播报告图片的键
+        """
+        model_hash = hashlib.md5(model.json().encode()).hexdigest()
+        return f"LiveReport:{param['room_id']}:{param['start_timestamp']}:{param['end_timestamp']}:{model_hash}"
+
     @classmethod
     def generate(cls, param: Dict[str, Any], model: LiveReport) -> str:
         """
@@ -44,14 +57,11 @@ class LiveReportGenerator:
             直播报告图片的 Base64 字符串
         """
         width = 1000
-        height = 100000
         top_blank = 75
         margin = 50
 
-        generator = PicGenerator(width, height)
-        pic = (generator.set_pos(margin, top_blank + margin)
-               .draw_rounded_rectangle(0, top_blank, width, height - top_blank, 35, Color.WHITE)
-               .copy_bottom(35))
+        generator = PicGenerator(width)
+        pic = generator.set_pos(margin, top_blank + margin).draw_background(Color.WHITE, 35, top_blank)
 
         # 标题
         pic.draw_chapter("直播报告")
@@ -367,17 +377,10 @@ class LiveReportGenerator:
 
         # 弹幕词云
         if model.danmu_cloud:
-            all_danmu = param.get('all_danmu', [])
-
-            if config.get("DANMU_CLOUD_DICT"):
-                try:
-                    jieba.load_userdict(config.get("DANMU_CLOUD_DICT"))
-                except Exception:
-                    logger.error("载入弹幕词云自定义词典失败, 请检查配置的词典路径是否正确")
-
-            all_danmu_str = " ".join(all_danmu)
-            words = list(jieba.cut(all_danmu_str))
-            counts = dict(Counter(words))
+            if "danmu_words" in param:
+                counts = dict(param["danmu_words"])
+            else:
+                counts = dict(cut_words(param.get("all_danmu", [])))
 
             if config.get("DANMU_CLOUD_STOP_WORDS"):
                 try:
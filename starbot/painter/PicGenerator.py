@@ -57,7 +57,7 @@ class PicGenerator:
 
     def __init__(self,
                  width: int,
-                 height: int,
+                 height: Optional[int] = None,
                  normal_font: str = config.get("PAINTER_NORMAL_FONT"),
                  bold_font: str = config.get("PAINTER_BOLD_FONT")):
         """
@@ -65,12 +65,15 @@ class PicGenerator:
 
         Args:
             width: 画布宽度
-            height: 画布高度
+            height: 画布高度，为 None 时创建可增长画布，绘制内容超出画布底部时自动按块扩展画布高度。默认：None
             normal_font: 普通字体路径。默认：config.get("PAINTER_NORMAL_FONT") = "normal.ttf"
             bold_font: 粗体字体路径。默认：config.get("PAINTER_BOLD_FONT") = "bold.ttf"
         """
+        self.__GROW_STEP = 1000
+        self.__growable = height is None
+
         self.__width = width
-        self.__height = height
+        self.__height = height if height is not None else self.__GROW_STEP
         self.__canvas = Image.new("RGBA", (self.width, self.height))
         self.__draw = ImageDraw.Draw(self.__canvas)
 
@@ -84,6 +87,7 @@ class PicGenerator:
         self.__ROW_SPACE = 25
 
         self.__bottom_pic = None
+        self.__background = None
 
     @property
     def width(self):
@@ -113,6 +117,42 @@ class PicGenerator:
     def img(self):
         return self.__canvas
 
+    def __set_canvas(self, canvas: Image.Image):
+        """
+        替换画布
+
+        Args:
+            canvas: 新画布
+        """
+        self.__canvas = canvas
+        self.__draw = ImageDraw.Draw(canvas)
+        self.__height = canvas.height
+
+    def __ensure_height(self, bottom: Union[int, float]):
+        """
+        确保画布高度足以绘制到指定位置，仅在可增长画布中生效
+        画布高度不足时按块扩展，每次至少扩展至原高度的 1.5 倍，新增区域会填充背景颜色
+
+        Args:
+            bottom: 需要绘制到的 Y 坐标
+        """
+        bottom = int(bottom) + 1
+        if not self.__growable or bottom <= self.height:
+            return
+
+        height = max(int(self.height * 1.5), bottom)
+        height = (height + self.__GROW_STEP - 1) // self.__GROW_STEP * self.__GROW_STEP
+
+        old_height = self.height
+        canvas = Image.new("RGBA", (self.width, height))
+        canvas.paste(self.__canvas, (0, 0))
+        self.__canvas.close()
+        self.__set_canvas(canvas)
+
+        if self.__background is not None:
+            color, _, top = self.__background
+            self.__draw.rectangle(((0, max(old_height, top)), (self.width, height)), color)
+
     def set_row_space(self, row_space: int):
         """
         设置默认行距
@@ -147,11 +187,33 @@ class PicGenerator:
         self.__xy = self.x + x, self.y + y
         return self
 
+    def draw_background(self,
+                        color: Union[Color, Tuple[int, int, int]],
+                        radius: int = 0,
+                        top: int = 0):
+        """
+        绘制画布背景，背景为从指定位置开始向下铺满画布的圆角矩形，此方法不会移动绘图坐标
+        与 crop_and_paste_bottom() 函数配合，内容绘制结束时剪裁底部多余区域并绘制背景底部圆角
+        可增长画布扩展高度时，新增区域会自动填充背景颜色
+
+        Args:
+            color: 背景颜色
+            radius: 背景圆角半径。默认：0
+            top: 背景顶部的 Y 坐标。默认：0
+        """
+        if isinstance(color, Color):
+            color = color.value
+
+        self.__background = color, radius, top
+        self.__draw.rounded_rectangle(((0, top), (self.width, self.height + radius)), radius, color)
+        return self
+
     def copy_bottom(self, height: int):
         """
         拷贝指定高度的画布底部图片
         与 crop_and_paste_bottom() 函数配合
         在事先不能确定画布高度时，先创建一个高度极大的画布，内容绘制结束时剪裁底部多余区域并将底部图片粘贴回原位
+        推荐使用可增长画布与 draw_background() 函数代替
 
         Args:
             height: 拷贝高度，从图片底部计算
@@ -161,14 +223,26 @@ class PicGenerator:
 
     def crop_and_paste_bottom(self):
         """
-        内容绘图结束后，根据当前绘图坐标剪裁多余的底部区域，并将事先拷贝的底部图片粘贴回底部
+        内容绘图结束后，根据当前绘图坐标剪裁多余的底部区域，并将事先拷贝的底部图片或背景底部圆角绘制到底部
         """
-        if self.__bottom_pic is None:
-            self.__canvas = self.__canvas.crop((0, 0, self.width, self.y))
+        if self.__bottom_pic is not None:
+            self.__ensure_height(self.y + self.__bottom_pic.height - 1)
+            self.__set_canvas(self.__canvas.crop((0, 0, self.width, self.y + self.__bottom_pic.height)))
+            self.draw_img(self.__bottom_pic, (0, self.y))
+            return self
+
+        if self.__background is None or self.__background[1] == 0:
+            self.__set_canvas(self.__canvas.crop((0, 0, self.width, self.y)))
             return self
 
-        self.__canvas = self.__canvas.crop((0, 0, self.width, self.y + self.__bottom_pic.height))
-        self.draw_img(self.__bottom_pic, (0, self.y))
+        color, radius, _ = self.__background
+        self.__ensure_height(self.y + radius - 1)
+        self.__set_canvas(self.__canvas.crop((0, 0, self.width, self.y + radius)))
+
+        bottom = Image.new("RGBA", (self.width, radius * 2))
+        ImageDraw.Draw(bottom).rounded_rectangle(((0, 0), (self.width, radius * 2)), radius, color)
+        self.draw_img(bottom.crop((0, radius, self.width, radius * 2)), (0, self.y))
+        bottom.close()
         return self
 
     def draw_rectangle(self,
@@ -190,6 +264,7 @@ class PicGenerator:
         if isinstance(color, Color):
             color = color.value
 
+        self.__ensure_height(y + height)
         self.__draw.rectangle(((x, y), (x + width, y + height)), color)
         return self
 
@@ -214,6 +289,7 @@ class PicGenerator:
         if isinstance(color, Color):
             color = color.value
 
+        self.__ensure_height(y + height)
         self.__draw.rounded_rectangle(((x, y), (x + width, y + height)), radius, color)
         return self
 
@@ -269,6 +345,8 @@ class PicGenerator:
         if isinstance(img, str):
             img = Image.open(img)
 
+        self.__ensure_height((xy or self.__xy)[1] + img.height - 1)
+
         if xy is None:
             self.__canvas.paste(img, self.__xy)
             self.move_pos(0, img.height + self.__ROW_SPACE)
@@ -292,6 +370,8 @@ class PicGenerator:
         if isinstance(img, str):
             img = Image.open(img)
 
+        self.__ensure_height((xy or self.__xy)[1] + img.height - 1)
+
         if xy is None:
             self.__canvas.paste(img, self.__xy, img)
             self.move_pos(0, img.height + self.__ROW_SPACE)
@@ -353,6 +433,8 @@ class PicGenerator:
         if isinstance(color, Color):
             color = color.value
 
+        self.__ensure_height((xy or self.__xy)[1] + self.__chapter_font.size * 2)
+
         if xy is None:
             self.__draw.text(self.__xy, chapter, color, self.__chapter_font)
             self.move_pos(0, self.__chapter_font.size + self.__ROW_SPACE)
@@ -385,6 +467,8 @@ class PicGenerator:
         if isinstance(color, Color):
             color = color.value
 
+        self.__ensure_height((xy or self.__xy)[1] + self.__section_font.size * 2)
+
         if xy is None:
             self.__draw.text(self.__xy, section, color, self.__section_font)
             self.move_pos(0, self.__section_font.size + self.__ROW_SPACE)
@@ -417,6 +501,8 @@ class PicGenerator:
         if isinstance(color, Color):
             color = color.value
 
+        self.__ensure_height((xy or self.__xy)[1] + self.__tip_font.size * 2)
+
         if xy is None:
             self.__draw.text(self.__xy, tip, color, self.__tip_font)
             self.move_pos(0, self.__tip_font.size + self.__ROW_SPACE)
@@ -464,6 +550,8 @@ class PicGenerator:
             if isinstance(colors[i], Color):
                 colors[i] = colors[i].value
 
+        self.__ensure_height((xy or self.__xy)[1] + self.__text_font.size * 2)
+
         if xy is None:
             x = self.x
             for i in range(len(texts)):
@@ -557,6 +645,7 @@ class PicGenerator:
                     length = int(self.__draw.textlength(c, self.__text_font))
                     if self.x + length > self.width - margin:
                         self.move_pos(x - self.x, self.__text_font.size + self.__ROW_SPACE)
+                    self.__ensure_height(self.y + self.__text_font.size * 2)
                     self.__draw.text(self.__xy, c, colors[i], self.__text_font)
                     self.move_pos(int(self.__draw.textlength(c, self.__text_font)), 0)
             self.move_pos(x - self.x, self.__text_font.size + self.__ROW_SPACE)
@@ -567,6 +656,7 @@ class PicGenerator:
                     length = int(self.__draw.textlength(c, self.__text_font))
                     if xy[0] + length > self.width - margin:
                         xy = x, xy[1] + self.__text_font.size + self.__ROW_SPACE
+                    self.__ensure_height(xy[1] + self.__text_font.size * 2)
                     self.__draw.text(xy, c, colors[i], self.__text_font)
                     xy = xy[0] + self.__draw.textlength(c, self.__text_font), xy[1]
         return self
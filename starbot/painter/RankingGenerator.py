@@ -181,3 +181,54 @@ class RankingGenerator:
             chart.set_pos(x=0)
 
         return chart.img
+
+    @classmethod
+    def generate(cls,
+                 title: str,
+                 subtitle: str,
+                 tips: List[str],
+                 faces: List[Image.Image],
+                 unames: List[str],
+                 counts: Union[List[int], List[float]],
+                 top_count: Optional[Union[int, float]] = None,
+                 double: bool = False) -> str:
+        """
+        生成排行榜命令图片
+
+        Args:
+            title: 标题
+            subtitle: 副标题
+            tips: 提示列表
+            faces: 头像图片列表，按照数量列表降序排序
+            unames: 昵称列表，按照数量列表降序排序
+            counts: 数量列表，降序排序
+            top_count: 第一名数量，后续排行条长度会基于此数量计算长度。默认：自动取数量列表中第一名
+            double: 是否绘制双向排行榜。默认：False
+
+        Returns:
+            排行榜图片的 Base64 字符串
+        """
+        width = 1000
+        margin = 50
+        pic = PicGenerator(width)
+        pic.set_pos(margin, margin).draw_background(Color.WHITE, 35)
+
+        pic.draw_section(title)
+        pic.draw_text(subtitle)
+        for tip in tips:
+            pic.draw_tip(tip)
+        pic.draw_text("")
+
+        if double:
+            ranking = cls.get_double_ranking(pic.row_space, faces, unames, counts, pic.width - (margin * 2), top_count)
+        else:
+            ranking = cls.get_ranking(pic.row_space, faces, unames, counts, pic.width - (margin * 2), top_count)
+        pic.draw_img_alpha(ranking)
+
+        # 底部版权信息，请务必保留此处
+        pic.draw_text("")
+        pic.draw_text_right(25, "Designed By StarBot", Color.GRAY)
+        pic.draw_text_right(25, "https://github.com/Starlwr/StarBot", Color.LINK)
+        pic.crop_and_paste_bottom()
+
+        return pic.base64()
@@ -3,7 +3,12 @@
 """
 
 import asyncio
-from typing import Any, Coroutine, Optional, Dict
+import sys
+import time
+from collections import Counter
+from typing import Any, Coroutine, Optional, Dict, List
+
+from loguru import logger
 
 
 class AsyncEvent:
@@ -11,13 +16,76 @@ class AsyncEvent:
     发布-订阅模式异步事件类支持
 
     特殊事件：__ALL__ 所有事件均触发
+
+    默认每个事件的每个监听器均创建一个任务执行。设置队列长度后改为队列模式，事件放入有界队列，由固定数量的工作任务依次执行，
+    队列已满时按事件的处理策略处理：
+    + critical: 关键事件，不放入队列，立即创建任务执行，永不丢弃
+    + keep: 队列已满时仍放入队列，与其他事件按顺序执行，仅在队列长度达到硬上限时丢弃并输出警告
+    + drain: 同 keep，且等待此前放入队列的事件全部执行完成后再执行，用于依赖此前事件处理结果的事件
+    + drop: 队列已满时丢弃
+    + coalesce: 队列中已有同名事件等待执行时，仅以新数据替换原有数据，不重复放入队列
+    仅有一个工作任务时，队列中的事件严格按发布顺序执行
+    发布方可在发布事件后调用 wait_for_queue 等待队列长度降至队列长度以下，以施加背压
     """
 
+    POLICY_CRITICAL = "critical"
+    POLICY_KEEP = "keep"
+    POLICY_DRAIN = "drain"
+    POLICY_DROP = "drop"
+    POLICY_COALESCE = "coalesce"
+
     __handlers: Optional[Dict] = {}
     __running_tasks = set()
+    __names: Dict[str, str] = {}
 
-    def __init__(self):
+    def __init__(self,
+                 queue_size: int = 0,
+                 workers: int = 1,
+                 policies: Optional[Dict[str, str]] = None,
+                 default_policy: str = POLICY_DROP,
+                 hard_limit: int = 0):
+        """
+        Args:
+            queue_size: 事件队列长度，设置为 0 时不使用队列模式。默认：0
+            workers: 队列模式下执行事件的工作任务数。默认：1
+            policies: 队列模式下各事件的处理策略。默认：None
+            default_policy: 队列模式下未指定处理策略的事件的处理策略。默认：drop
+            hard_limit: 队列长度硬上限，达到后 keep 和 drain 事件同样丢弃，设置为 0 时为队列长度的 4 倍。默认：0
+        """
         self.__handlers = {}
+        self.__has_all = False
+        self.__queue_size = queue_size
+        self.__hard_limit = hard_limit if hard_limit > 0 else queue_size * 4
+        self.__space: Optional[asyncio.Event] = None
+        self.__warn_time = 0.0
+        self.__worker_count = max(workers, 1)
+        self.__policies = {k.upper(): v for k, v in (policies or {}).items()}
+        self.__default_policy = default_policy
+        self.__queue: Optional[asyncio.Queue] = None
+        self.__workers: List[asyncio.Task] = []
+        self.__active = 0
+        self.__draining = 0
+        self.__idle: Optional[asyncio.Condition] = None
+        self.__pending: Dict[str, list] = {}
+        self.__dropped = Counter()
+        self.__coalesced = Counter()
+
+    @classmethod
+    def __normalize(cls, name: str) -> str:
+        """
+        将事件名转换为大写并驻留，转换结果会被缓存，避免每次发布事件时重复转换
+
+        Args:
+            name: 事件名
+
+        Returns:
+            转换后的事件名
+        """
+        normalized = cls.__names.get(name)
+        if normalized is None:
+            normalized = sys.intern(name.upper())
+            cls.__names[name] = normalized
+        return normalized
 
     def add_event_listener(self, name: str, handler: Coroutine):
         """
@@ -27,10 +95,11 @@ class AsyncEvent:
             name: 事件名
             handler: 回调异步函数
         """
-        name = name.upper()
+        name = self.__normalize(name)
         if name not in self.__handlers:
             self.__handlers[name] = []
         self.__handlers[name].append(handler)
+        self.__has_all = '__ALL__' in self.__handlers
 
     def on(self, event_name: str):
         """
@@ -57,13 +126,29 @@ class AsyncEvent:
         Returns:
             是否移除成功
         """
-        name = name.upper()
+        name = self.__normalize(name)
         if name in self.__handlers:
             if handler in self.__handlers[name]:
                 self.__handlers[name].remove(handler)
+                # 移除空列表，使发布事件时可直接判断是否存在监听器
+                if not self.__handlers[name]:
+                    self.__handlers.pop(name)
+                    self.__has_all = '__ALL__' in self.__handlers
                 return True
         return False
 
+    def has_listener(self, name: str) -> bool:
+        """
+        是否存在会被指定事件触发的监听器，包括 __ALL__ 事件的监听器
+
+        Args:
+            name: 事件名
+
+        Returns:
+            是否存在监听器
+        """
+        return self.__has_all or self.__normalize(name) in self.__handlers
+
     def dispatch(self, name: str, data: Any = None):
         """
         异步发布事件
@@ -72,15 +157,156 @@ class AsyncEvent:
             name: 事件名
             data: 事件附加数据。默认：None
         """
-        name = name.upper()
+        name = self.__normalize(name)
+        # 无监听器时直接返回
+        if not self.__has_all and name not in self.__handlers:
+            return
+
+        if self.__queue_size <= 0 or self.__policies.get(name) == self.POLICY_CRITICAL:
+            self.__dispatch_tasks(name, data)
+            return
+
+        policy = self.__policies.get(name, self.__default_policy)
+        if policy == self.POLICY_COALESCE and name in self.__pending:
+            self.__pending[name][1] = data
+            self.__coalesced[name] += 1
+            return
+
+        if self.__queue is None:
+            self.__queue = asyncio.Queue()
+            self.__idle = asyncio.Condition()
+            self.__space = asyncio.Event()
+            self.__space.set()
+
+        # 队列长度限制仅对可丢弃的事件生效，不可丢弃的事件在达到硬上限前始终放入队列，保证与其他事件的执行顺序
+        size = self.__queue.qsize()
+        if policy not in (self.POLICY_KEEP, self.POLICY_DRAIN):
+            if size >= self.__queue_size:
+                self.__dropped[name] += 1
+                return
+        elif size >= self.__hard_limit:
+            self.__dropped[name] += 1
+            now = time.monotonic()
+            if now - self.__warn_time >= 60:
+                self.__warn_time = now
+                logger.warning(f"事件队列长度已达到上限 {self.__hard_limit}, 不可丢弃的事件也将被丢弃, "
+                               f"累计丢弃: {dict(self.__dropped)}")
+            return
+
+        item = [name, data]
+        self.__queue.put_nowait(item)
+        if size + 1 >= self.__queue_size:
+            self.__space.clear()
+
+        if policy == self.POLICY_COALESCE:
+            self.__pending[name] = item
+
+        if not self.__workers:
+            self.__workers = [asyncio.create_task(self.__work()) for _ in range(self.__worker_count)]
+
+    def __dispatch_tasks(self, name: str, data: Any):
+        """
+        为事件的每个监听器创建任务执行
+
+        Args:
+            name: 事件名
+            data: 事件附加数据
+        """
         if name in self.__handlers:
             for coroutine in self.__handlers[name]:
                 task = asyncio.create_task(coroutine(data))
                 self.__running_tasks.add(task)
                 task.add_done_callback(lambda t: self.__running_tasks.remove(t))
 
-        if name != '__ALL__':
-            self.dispatch('__ALL__', {
+        if self.__has_all and name != '__ALL__':
+            self.__dispatch_tasks('__ALL__', {
                 "name": name,
                 "data": data
             })
+
+    async def __work(self):
+        """
+        队列模式的工作任务，依次执行队列中的事件
+        """
+        queue, idle = self.__queue, self.__idle
+        # 停止工作任务后队列和计数均已重置，此时退出
+        while idle is self.__idle:
+            item = await queue.get()
+            if queue.qsize() < self.__queue_size:
+                self.__space.set()
+            name = item[0]
+            if self.__pending.get(name) is item:
+                self.__pending.pop(name)
+            data = item[1]
+
+            # drain 事件等待其他工作任务中此前取出的事件执行完成，等待和执行期间其他工作任务暂停执行后续事件
+            drain = self.__policies.get(name, self.__default_policy) == self.POLICY_DRAIN
+            async with idle:
+                if drain:
+                    self.__draining += 1
+                    await idle.wait_for(lambda: self.__active == 0)
+                else:
+                    await idle.wait_for(lambda: self.__draining == 0)
+                self.__active += 1
+
+            try:
+                for handler in list(self.__handlers.get(name, ())):
+                    await self.__call(handler, data)
+
+                if self.__has_all and name != '__ALL__':
+                    for handler in list(self.__handlers.get('__ALL__', ())):
+                        await self.__call(handler, {"name": name, "data": data})
+            finally:
+                # 停止工作任务后计数已重置，被取消的工作任务不再修改计数
+                if idle is self.__idle:
+                    self.__active -= 1
+                    if drain:
+                        self.__draining -= 1
+                    async with idle:
+                        idle.notify_all()
+
+    @staticmethod
+    async def __call(handler: Coroutine, data: Any):
+        try:
+            await handler(data)
+        except Exception as e:
+            logger.exception(f"事件监听器执行异常: {e}")
+
+    def stop_workers(self):
+        """
+        停止队列模式的工作任务，并清空队列中未执行的事件
+        """
+        for worker in self.__workers:
+            worker.cancel()
+        self.__workers = []
+        if self.__queue is not None:
+            while not self.__queue.empty():
+                self.__queue.get_nowait()
+        self.__queue = None
+        self.__idle = None
+        if self.__space is not None:
+            self.__space.set()
+            self.__space = None
+        self.__active = 0
+        self.__draining = 0
+        self.__pending.clear()
+
+    async def wait_for_queue(self):
+        """
+        队列模式下等待队列长度降至队列长度以下，未使用队列模式或队列未满时立即返回
+        """
+        if self.__space is not None:
+            await self.__space.wait()
+
+    def get_queue_stats(self) -> Dict[str, Any]:
+        """
+        获取队列模式的统计信息
+
+        Returns:
+            包含队列中等待执行的事件数、各事件被丢弃次数和被合并次数的字典
+        """
+        return {
+            "size": self.__queue.qsize() if self.__queue is not None else 0,
+            "dropped": dict(self.__dropped),
+            "coalesced": dict(self.__coalesced)
+        }
@@ -0,0 +1,152 @@
+"""
+自适应速率限制器，同时限制请求速率和并发数，触发风控时自动降低速率，请求成功后逐步恢复
+"""
+
+import asyncio
+import time
+from typing import Optional, Dict, Any
+
+
+class RateLimiter:
+    """
+    令牌桶速率限制器
+
+    速率按加性增、乘性减的方式调整：触发风控时速率减半，每次请求成功后速率增加初始速率的十分之一，直至恢复为初始速率
+    同时有大量请求触发风控时，每秒或每次暂停放行期间至多减半一次，避免速率瞬间降至下限
+    """
+
+    def __init__(self, rate: float, burst: int = 1, concurrency: int = 0, min_rate: Optional[float] = None):
+        """
+        Args:
+            rate: 每秒允许通过的请求数，设置为 0 时不限制速率
+            burst: 令牌桶容量，即空闲后允许瞬间通过的请求数。默认：1
+            concurrency: 允许同时进行的请求数，设置为 0 时不限制并发数。默认：0
+            min_rate: 降低速率时的速率下限，默认为初始速率的二十分之一
+        """
+        self.__max_rate = rate
+        self.__min_rate = min_rate if min_rate is not None else rate / 20
+        self.__rate = rate
+        self.__burst = max(burst, 1)
+        self.__tokens = float(self.__burst)
+        self.__last_time = time.monotonic()
+        self.__blocked_until = 0.0
+        self.__last_backoff = 0.0
+        self.__lock = asyncio.Lock()
+        self.__semaphore = asyncio.Semaphore(concurrency) if concurrency > 0 else None
+
+        self.__waiting = 0
+        self.__running = 0
+        self.__acquired = 0
+        self.__backoffs = 0
+        self.__wait_time = 0.0
+
+    def __refill(self, now: float):
+        """
+        按经过的时间补充令牌
+
+        Args:
+            now: 当前时间
+        """
+        self.__tokens = min(self.__burst, self.__tokens + (now - self.__last_time) * self.__rate)
+        self.__last_time = now
+
+    async def acquire(self):
+        """
+        等待获取请求许可，请求结束后需调用 release 释放
+        """
+        start = time.monotonic()
+        self.__waiting += 1
+        try:
+            if self.__semaphore is not None:
+                await self.__semaphore.acquire()
+
+            try:
+                async with self.__lock:
+                    while True:
+                        now = time.monotonic()
+                        if now < self.__blocked_until:
+                            await asyncio.sleep(self.__blocked_until - now)
+                            continue
+
+                        if self.__max_rate <= 0:
+                            break
+
+                        self.__refill(now)
+                        if self.__tokens >= 1:
+                            self.__tokens -= 1
+                            break
+                        await asyncio.sleep((1 - self.__tokens) / self.__rate)
+            except BaseException:
+                if self.__semaphore is not None:
+                    self.__semaphore.release()
+                raise
+        finally:
+            self.__waiting -= 1
+
+        self.__running += 1
+        self.__acquired += 1
+        self.__wait_time += time.monotonic() - start
+
+    def release(self):
+        """
+        释放请求许可
+        """
+        self.__running -= 1
+        if self.__semaphore is not None:
+            self.__semaphore.release()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def backoff(self, cooldown: float = 0):
+        """
+        触发风控时调用，将速率减半，并可暂停放行一段时间
+
+        Args:
+            cooldown: 暂停放行的时长，单位：秒。默认：0
+        """
+        now = time.monotonic()
+        if self.__max_rate > 0 and now >= self.__blocked_until and now - self.__last_backoff >= 1:
+            self.__refill(now)
+            self.__rate = max(self.__rate / 2, self.__min_rate)
+            self.__last_backoff = now
+        if cooldown > 0:
+            self.__blocked_until = max(self.__blocked_until, now + cooldown)
+        self.__backoffs += 1
+
+    def recover(self):
+        """
+        请求成功时调用，逐步恢复速率
+        """
+        if self.__rate < self.__max_rate:
+            self.__refill(time.monotonic())
+            self.__rate = min(self.__rate + self.__max_rate / 10, self.__max_rate)
+
+    def get_rate(self) -> float:
+        """
+        获取当前速率
+
+        Returns:
+            每秒允许通过的请求数
+        """
+        return self.__rate
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            包含当前速率、等待中请求数、进行中请求数、累计通过请求数、累计降速次数和平均等待时长的字典
+        """
+        return {
+            "rate": self.__rate,
+            "waiting": self.__waiting,
+            "running": self.__running,
+            "acquired": self.__acquired,
+            "backoffs": self.__backoffs,
+            "average_wait": self.__wait_time / self.__acquired if self.__acquired else 0.0
+        }
@@ -0,0 +1,64 @@
+"""
+JSON 编解码模块，已安装 orjson 或 ujson 时优先使用，均未安装时使用标准库 json
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+if orjson is not None:
+    BACKEND = "orjson"
+elif ujson is not None:
+    BACKEND = "ujson"
+else:
+    BACKEND = "json"
+
+
+def loads(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+    """
+    解析 JSON
+
+    Args:
+        data: JSON 字符串或 UTF-8 编码的 JSON 字节数据
+
+    Returns:
+        解析结果
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+
+    if ujson is not None:
+        return ujson.loads(data)
+
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> str:
+    """
+    序列化为 JSON 字符串
+
+    Args:
+        obj: 要序列化的对象
+
+    Returns:
+        JSON 字符串
+    """
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+
+    if ujson is not None:
+        return ujson.dumps(obj, ensure_ascii=False)
+
+    return json.dumps(obj)
@@ -49,8 +49,12 @@ DEFAULT_CONFIG = {
     # 是否将日志同时输出到文件中
     "LOG_TO_FILE": True,
 
-    # 连接每个直播间的间隔等待时长，用于避免连接大量直播间时的并发过多异常 too many file descriptors in select()，单位：秒
-    "CONNECTION_INTERVAL": 2,
+    # 每秒最多开始连接的直播间数，连接触发风控时自动降低速率，连接成功后逐步恢复，设置为 0 时不限制速率
+    "LIVE_CONNECT_RATE": 5,
+    # 空闲后允许同时开始连接的直播间数
+    "LIVE_CONNECT_BURST": 10,
+    # 同时进行连接的最大直播间数，用于避免连接大量直播间时的并发过多异常 too many file descriptors in select()，设置为 0 时不限制
+    "LIVE_CONNECT_CONCURRENCY": 20,
     # 成功连接所有主播直播间的最大等待时长，可使得日志输出顺序更加易读，一般无需修改此处，设置为 0 会自适应计算，单位：秒
     "WAIT_FOR_ALL_CONNECTION_TIMEOUT": 0,
 
@@ -59,6 +63,69 @@ DEFAULT_CONFIG = {
     # 是否自动判断仅处理必要的直播事件，例如当某直播间的下播推送和直播报告中均不包含弹幕相关功能，则不再处理此直播间的弹幕事件，以节省性能
     "ONLY_HANDLE_NECESSARY_EVENT": False,
 
+    # 直播间断线重连的最大等待时长，重连等待时长随连续失败次数翻倍增长直至此值，单位：秒
+    "LIVE_RECONNECT_MAX_DELAY": 60,
+
+    # 直播间事件队列长度，设置后每个直播间的事件放入有界队列中由固定数量的任务处理，弹幕刷屏时避免创建大量任务占用内存，设置为 0 时不使用队列
+    # 队列已满时暂停读取该直播间的数据，直至队列中的事件处理后再继续。暂停前已收到的数据中，开播、下播、弹幕、礼物、醒目留言、上舰等计入直播数据统计的事件仍放入队列，人气等状态类事件仅保留最新一条，其余事件直接丢弃
+    "LIVE_EVENT_QUEUE_SIZE": 0,
+    # 直播间事件队列长度硬上限，达到后计入直播数据统计的事件同样丢弃并输出警告，设置为 0 时为队列长度的 4 倍
+    "LIVE_EVENT_QUEUE_HARD_LIMIT": 0,
+    # 每个直播间处理队列中事件的任务数，设置为 1 时同一直播间的事件严格按顺序处理，大于 1 时事件可能乱序处理
+    "LIVE_EVENT_QUEUE_WORKERS": 1,
+    # 自定义各事件队列已满时的处理策略，critical：不放入队列立即处理，keep：达到硬上限前不丢弃，drain：同 keep 且等待此前的事件处理完成，drop：丢弃，coalesce：仅保留最新一条，例：{"ENTRY_EFFECT": "drop"}
+    "LIVE_EVENT_QUEUE_POLICIES": {},
+
+    # 每个主机每秒最多发送的请求数，触发风控时自动降低速率，请求成功后逐步恢复，设置为 0 时不限制速率
+    "NETWORK_HOST_RATE": 10,
+    # 空闲后每个主机允许瞬间发送的请求数
+    "NETWORK_HOST_BURST": 20,
+    # 每个主机同时进行的最大请求数，设置为 0 时不限制
+    "NETWORK_HOST_CONCURRENCY": 16,
+    # 为指定主机单独设置请求限制，例：{"api.bilibili.com": {"rate": 5, "burst": 10, "concurrency": 8}}，自定义时需保留默认的主机设置
+    # 网页端观看心跳每个直播间每 30 秒发送一次，默认限制可支持约 1200 个直播间，直播间数量更多时需相应提高或关闭 LIVE_WEB_HEARTBEAT
+    "NETWORK_HOST_LIMITS": {
+        "live-trace.bilibili.com": {"rate": 40, "burst": 40, "concurrency": 16}
+    },
+    # 触发风控后暂停向该主机发送请求的时长，单位：秒
+    "NETWORK_RISK_COOLDOWN": 10,
+
+    # 接口 GET 请求缓存时间，仅缓存此处列出的接口，缓存有效期内直接返回缓存数据，同时进行的相同请求仅发送一次，设置为 0 时不缓存，单位：秒
+    "NETWORK_CACHE_TTL": {
+        "https://api.live.bilibili.com/room/v1/Room/get_info": 10,
+        "https://api.live.bilibili.com/xlive/app-ucenter/v1/fansMedal/fans_medal_info": 10,
+        "https://api.live.bilibili.com/xlive/app-room/v2/guardTab/topListNew": 10,
+        "https://api.live.bilibili.com/live_user/v1/Master/info": 600,
+        "https://api.live.bilibili.com/room/v1/Room/get_status_info_by_uids": 5,
+        "https://api.vc.bilibili.com/account/v1/user/cards": 300
+    },
+    # 接口缓存最大条数，超出时移除最久未使用的缓存
+    "NETWORK_CACHE_SIZE": 1024,
+
+    # WBI 签名密钥缓存时间，所有直播间连接和重连共享同一密钥，单位：秒
+    "WBI_KEYS_CACHE_TTL": 3600,
+    # 直播间真实房间号缓存时间，缓存于 Redis 中，连接时获取直播间信息失败的情况下使用缓存的真实房间号，设置为 0 时不缓存，单位：秒
+    "LIVE_ROOM_REAL_ID_CACHE_TTL": 604800,
+    # 直播间聊天服务器配置缓存时间，缓存于 Redis 中，重连时直接使用缓存的服务器地址和认证信息，设置为 0 时不缓存，单位：秒
+    "LIVE_CHAT_CONF_CACHE_TTL": 600,
+
+    # 是否在发送直播间心跳包时同时发送网页端观看心跳，关闭后可减少大量直播间时的 HTTP 请求数，心跳请求积压时自动跳过本次网页端观看心跳
+    "LIVE_WEB_HEARTBEAT": True,
+
+    # 直播间数据包解压和解析线程数，大数据包和高热度直播间的数据包在线程中解压和解析，避免阻塞其他直播间的事件处理
+    "LIVE_DECODE_THREADS": 2,
+    # 数据包大小超过此值时在线程中解压和解析，设置为 0 时全部在线程中处理，单位：字节
+    "LIVE_DECODE_THREAD_SIZE": 16384,
+    # 直播间每秒收到的数据包数量超过此值时，此直播间的数据包均在线程中解压和解析，设置为 0 时不按数据包数量判断
+    "LIVE_DECODE_THREAD_RATE": 200,
+
+    # 是否开启直播统计数据写回缓冲，开启后弹幕、礼物、SC、大航海等统计数据先在内存中合并，再批量写入 Redis，可降低高热度直播间对 Redis 的压力
+    "STATS_WRITE_BEHIND": False,
+    # 开启直播统计数据写回缓冲时，定时写入 Redis 的间隔，单位：毫秒
+    "STATS_FLUSH_INTERVAL": 1000,
+    # 开启直播统计数据写回缓冲时，缓冲事件数达到此数量后立即写入 Redis
+    "STATS_FLUSH_EVENTS": 1000,
+
     # 主播下播后再开播视为主播网络波动断线重连的时间间隔，在此时间内重新开播不会重新计算本次直播数据，且不重复 @全体成员，单位：秒
     "UP_DISCONNECT_CONNECT_INTERVAL": 120,
     # 视为主播网络波动断线重连时，需发送的额外提示消息
@@ -91,6 +158,48 @@ DEFAULT_CONFIG = {
     "DANMU_CLOUD_STOP_WORDS": "",
     # 弹幕词云自定义词典路径，存储时每行一个词，以纯文本方式存储，在对弹幕进行切词时，词典中的词不会被切分开
     "DANMU_CLOUD_DICT": "",
+    # 是否开启弹幕词云流式统计，开启后弹幕在直播过程中分批切词并累计词频，不再保存全部弹幕原文，可大幅降低长时间直播的内存占用和生成直播报告的耗时
+    "DANMU_CLOUD_STREAMING": False,
+    # 开启弹幕词云流式统计时，定时切词的间隔，单位：秒
+    "DANMU_CLOUD_STREAMING_INTERVAL": 5,
+    # 开启弹幕词云流式统计时，待切词弹幕数达到此数量后立即切词
+    "DANMU_CLOUD_STREAMING_BATCH": 500,
+    # 开启弹幕词云流式统计时，每个直播间保留的最高频词数量，0 为不限制。直播过程中会保留此数量四倍的词，避免仍在累计词频的词被过早移除
+    "DANMU_CLOUD_WORDS_LIMIT": 5000,
+
+    # 用户资料缓存存储方式，redis：存储于 Redis 中，file：存储于本地文件中
+    "PROFILE_STORE": "redis",
+    # 用户资料缓存存储于本地文件中时的存储目录
+    "PROFILE_STORE_PATH": "profiles",
+    # 用户资料缓存存储于本地文件中时，修改后延迟写入文件的时长，期间的多次修改合并为一次写入，单位：秒
+    "PROFILE_FILE_SAVE_DELAY": 10,
+    # 用户昵称和头像缓存的刷新间隔，超过此时长后仍先使用缓存，同时在后台刷新，单位：秒
+    "PROFILE_REFRESH_INTERVAL": 86400,
+    # 网络图片磁盘缓存目录，下载的头像、动态图片、封面等以 URL 的哈希值为文件名缓存于此目录中
+    "IMAGE_CACHE_PATH": "cache/images",
+    # 网络图片磁盘缓存有效期，单位：秒
+    "IMAGE_CACHE_EXPIRE": 604800,
+    # 网络图片磁盘缓存占用空间上限，超出时删除最早下载的图片，设置为 0 时不限制，单位：字节
+    "IMAGE_CACHE_MAX_BYTES": 1073741824,
+    # 网络图片磁盘缓存清理间隔，写入图片时距上次清理超过此时长则清理过期图片，并输出图片缓存统计信息，单位：秒
+    "IMAGE_CACHE_SWEEP_INTERVAL": 3600,
+    # 内存中缓存的已解码图片占用内存上限，超出时移除最久未使用的图片，单位：字节
+    "IMAGE_CACHE_MEMORY_BYTES": 67108864,
+    # 下载单张网络图片的超时时间，单位：秒
+    "IMAGE_DOWNLOAD_TIMEOUT": 20,
+    # 单张网络图片的大小上限，超出时放弃下载，单位：字节
+    "IMAGE_DOWNLOAD_MAX_BYTES": 10485760,
+
+    # 同时下载头像图片的最大数量，用于直播报告等需要批量获取头像时限制并发
+    "FACE_DOWNLOAD_CONCURRENCY": 16,
+    # 绘制动态图片前同时预取图片和动态内容的最大数量，所有动态共用
+    "DYNAMIC_PREFETCH_CONCURRENCY": 16,
+    # 预取单项图片或动态内容的超时时间，超时或失败的项会在全部预取完成后重新获取一次，单位：秒
+    "DYNAMIC_PREFETCH_TIMEOUT": 15,
+    # 绘图进程数，直播报告、动态、排行榜和数据卡片图片在独立进程中绘制，避免绘图时阻塞直播间连接，设置为 0 时在线程中绘制。仅支持 fork 的系统（如 Linux）会使用进程绘制，其他系统自动使用线程绘制
+    "RENDER_PROCESSES": 2,
+    # 同时等待绘制的图片数量上限，超出后新的绘图请求需等待其他图片绘制完成
+    "RENDER_QUEUE_LIMIT": 16,
 
     # 是否自动保存直播报告图片
     "SAVE_LIVE_REPORT_IMAGE": False,
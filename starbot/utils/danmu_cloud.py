@@ -0,0 +1,136 @@
+"""
+弹幕词云切词与词频统计模块。开启流式统计后弹幕在直播过程中分批切词，词频累计到 Redis 中，生成直播报告时直接使用词频绘制词云
+"""
+
+import asyncio
+from collections import Counter
+from typing import Optional, Dict, List
+
+import jieba
+from loguru import logger
+
+from . import config, redis
+
+jieba.setLogLevel(jieba.logging.INFO)
+
+__dict_loaded = False
+__buffer: Dict[int, List[str]] = {}
+__lock: Optional[asyncio.Lock] = None
+__flush_task: Optional[asyncio.Task] = None
+__timer_task: Optional[asyncio.Task] = None
+
+
+def enabled() -> bool:
+    """
+    是否开启了弹幕词云流式统计
+    """
+    return config.get("DANMU_CLOUD_STREAMING")
+
+
+def cut_words(contents: List[str]) -> Counter:
+    """
+    对弹幕进行切词并统计词频
+
+    Args:
+        contents: 弹幕内容列表
+
+    Returns:
+        词频计数
+    """
+    global __dict_loaded
+    if not __dict_loaded:
+        __dict_loaded = True
+        if config.get("DANMU_CLOUD_DICT"):
+            try:
+                jieba.load_userdict(config.get("DANMU_CLOUD_DICT"))
+            except Exception:
+                logger.error("载入弹幕词云自定义词典失败, 请检查配置的词典路径是否正确")
+
+    return Counter(word for word in jieba.cut(" ".join(contents)) if word.strip())
+
+
+def add(room_id: int, content: str):
+    """
+    添加一条待切词的弹幕，待切词弹幕数达到上限时触发切词
+
+    Args:
+        room_id: 房间号
+        content: 弹幕内容
+    """
+    global __flush_task
+    contents = __buffer.setdefault(room_id, [])
+    contents.append(content)
+
+    if __timer_task is None:
+        start()
+
+    if len(contents) >= config.get("DANMU_CLOUD_STREAMING_BATCH") and (__flush_task is None or __flush_task.done()):
+        __flush_task = asyncio.create_task(flush(room_id))
+
+
+async def flush(room_id: Optional[int] = None) -> bool:
+    """
+    对缓冲中的弹幕进行切词，并将词频写入 Redis，切词在线程池中进行，不阻塞事件循环
+
+    Args:
+        room_id: 仅处理指定房间号的弹幕，为 None 时处理全部弹幕。默认：None
+
+    Returns:
+        是否全部写入成功，写入失败时弹幕已放回缓冲中，将在下次处理时重试
+    """
+    global __lock
+    if __lock is None:
+        __lock = asyncio.Lock()
+
+    async with __lock:
+        rooms = list(__buffer.keys()) if room_id is None else [room_id]
+
+        success = True
+        for room in rooms:
+            contents = __buffer.pop(room, None)
+            if not contents:
+                continue
+            try:
+                counts = await asyncio.get_running_loop().run_in_executor(None, cut_words, contents)
+            except Exception as ex:
+                logger.error(f"直播间 {room} 的弹幕切词失败, 已丢弃本批弹幕 {ex}")
+                continue
+            try:
+                await redis.incr_room_danmu_words(room, counts, config.get("DANMU_CLOUD_WORDS_LIMIT"))
+            except Exception as ex:
+                # 写入期间产生的新弹幕追加在放回的弹幕之后
+                logger.error(f"直播间 {room} 的弹幕词频写入 Redis 失败, 将在下次处理时重试 {ex}")
+                __buffer[room] = contents + __buffer.get(room, [])
+                success = False
+
+        return success
+
+
+async def __timer():
+    """
+    定时切词任务
+    """
+    while True:
+        await asyncio.sleep(config.get("DANMU_CLOUD_STREAMING_INTERVAL"))
+        if __buffer:
+            await flush()
+
+
+def start():
+    """
+    启动定时切词任务
+    """
+    global __timer_task
+    if __timer_task is None or __timer_task.done():
+        __timer_task = asyncio.create_task(__timer())
+
+
+async def close():
+    """
+    停止定时切词任务，并处理缓冲中剩余的弹幕
+    """
+    global __timer_task
+    if __timer_task is not None:
+        __timer_task.cancel()
+        __timer_task = None
+    await flush()
@@ -0,0 +1,297 @@
+"""
+网络图片缓存模块。下载的图片数据以 URL 的哈希值为文件名缓存在磁盘中，解码及预处理后的图片缓存在内存中，避免每次绘图时重复下载和解码
+磁盘读写在线程中进行，写入时定期清理过期的图片，总大小超过上限时删除最早下载的图片
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from io import BytesIO
+from typing import Optional, Callable, Dict, Any, Tuple, Set
+
+import aiohttp
+from PIL import Image
+from loguru import logger
+
+from . import config
+from .network import get_session
+
+__images: "OrderedDict[Tuple[str, str], Image.Image]" = OrderedDict()
+__images_bytes = 0
+__downloading: Dict[str, asyncio.Future] = {}
+__writing: Set[asyncio.Task] = set()
+__last_sweep = 0.0
+__stats = {
+    "memory_hits": 0, "memory_misses": 0, "disk_hits": 0, "disk_misses": 0, "downloads": 0, "download_failures": 0,
+    "disk_files": 0, "disk_bytes": 0, "disk_evicted": 0
+}
+
+
+def __image_bytes(image: Image.Image) -> int:
+    return image.width * image.height * len(image.getbands())
+
+
+def __cache_path(url: str) -> str:
+    return os.path.join(config.get("IMAGE_CACHE_PATH"), hashlib.sha1(url.encode()).hexdigest())
+
+
+def __read_disk(url: str) -> Optional[bytes]:
+    """
+    读取磁盘中未过期的图片数据
+
+    Args:
+        url: 图片 URL
+
+    Returns:
+        图片数据，未缓存或已过期时返回 None
+    """
+    path = __cache_path(url)
+    try:
+        if time.time() - os.path.getmtime(path) >= config.get("IMAGE_CACHE_EXPIRE"):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def __write_disk(url: str, data: bytes):
+    """
+    将图片数据写入磁盘，先写入临时文件再重命名，避免并发读取到不完整的文件
+
+    Args:
+        url: 图片 URL
+        data: 图片数据
+    """
+    path = __cache_path(url)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(data)
+        os.replace(f"{path}.tmp", path)
+    except OSError as e:
+        logger.warning(f"写入图片缓存失败: {e}")
+
+
+def __sweep_disk() -> Tuple[int, int, int]:
+    """
+    清理磁盘缓存，删除已过期的图片，剩余图片总大小超过上限时按下载时间从早到晚删除
+
+    Returns:
+        剩余文件数、剩余文件总字节数和删除的文件数组成的元组
+    """
+    expire_before = time.time() - config.get("IMAGE_CACHE_EXPIRE")
+    files = []
+    removed = 0
+    try:
+        entries = list(os.scandir(config.get("IMAGE_CACHE_PATH")))
+    except OSError:
+        return 0, 0, 0
+
+    for entry in entries:
+        try:
+            if not entry.is_file():
+                continue
+            stat = entry.stat()
+            if stat.st_mtime < expire_before:
+                os.remove(entry.path)
+                removed += 1
+            elif not entry.name.endswith(".tmp"):
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            continue
+
+    total = sum(size for _, size, _ in files)
+    limit = config.get("IMAGE_CACHE_MAX_BYTES")
+    if 0 < limit < total:
+        files.sort()
+        while files and total > limit:
+            _, size, path = files.pop(0)
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+
+    return len(files), total, removed
+
+
+async def __save(url: str, data: bytes):
+    """
+    在线程中将下载的图片写入磁盘，距上次清理超过清理间隔时清理磁盘缓存并输出缓存统计信息
+
+    Args:
+        url: 图片 URL
+        data: 图片数据
+    """
+    global __last_sweep
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, __write_disk, url, data)
+
+    now = time.monotonic()
+    if now - __last_sweep < config.get("IMAGE_CACHE_SWEEP_INTERVAL"):
+        return
+    __last_sweep = now
+
+    files, total, removed = await loop.run_in_executor(None, __sweep_disk)
+    __stats["disk_files"] = files
+    __stats["disk_bytes"] = total
+    __stats["disk_evicted"] += removed
+
+    stats = get_stats()
+    logger.info(f"图片缓存: 已清理 {removed} 张磁盘缓存图片, 磁盘缓存 {files} 张图片共 {total / 1048576:.1f} MB, "
+                f"内存缓存 {stats['memory_size']} 张图片共 {stats['memory_bytes'] / 1048576:.1f} MB, "
+                f"内存命中率 {stats['memory_hit_rate']:.1%}, 磁盘命中率 {stats['disk_hit_rate']:.1%}")
+
+
+async def __download(url: str) -> Optional[bytes]:
+    """
+    下载图片，超过超时时间或大小上限时放弃下载
+
+    Args:
+        url: 图片 URL
+
+    Returns:
+        图片数据，下载失败时返回 None
+    """
+    limit = config.get("IMAGE_DOWNLOAD_MAX_BYTES")
+    timeout = aiohttp.ClientTimeout(total=config.get("IMAGE_DOWNLOAD_TIMEOUT"))
+    __stats["downloads"] += 1
+    try:
+        async with get_session().get(url, timeout=timeout) as resp:
+            resp.raise_for_status()
+            if resp.content_length is not None and resp.content_length > limit:
+                raise ValueError(f"图片大小 {resp.content_length} 字节超过上限")
+            data = bytearray()
+            async for chunk in resp.content.iter_chunked(65536):
+                data.extend(chunk)
+                if len(data) > limit:
+                    raise ValueError(f"图片大小超过上限 {limit} 字节")
+            return bytes(data)
+    except Exception as e:
+        __stats["download_failures"] += 1
+        logger.warning(f"下载图片 {url} 失败: {e}")
+        return None
+
+
+async def get_bytes(url: str) -> Optional[bytes]:
+    """
+    获取图片数据，优先读取磁盘缓存，同时请求同一 URL 时仅下载一次
+
+    Args:
+        url: 图片 URL
+
+    Returns:
+        图片数据，下载失败时返回 None
+    """
+    data = await asyncio.get_running_loop().run_in_executor(None, __read_disk, url)
+    if data is not None:
+        __stats["disk_hits"] += 1
+        return data
+    __stats["disk_misses"] += 1
+
+    future = __downloading.get(url)
+    if future is None:
+        future = asyncio.ensure_future(__download(url))
+        __downloading[url] = future
+
+        def on_done(f: asyncio.Future):
+            __downloading.pop(url, None)
+            if not f.cancelled() and f.result() is not None:
+                task = asyncio.ensure_future(__save(url, f.result()))
+                __writing.add(task)
+                task.add_done_callback(__writing.discard)
+
+        future.add_done_callback(on_done)
+
+    return await asyncio.shield(future)
+
+
+def decode(key: Tuple[str, str],
+           data: bytes,
+           transform: Optional[Callable[[Image.Image], Image.Image]] = None) -> Optional[Image.Image]:
+    """
+    解码图片并缓存于内存中，相同键的图片仅解码和预处理一次
+
+    Args:
+        key: 缓存键
+        data: 图片数据
+        transform: 解码后的预处理函数，如缩放和裁剪为圆形。默认：None
+
+    Returns:
+        图片副本，解码失败时返回 None
+    """
+    global __images_bytes
+    image = __images.get(key)
+    if image is not None:
+        __images.move_to_end(key)
+        __stats["memory_hits"] += 1
+        return image.copy()
+    __stats["memory_misses"] += 1
+
+    try:
+        image = Image.open(BytesIO(data))
+        image.load()
+        if transform is not None:
+            image = transform(image)
+    except Exception as e:
+        logger.warning(f"解码图片失败: {e}")
+        return None
+
+    __images[key] = image
+    __images_bytes += __image_bytes(image)
+    while __images_bytes > config.get("IMAGE_CACHE_MEMORY_BYTES") and len(__images) > 1:
+        __images_bytes -= __image_bytes(__images.popitem(last=False)[1])
+    return image.copy()
+
+
+async def open_image(url: str,
+                     variant: str = "",
+                     transform: Optional[Callable[[Image.Image], Image.Image]] = None) -> Optional[Image.Image]:
+    """
+    读取网络图片，优先使用内存中已解码的图片，其次使用磁盘缓存
+
+    Args:
+        url: 图片 URL
+        variant: 预处理方式的名称，同一图片不同预处理方式的结果分别缓存。默认：""
+        transform: 解码后的预处理函数。默认：None
+
+    Returns:
+        图片副本，URL 为空或读取失败时返回 None
+    """
+    if not url:
+        return None
+
+    key = (url, variant)
+    image = __images.get(key)
+    if image is not None:
+        __images.move_to_end(key)
+        __stats["memory_hits"] += 1
+        return image.copy()
+
+    data = await get_bytes(url)
+    if data is None:
+        return None
+    return decode(key, data, transform)
+
+
+def get_stats() -> Dict[str, Any]:
+    """
+    获取图片缓存统计信息
+
+    Returns:
+        包含内存缓存图片数、内存缓存图片占用字节数、内存和磁盘缓存的命中与未命中次数及命中率、下载次数、下载失败次数、
+        上次清理后的磁盘缓存文件数和占用字节数以及累计清理文件数的字典
+    """
+    memory_total = __stats["memory_hits"] + __stats["memory_misses"]
+    disk_total = __stats["disk_hits"] + __stats["disk_misses"]
+    return {
+        "memory_size": len(__images),
+        "memory_bytes": __images_bytes,
+        **__stats,
+        "memory_hit_rate": __stats["memory_hits"] / memory_total if memory_total else 0.0,
+        "disk_hit_rate": __stats["disk_hits"] / disk_total if disk_total else 0.0
+    }
@@ -4,19 +4,28 @@
 
 import asyncio
 import atexit
-import json
+import copy
 import random
 import re
-from typing import Any, Union, Dict
+import time
+from collections import OrderedDict
+from typing import Any, Union, Dict, Tuple
+from urllib.parse import urlsplit
 
 import aiohttp
 from aiohttp import TCPConnector, ServerDisconnectedError
+from loguru import logger
 
-from . import config
+from . import config, codec
 from .Credential import Credential
+from .RateLimiter import RateLimiter
 from ..exception import ResponseCodeException, ResponseException, NetworkException
 
 __session_pool = {}
+__limiters: Dict[str, RateLimiter] = {}
+__cache: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+__inflight: Dict[Tuple, asyncio.Future] = {}
+__cache_stats = {"hits": 0, "misses": 0, "coalesced": 0}
 
 
 @atexit.register
@@ -48,6 +57,88 @@ async def request(method: str,
                   **kwargs) -> Union[Dict, None]:
     """
     向接口发送请求
+    配置项 NETWORK_CACHE_TTL 中设置了缓存时间的接口的 GET 请求，缓存有效期内直接返回缓存数据，同时进行的相同请求仅发送一次，接口未返回数据时不缓存
+
+    Args:
+        method: 请求方法
+        url: 请求 URL
+        params: 请求参数。默认：None
+        data: 请求载荷。默认：None
+        credential: Credential 实例。默认：None
+        no_csrf: 不要自动添加 CSRF。默认：False
+        json_body: 载荷是否为 JSON。默认：False
+        kwargs: 暂不使用
+
+    Returns:
+        接口未返回数据时，返回 None，否则返回该接口提供的 data 或 result 字段的数据
+    """
+    ttl = 0
+    if method.upper() == "GET" and not kwargs:
+        parts = urlsplit(url)
+        ttl = config.get("NETWORK_CACHE_TTL").get(f"{parts.scheme}://{parts.netloc}{parts.path}", 0)
+    if ttl <= 0:
+        return await __request(method, url, params, data, credential, no_csrf, json_body, **kwargs)
+
+    key = (
+        url,
+        tuple(sorted((str(k), str(v)) for k, v in (params or {}).items())),
+        credential.sessdata if credential is not None else None
+    )
+
+    cached = __cache.get(key)
+    if cached is not None:
+        if cached[0] > time.monotonic():
+            __cache.move_to_end(key)
+            __cache_stats["hits"] += 1
+            return copy.deepcopy(cached[1])
+        __cache.pop(key)
+
+    future = __inflight.get(key)
+    if future is not None:
+        __cache_stats["coalesced"] += 1
+    else:
+        __cache_stats["misses"] += 1
+        future = asyncio.ensure_future(__request(method, url, params, data, credential, no_csrf, json_body))
+        __inflight[key] = future
+
+        def on_done(f: asyncio.Future):
+            __inflight.pop(key, None)
+            # 重试耗尽或接口未返回数据时结果为 None，不缓存，避免在缓存有效期内持续返回空数据
+            if not f.cancelled() and f.exception() is None and f.result() is not None:
+                __cache[key] = (time.monotonic() + ttl, f.result())
+                while len(__cache) > config.get("NETWORK_CACHE_SIZE"):
+                    __cache.popitem(last=False)
+
+        future.add_done_callback(on_done)
+
+    return copy.deepcopy(await asyncio.shield(future))
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """
+    获取接口缓存统计信息
+
+    Returns:
+        包含缓存数据条数、命中次数、未命中次数、合并的同时进行的相同请求次数和命中率的字典
+    """
+    total = __cache_stats["hits"] + __cache_stats["misses"] + __cache_stats["coalesced"]
+    return {
+        "size": len(__cache),
+        **__cache_stats,
+        "hit_rate": (__cache_stats["hits"] + __cache_stats["coalesced"]) / total if total else 0.0
+    }
+
+
+async def __request(method: str,
+                    url: str,
+                    params: dict = None,
+                    data: Any = None,
+                    credential: Credential = None,
+                    no_csrf: bool = False,
+                    json_body: bool = False,
+                    **kwargs) -> Union[Dict, None]:
+    """
+    向接口发送请求
 
     Args:
         method: 请求方法
@@ -104,9 +195,11 @@ async def request(method: str,
 
     if json_body:
         args["headers"]["Content-Type"] = "application/json"
-        args["data"] = json.dumps(args["data"])
+        args["data"] = codec.dumps(args["data"])
 
     session = get_session()
+    host = urlsplit(url).hostname or ""
+    limiter = __get_limiter(host)
 
     for i in range(3):
         # 如果用户提供代理则设置代理
@@ -117,68 +210,159 @@ async def request(method: str,
             args["proxy"] = random.choice(proxy)
 
         try:
-            async with session.request(**args) as resp:
-
-                # 检查状态码
-                try:
-                    resp.raise_for_status()
-                except aiohttp.ClientResponseError as e:
-                    raise NetworkException(e.status, e.message)
-
-                # 检查响应头 Content-Length
-                content_length = resp.headers.get("content-length")
-                if content_length and int(content_length) == 0:
-                    return None
-
-                # 检查响应头 Content-Type
-                content_type = resp.headers.get("content-type")
-
-                # 不是 application/json
-                if content_type.lower().find("application/json") == -1:
-                    raise ResponseException("响应不是 application/json 类型")
-
-                raw_data = await resp.text()
-                resp_data: dict
-
-                if 'callback' in params:
-                    # JSONP 请求
-                    resp_data = json.loads(
-                        re.match("^.*?({.*}).*$", raw_data, re.S).group(1))
-                else:
-                    # JSON
-                    resp_data = json.loads(raw_data)
-
-                # 检查 code
-                code = resp_data.get("code", None)
-
-                if code is None:
-                    raise ResponseCodeException(-1, "API 返回数据未含 code 字段", resp_data)
-
-                if code != 0:
-                    # 4101131: 加载错误，请稍后再试, 22015: 您的账号异常，请稍后再试
-                    if code == 4101131 or code == 22015 or code == -352:
-                        await asyncio.sleep(10)
-                        continue
-
-                    msg = resp_data.get('msg', None)
-                    if msg is None:
-                        msg = resp_data.get('message', None)
-                    if msg is None:
-                        msg = "接口未返回错误信息"
-                    raise ResponseCodeException(code, msg, resp_data)
-
-                real_data = resp_data.get("data", None)
-                if real_data is None:
-                    real_data = resp_data.get("result", None)
-                return real_data
+            async with limiter:
+                async with session.request(**args) as resp:
+
+                    # 检查状态码
+                    try:
+                        resp.raise_for_status()
+                    except aiohttp.ClientResponseError as e:
+                        raise NetworkException(e.status, e.message)
+
+                    # 检查响应头 Content-Length
+                    content_length = resp.headers.get("content-length")
+                    if content_length and int(content_length) == 0:
+                        return None
+
+                    # 检查响应头 Content-Type
+                    content_type = resp.headers.get("content-type")
+
+                    # 不是 application/json
+                    if content_type.lower().find("application/json") == -1:
+                        raise ResponseException("响应不是 application/json 类型")
+
+                    resp_data: dict
+
+                    if 'callback' in params:
+                        # JSONP 请求
+                        raw_data = await resp.text()
+                        resp_data = codec.loads(
+                            re.match("^.*?({.*}).*$", raw_data, re.S).group(1))
+                    else:
+                        # JSON，直接解析字节数据，省去解码为字符串的开销
+                        resp_data = codec.loads(await resp.read())
+
+                    # 检查 code
+                    code = resp_data.get("code", None)
+
+                    if code is None:
+                        raise ResponseCodeException(-1, "API 返回数据未含 code 字段", resp_data)
+
+                    if code != 0:
+                        # 4101131: 加载错误，请稍后再试, 22015: 您的账号异常，请稍后再试
+                        if code == 4101131 or code == 22015 or code == -352:
+                            # 触发风控时降低此主机的请求速率，并暂停所有请求一段时间
+                            __throttle(host, limiter, code)
+                            continue
+
+                        msg = resp_data.get('msg', None)
+                        if msg is None:
+                            msg = resp_data.get('message', None)
+                        if msg is None:
+                            msg = "接口未返回错误信息"
+                        raise ResponseCodeException(code, msg, resp_data)
+
+                    limiter.recover()
+                    real_data = resp_data.get("data", None)
+                    if real_data is None:
+                        real_data = resp_data.get("result", None)
+                    return real_data
         except ServerDisconnectedError:
             await asyncio.sleep(0.5)
             continue
-        except NetworkException:
-            await asyncio.sleep(0.5)
+        except NetworkException as e:
+            if is_rate_limited(e):
+                __throttle(host, limiter, e.status)
+            else:
+                await asyncio.sleep(0.5)
             continue
 
 
+def __get_limiter(host: str) -> RateLimiter:
+    """
+    获取主机对应的速率限制器，同一主机的所有请求共享同一速率限制器
+
+    Args:
+        host: 主机名
+
+    Returns:
+        速率限制器
+    """
+    limiter = __limiters.get(host)
+    if limiter is None:
+        limit = {
+            "rate": config.get("NETWORK_HOST_RATE"),
+            "burst": config.get("NETWORK_HOST_BURST"),
+            "concurrency": config.get("NETWORK_HOST_CONCURRENCY"),
+            **config.get("NETWORK_HOST_LIMITS").get(host, {})
+        }
+        limiter = RateLimiter(limit["rate"], limit["burst"], limit["concurrency"])
+        __limiters[host] = limiter
+    return limiter
+
+
+def __throttle(host: str, limiter: RateLimiter, code: int):
+    """
+    触发风控时降低主机的请求速率，并暂停该主机的所有请求一段时间
+
+    Args:
+        host: 主机名
+        limiter: 主机对应的速率限制器
+        code: 风控错误码或 HTTP 状态码
+    """
+    limiter.backoff(config.get("NETWORK_RISK_COOLDOWN"))
+    logger.warning(f"请求 {host} 触发风控 ({code}), 暂停请求 {config.get('NETWORK_RISK_COOLDOWN')} 秒, "
+                   f"请求速率已降低至每秒 {limiter.get_rate():.2f} 个")
+
+
+def is_backlogged(url: str) -> bool:
+    """
+    判断请求 URL 所属主机的请求是否积压，等待中的请求数超过一秒内允许发送的请求数时视为积压
+    可用于跳过可丢弃的周期性请求（如网页端观看心跳），避免积压的请求占满该主机的请求速率
+
+    Args:
+        url: 请求 URL
+
+    Returns:
+        是否积压
+    """
+    limiter = __limiters.get(urlsplit(url).hostname or "")
+    if limiter is None:
+        return False
+    stats = limiter.get_stats()
+    return stats["waiting"] > max(stats["rate"], 1)
+
+
+def get_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    获取各主机的请求速率和限流统计信息
+
+    Returns:
+        以主机名为键的统计信息字典
+    """
+    return {host: limiter.get_stats() for host, limiter in __limiters.items()}
+
+
+def is_rate_limited(e: BaseException) -> bool:
+    """
+    判断异常是否由触发风控或请求过于频繁导致
+
+    Args:
+        e: 异常
+
+    Returns:
+        是否由触发风控或请求过于频繁导致
+    """
+    if isinstance(e, ResponseCodeException):
+        # -352: 风控校验失败, -412: 请求被拦截, -509, -799: 请求过于频繁
+        return e.code in (-352, -412, -509, -799)
+    if isinstance(e, NetworkException):
+        return e.status in (412, 429)
+    if isinstance(e, aiohttp.ClientResponseError):
+        return e.status in (412, 429)
+    return False
+
+
 def get_session() -> aiohttp.ClientSession:
     """
     获取当前模块的 aiohttp.ClientSession 对象，用于自定义请求
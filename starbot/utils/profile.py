@@ -0,0 +1,265 @@
+"""
+用户资料缓存模块。缓存用户昵称和头像地址，默认存储于 Redis 中，也可存储于本地文件中，头像图片由图片缓存模块缓存
+缓存超过刷新间隔后仍先使用缓存数据，同时在后台刷新，使常用用户的昵称和头像无需每次请求接口和下载
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import List, Dict, Any, Optional, Tuple, Set
+
+from PIL import Image
+from loguru import logger
+
+from . import config, redis, codec, image_cache
+from .network import request
+from .utils import get_credential, split_list
+
+__USER_CARDS_URL = "https://api.vc.bilibili.com/account/v1/user/cards?uids={}"
+
+__file_profiles: Optional[Dict[str, Dict[str, Any]]] = None
+__file_save_task: Optional[asyncio.Task] = None
+__file_lock = threading.Lock()
+__face_semaphore: Optional[asyncio.Semaphore] = None
+__refreshing: Set[str] = set()
+__refresh_tasks: Set[asyncio.Task] = set()
+
+
+def __use_file() -> bool:
+    return config.get("PROFILE_STORE") == "file"
+
+
+def __file_path(*paths: str) -> str:
+    return os.path.join(config.get("PROFILE_STORE_PATH"), *paths)
+
+
+def __get_file_profiles() -> Dict[str, Dict[str, Any]]:
+    """
+    获取本地文件中存储的用户资料，首次调用时从文件中读取
+    """
+    global __file_profiles
+    if __file_profiles is None:
+        try:
+            with open(__file_path("profiles.json"), "rb") as f:
+                __file_profiles = codec.loads(f.read())
+        except (OSError, ValueError):
+            __file_profiles = {}
+    return __file_profiles
+
+
+async def __load_profiles(uids: List[str]) -> List[Optional[Dict[str, Any]]]:
+    if __use_file():
+        profiles = __get_file_profiles()
+        return [profiles.get(uid) for uid in uids]
+    return await redis.get_user_profiles(uids)
+
+
+async def __save_profiles(profiles: Dict[str, Dict[str, Any]]):
+    if not profiles:
+        return
+
+    if __use_file():
+        __get_file_profiles().update(profiles)
+        __schedule_file_save()
+    else:
+        await redis.set_user_profiles(profiles)
+
+
+def __write_file(profiles: Dict[str, Dict[str, Any]]):
+    """
+    将用户资料写入本地文件，先写入临时文件再重命名，避免写入中断时损坏原有文件
+
+    Args:
+        profiles: 用户资料字典
+    """
+    path = __file_path("profiles.json")
+    with __file_lock:
+        try:
+            os.makedirs(__file_path(), exist_ok=True)
+            with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                f.write(codec.dumps(profiles))
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            logger.warning(f"保存用户资料失败: {e}")
+
+
+async def __flush_file():
+    """
+    在线程中将内存中的用户资料写入本地文件
+    """
+    await asyncio.get_running_loop().run_in_executor(None, __write_file, dict(__get_file_profiles()))
+
+
+def __schedule_file_save():
+    """
+    延迟保存用户资料至本地文件，延迟期间的多次修改合并为一次写入
+    """
+    global __file_save_task
+    if __file_save_task is not None and not __file_save_task.done():
+        return
+
+    async def save():
+        await asyncio.sleep(config.get("PROFILE_FILE_SAVE_DELAY"))
+        await __flush_file()
+
+    __file_save_task = asyncio.create_task(save())
+
+
+def __get_face_semaphore() -> asyncio.Semaphore:
+    """
+    获取限制头像并发下载数量的信号量
+    """
+    global __face_semaphore
+    if __face_semaphore is None:
+        __face_semaphore = asyncio.Semaphore(config.get("FACE_DOWNLOAD_CONCURRENCY"))
+    return __face_semaphore
+
+
+def __default_face() -> Image.Image:
+    resource_base_path = os.path.dirname(os.path.dirname(__file__))
+    return Image.open(f"{resource_base_path}/resource/face.png")
+
+
+async def __fetch_profiles(uids: List[str]) -> Tuple[Dict[str, Dict[str, Any]], Set[str]]:
+    """
+    分批并发请求用户资料，某一批次请求失败时仅影响该批次中的用户
+
+    Args:
+        uids: UID 列表
+
+    Returns:
+        获取到的用户资料字典和请求失败的 UID 集合组成的元组，不存在的用户不包含在两者中
+    """
+
+    async def fetch(batch: List[str]):
+        try:
+            return batch, await request("GET", __USER_CARDS_URL.format(",".join(batch)), credential=get_credential())
+        except Exception as e:
+            logger.warning(f"获取用户 {','.join(batch)} 的资料失败: {e}")
+            return batch, None
+
+    profiles = {}
+    failed = set()
+    now = int(time.time())
+    for batch, infos in await asyncio.gather(*[fetch(b) for b in split_list(uids, 10)]):
+        if infos is None:
+            failed.update(batch)
+            continue
+        for info in infos:
+            profiles[str(info["mid"])] = {"name": info["name"], "face": info["face"], "time": now}
+
+    return profiles, failed
+
+
+async def __get_face(profile: Optional[Dict[str, Any]]) -> Optional[Image.Image]:
+    """
+    通过图片缓存获取头像图片
+
+    Args:
+        profile: 用户资料
+
+    Returns:
+        头像图片，无头像地址或获取失败时返回 None
+    """
+    if profile is None or not profile["face"]:
+        return None
+
+    async with __get_face_semaphore():
+        data = await image_cache.get_bytes(profile["face"])
+    if data is None:
+        return None
+    return image_cache.decode((profile["face"], ""), data)
+
+
+def __schedule_refresh(uids: List[str]):
+    """
+    在后台刷新用户资料，正在刷新的用户不会重复刷新
+
+    Args:
+        uids: 需刷新资料的 UID 列表
+    """
+    uids = [uid for uid in uids if uid not in __refreshing]
+    if not uids:
+        return
+
+    __refreshing.update(uids)
+    task = asyncio.create_task(__refresh(uids))
+    __refresh_tasks.add(task)
+    task.add_done_callback(__refresh_tasks.discard)
+
+
+async def __refresh(uids: List[str]):
+    """
+    刷新用户资料
+
+    Args:
+        uids: 需刷新资料的 UID 列表
+    """
+    try:
+        profiles, _ = await __fetch_profiles(uids)
+        await __save_profiles(profiles)
+        logger.debug(f"已刷新 {len(profiles)} 个用户的资料")
+    except Exception as e:
+        logger.warning(f"刷新用户资料失败: {e}")
+    finally:
+        __refreshing.difference_update(uids)
+
+
+async def get_unames_and_faces(uids: List[str]) -> Tuple[List[str], List[Image.Image]]:
+    """
+    根据 UID 列表批量获取昵称和头像图片，优先使用缓存
+
+    Args:
+        uids: UID 列表
+
+    Returns:
+        昵称列表和头像图片列表组成的元组，获取失败的用户昵称为 "昵称获取失败(UID)"，头像为默认头像
+    """
+    uids = [str(uid) for uid in uids]
+    unique_uids = list(dict.fromkeys(uids))
+    profiles = dict(zip(unique_uids, await __load_profiles(unique_uids)))
+
+    # 无缓存的用户立即请求，缓存已过期的用户在后台刷新
+    missing = [uid for uid in unique_uids if profiles[uid] is None]
+    failed = set()
+    if missing:
+        fetched, failed = await __fetch_profiles(missing)
+        profiles.update(fetched)
+
+    now = time.time()
+    interval = config.get("PROFILE_REFRESH_INTERVAL")
+    __schedule_refresh([
+        uid for uid in unique_uids if uid not in missing and profiles[uid] is not None
+        and now - profiles[uid]["time"] >= interval
+    ])
+
+    await __save_profiles({uid: profiles[uid] for uid in missing if profiles[uid] is not None})
+
+    # 头像图片由图片缓存模块缓存，头像地址变化时自动重新下载
+    face_images = dict(zip(unique_uids, await asyncio.gather(*[__get_face(profiles.get(uid)) for uid in unique_uids])))
+
+    unames = []
+    faces = []
+    for uid in uids:
+        profile = profiles.get(uid)
+        if uid in failed:
+            unames.append(f"昵称获取失败({uid})")
+        else:
+            unames.append(profile["name"] if profile is not None else "")
+
+        face = face_images[uid]
+        faces.append(face.copy() if face is not None else __default_face())
+
+    return unames, faces
+
+
+async def close():
+    """
+    立即保存尚未写入本地文件的用户资料
+    """
+    global __file_save_task
+    if __file_save_task is not None and not __file_save_task.done():
+        __file_save_task.cancel()
+        __file_save_task = None
+        await __flush_file()
@@ -1,16 +1,23 @@
-from typing import Any, Union, Tuple, List, Set
+import typing
+from typing import Any, Union, Tuple, List, Set, Optional, Dict, Callable
 
 from loguru import logger
 from redis import asyncio as aioredis
+from redis.commands.core import AsyncScript
 
 from ..exception.RedisException import RedisException
-from ..utils import config
+from ..utils import config, codec
+
+if typing.TYPE_CHECKING:
+    from .stats import RoomStats
 
 __redis: aioredis.client.Redis
+__accumulate_and_reset_script: AsyncScript
+__parallel_rank_script: AsyncScript
 
 
 async def init():
-    global __redis
+    global __redis, __accumulate_and_reset_script, __parallel_rank_script
     logger.info("开始连接 Redis 数据库")
     host = config.get("REDIS_HOST")
     port = config.get("REDIS_PORT")
@@ -22,6 +29,8 @@ async def init():
         await __redis.ping()
     except Exception as ex:
         raise RedisException(f"连接 Redis 数据库失败, 请检查是否启动了 Redis 服务或提供的配置中连接参数是否正确 {ex}")
+    __accumulate_and_reset_script = __redis.register_script(__ACCUMULATE_AND_RESET_SCRIPT)
+    __parallel_rank_script = __redis.register_script(__PARALLEL_RANK_SCRIPT)
     logger.success("成功连接 Redis 数据库")
 
 
@@ -205,6 +214,28 @@ async def zrevrangewithscoresf1(key: str, start: int, end: int) -> List[Tuple[st
     ]
 
 
+# 获取成员在有序集合中的排名，存在并列情况优先取高名次，返回名次、成员总数、成员分数和上一名的分数
+__PARALLEL_RANK_SCRIPT = """
+local score = redis.call("ZSCORE", KEYS[1], ARGV[1]) or "0"
+local total = redis.call("ZCARD", KEYS[1])
+local higher = redis.call("ZCOUNT", KEYS[1], "(" .. score, "+inf")
+local previous = redis.call("ZRANGEBYSCORE", KEYS[1], "(" .. score, "+inf", "WITHSCORES", "LIMIT", 0, 1)
+return {higher + 1, total, score, previous[2] or false}
+"""
+
+
+async def zparallelranki(key: str, member: Union[str, int]) -> Tuple[int, int, Optional[int]]:
+    rank, total, score, previous = await __parallel_rank_script(keys=[key], args=[member])
+    diff = int(float(previous)) - int(float(score)) if previous is not None else None
+    return rank, total, diff
+
+
+async def zparallelrankf1(key: str, member: Union[str, int]) -> Tuple[int, int, Optional[float]]:
+    rank, total, score, previous = await __parallel_rank_script(keys=[key], args=[member])
+    diff = float("{:.1f}".format(float(previous) - float(score))) if previous is not None else None
+    return rank, total, diff
+
+
 async def zadd(key: str, member: str, score: Union[int, float]):
     await __redis.zadd(key, {member: score})
 
@@ -213,6 +244,13 @@ async def zincrby(key: str, member: Union[str, int], score: Union[int, float] =
     return await __redis.zincrby(key, score, member)
 
 
+async def zincrbymulti(keys_: List[str], member: Union[str, int], score: Union[int, float] = 1) -> float:
+    pipe = __redis.pipeline(transaction=False)
+    for key in keys_:
+        pipe.zincrby(key, score, member)
+    return (await pipe.execute())[0]
+
+
 async def zunionstore(dest: str, source: Union[str, List[str]]):
     if isinstance(source, str):
         await __redis.zunionstore(dest, [dest, source])
@@ -264,6 +302,37 @@ async def set_live_end_time(room_id: int, end_time: int):
     await hset("EndTime", room_id, end_time)
 
 
+# 直播间真实房间号
+
+async def get_room_real_id(room_id: int) -> int:
+    result = await get(f"RoomRealId:{room_id}")
+    return int(result) if result else 0
+
+
+async def set_room_real_id(room_id: int, real_id: int, seconds: int):
+    if seconds > 0:
+        await __redis.set(f"RoomRealId:{room_id}", real_id, ex=seconds)
+    else:
+        await delete(f"RoomRealId:{room_id}")
+
+
+# 直播间聊天服务器配置缓存
+
+async def get_live_chat_conf(room_id: int) -> Optional[Dict[str, Any]]:
+    result = await get(f"LiveChatConf:{room_id}")
+    if not result:
+        return None
+    return codec.loads(result)
+
+
+async def set_live_chat_conf(room_id: int, conf: Dict[str, Any], seconds: int):
+    await __redis.set(f"LiveChatConf:{room_id}", codec.dumps(conf), ex=seconds)
+
+
+async def delete_live_chat_conf(room_id: int):
+    await delete(f"LiveChatConf:{room_id}")
+
+
 # 粉丝数
 
 async def exists_fans_count(room_id: int, start_time: int) -> bool:
@@ -354,8 +423,12 @@ async def rev_range_user_danmu_count(room_id: int, start: int = 0, end: int = -1
     return await zrevrangewithscoresi(f"UserDanmuCount:{room_id}", start, end)
 
 
+async def rank_user_danmu_count(room_id: int, uid: int) -> Tuple[int, int, Optional[int]]:
+    return await zparallelranki(f"UserDanmuCount:{room_id}", uid)
+
+
 async def incr_user_danmu_count(room_id: int, uid: int) -> float:
-    return await zincrby(f"UserDanmuCount:{room_id}", uid)
+    return await zincrbymulti([f"UserDanmuCount:{room_id}", f"UserDanmuAll:{room_id}"], uid)
 
 
 async def delete_user_danmu_count(room_id: int):
@@ -375,29 +448,19 @@ async def accumulate_user_danmu_total(room_id: int):
 # 用户总弹幕数量
 
 async def len_user_danmu_all(room_id: int) -> int:
-    return len(
-        set(await zrange(f"UserDanmuCount:{room_id}", 0, -1))
-        .union(set(await zrange(f"UserDanmuTotal:{room_id}", 0, -1)))
-    )
+    return await zcard(f"UserDanmuAll:{room_id}")
 
 
 async def get_user_danmu_all(room_id: int, uid: int) -> int:
-    return await get_user_danmu_count(room_id, uid) + await get_user_danmu_total(room_id, uid)
+    return int(await zscore(f"UserDanmuAll:{room_id}", uid))
 
 
 async def range_user_danmu_all(room_id: int, start: int = 0, end: int = -1) -> List[Tuple[str, int]]:
-    await zunionstore(f"TempDanmuTotal:{room_id}", [f"UserDanmuCount:{room_id}", f"UserDanmuTotal:{room_id}"])
-    result = await zrangewithscoresi(f"TempDanmuTotal:{room_id}", start, end)
-    await delete(f"TempDanmuTotal:{room_id}")
-    return result
+    return await zrangewithscoresi(f"UserDanmuAll:{room_id}", start, end)
 
 
 async def rev_range_user_danmu_all(room_id: int, start: int = 0, end: int = -1) -> List[Tuple[str, int]]:
-    await zunionstore(f"TempDanmuTotal:{room_id}", [f"UserDanmuCount:{room_id}", f"UserDanmuTotal:{room_id}"])
-    result = await zrevrangewithscoresi(f"TempDanmuTotal:{room_id}", start, end)
-    await delete(f"TempDanmuTotal:{room_id}")
-    return result
-
+    return await zrevrangewithscoresi(f"UserDanmuAll:{room_id}", start, end)
 
 # 房间弹幕记录
 
@@ -405,6 +468,10 @@ async def get_room_danmu(room_id: int) -> List[str]:
     return await lrange(f"RoomDanmu:{room_id}", 0, -1)
 
 
+async def rank_user_danmu_all(room_id: int, uid: int) -> Tuple[int, int, Optional[int]]:
+    return await zparallelranki(f"UserDanmuAll:{room_id}", uid)
+
+
 async def add_room_danmu(room_id: int, content: str):
     await rpush(f"RoomDanmu:{room_id}", content)
 
@@ -413,6 +480,25 @@ async def delete_room_danmu(room_id: int):
     await delete(f"RoomDanmu:{room_id}")
 
 
+# 房间弹幕词频，用于流式统计弹幕词云
+
+__DANMU_WORDS_MARGIN = 4
+
+async def incr_room_danmu_words(room_id: int, counts: Dict[str, int], limit: int):
+    # 使用事务写入，写入失败时所有词频均未写入，调用方可将弹幕放回缓冲中稍后重试
+    pipe = __redis.pipeline(transaction=True)
+    for word, count in counts.items():
+        pipe.zincrby(f"RoomDanmuWords:{room_id}", count, word)
+    if limit > 0:
+        # 直播过程中保留数倍于上限的词，避免仍在累计词频的词被过早移除，生成直播报告时再取最高频的词
+        pipe.zremrangebyrank(f"RoomDanmuWords:{room_id}", 0, -(limit * __DANMU_WORDS_MARGIN + 1))
+    await pipe.execute()
+
+
+async def delete_room_danmu_words(room_id: int):
+    await delete(f"RoomDanmuWords:{room_id}")
+
+
 # 房间弹幕时间分布
 
 async def get_room_danmu_time(room_id: int) -> List[Tuple[str, int]]:
@@ -475,8 +561,12 @@ async def rev_range_user_box_count(room_id: int, start: int = 0, end: int = -1)
     return await zrevrangewithscoresi(f"UserBoxCount:{room_id}", start, end)
 
 
+async def rank_user_box_count(room_id: int, uid: int) -> Tuple[int, int, Optional[int]]:
+    return await zparallelranki(f"UserBoxCount:{room_id}", uid)
+
+
 async def incr_user_box_count(room_id: int, uid: int, count: int) -> float:
-    return await zincrby(f"UserBoxCount:{room_id}", uid, count)
+    return await zincrbymulti([f"UserBoxCount:{room_id}", f"UserBoxAll:{room_id}"], uid, count)
 
 
 async def delete_user_box_count(room_id: int):
@@ -496,29 +586,19 @@ async def accumulate_user_box_total(room_id: int):
 # 用户总盲盒数量
 
 async def len_user_box_all(room_id: int) -> int:
-    return len(
-        set(await zrange(f"UserBoxCount:{room_id}", 0, -1))
-        .union(set(await zrange(f"UserBoxTotal:{room_id}", 0, -1)))
-    )
+    return await zcard(f"UserBoxAll:{room_id}")
 
 
 async def get_user_box_all(room_id: int, uid: int) -> int:
-    return await get_user_box_count(room_id, uid) + await get_user_box_total(room_id, uid)
+    return int(await zscore(f"UserBoxAll:{room_id}", uid))
 
 
 async def range_user_box_all(room_id: int, start: int = 0, end: int = -1) -> List[Tuple[str, int]]:
-    await zunionstore(f"TempBoxTotal:{room_id}", [f"UserBoxCount:{room_id}", f"UserBoxTotal:{room_id}"])
-    result = await zrangewithscoresi(f"TempBoxTotal:{room_id}", start, end)
-    await delete(f"TempBoxTotal:{room_id}")
-    return result
+    return await zrangewithscoresi(f"UserBoxAll:{room_id}", start, end)
 
 
 async def rev_range_user_box_all(room_id: int, start: int = 0, end: int = -1) -> List[Tuple[str, int]]:
-    await zunionstore(f"TempBoxTotal:{room_id}", [f"UserBoxCount:{room_id}", f"UserBoxTotal:{room_id}"])
-    result = await zrevrangewithscoresi(f"TempBoxTotal:{room_id}", start, end)
-    await delete(f"TempBoxTotal:{room_id}")
-    return result
-
+    return await zrevrangewithscoresi(f"UserBoxAll:{room_id}", start, end)
 
 # 房间盲盒盈亏
 
@@ -526,6 +606,10 @@ async def get_room_box_profit(room_id: int) -> float:
     return await hgetf1("RoomBoxProfit", room_id)
 
 
+async def rank_user_box_all(room_id: int, uid: int) -> Tuple[int, int, Optional[int]]:
+    return await zparallelranki(f"UserBoxAll:{room_id}", uid)
+
+
 async def incr_room_box_profit(room_id: int, profit: float) -> float:
     return await hincrbyfloat("RoomBoxProfit", room_id, profit)
 
@@ -564,8 +648,12 @@ async def rev_range_user_box_profit(room_id: int, start: int = 0, end: int = -1)
     return await zrevrangewithscoresf1(f"UserBoxProfit:{room_id}", start, end)
 
 
+async def rank_user_box_profit(room_id: int, uid: int) -> Tuple[int, int, Optional[float]]:
+    return await zparallelrankf1(f"UserBoxProfit:{room_id}", uid)
+
+
 async def incr_user_box_profit(room_id: int, uid: int, profit: float) -> float:
-    return await zincrby(f"UserBoxProfit:{room_id}", uid, profit)
+    return await zincrbymulti([f"UserBoxProfit:{room_id}", f"UserBoxProfitAll:{room_id}"], uid, profit)
 
 
 async def delete_user_box_profit(room_id: int):
@@ -585,24 +673,15 @@ async def accumulate_user_box_profit_total(room_id: int):
 # 用户总盲盒盈亏
 
 async def get_user_box_profit_all(room_id: int, uid: int) -> float:
-    return float("{:.1f}".format(
-        await get_user_box_profit(room_id, uid) + await get_user_box_profit_total(room_id, uid)
-    ))
+    return float("{:.1f}".format(await zscore(f"UserBoxProfitAll:{room_id}", uid)))
 
 
 async def range_user_box_profit_all(room_id: int, start: int = 0, end: int = -1) -> List[Tuple[str, float]]:
-    await zunionstore(f"TempBoxProfitTotal:{room_id}", [f"UserBoxProfit:{room_id}", f"UserBoxProfitTotal:{room_id}"])
-    result = await zrangewithscoresf1(f"TempBoxProfitTotal:{room_id}", start, end)
-    await delete(f"TempBoxProfitTotal:{room_id}")
-    return result
+    return await zrangewithscoresf1(f"UserBoxProfitAll:{room_id}", start, end)
 
 
 async def rev_range_user_box_profit_all(room_id: int, start: int = 0, end: int = -1) -> List[Tuple[str, float]]:
-    await zunionstore(f"TempBoxProfitTotal:{room_id}", [f"UserBoxProfit:{room_id}", f"UserBoxProfitTotal:{room_id}"])
-    result = await zrevrangewithscoresf1(f"TempBoxProfitTotal:{room_id}", start, end)
-    await delete(f"TempBoxProfitTotal:{room_id}")
-    return result
-
+    return await zrevrangewithscoresf1(f"UserBoxProfitAll:{room_id}", start, end)
 
 # 房间盲盒盈亏记录，用于绘制直播报告中盲盒盈亏曲线图
 
@@ -610,6 +689,10 @@ async def get_room_box_profit_record(room_id: int) -> List[float]:
     return await lrangef1(f"RoomBoxProfitRecord:{room_id}", 0, -1)
 
 
+async def rank_user_box_profit_all(room_id: int, uid: int) -> Tuple[int, int, Optional[float]]:
+    return await zparallelrankf1(f"UserBoxProfitAll:{room_id}", uid)
+
+
 async def add_room_box_profit_record(room_id: int, profit: float):
     await rpush(f"RoomBoxProfitRecord:{room_id}", profit)
 
@@ -694,8 +777,12 @@ async def rev_range_user_gift_profit(room_id: int, start: int = 0, end: int = -1
     return await zrevrangewithscoresf1(f"UserGiftProfit:{room_id}", start, end)
 
 
+async def rank_user_gift_profit(room_id: int, uid: int) -> Tuple[int, int, Optional[float]]:
+    return await zparallelrankf1(f"UserGiftProfit:{room_id}", uid)
+
+
 async def incr_user_gift_profit(room_id: int, uid: int, price: float) -> float:
-    return await zincrby(f"UserGiftProfit:{room_id}", uid, price)
+    return await zincrbymulti([f"UserGiftProfit:{room_id}", f"UserGiftAll:{room_id}"], uid, price)
 
 
 async def delete_user_gift_profit(room_id: int):
@@ -715,31 +802,19 @@ async def accumulate_user_gift_total(room_id: int):
 # 用户总礼物价值
 
 async def len_user_gift_all(room_id: int) -> int:
-    return len(
-        set(await zrange(f"UserGiftProfit:{room_id}", 0, -1))
-        .union(set(await zrange(f"UserGiftTotal:{room_id}", 0, -1)))
-    )
+    return await zcard(f"UserGiftAll:{room_id}")
 
 
 async def get_user_gift_all(room_id: int, uid: int) -> float:
-    return float("{:.1f}".format(
-        await get_user_gift_profit(room_id, uid) + await get_user_gift_total(room_id, uid)
-    ))
+    return float("{:.1f}".format(await zscore(f"UserGiftAll:{room_id}", uid)))
 
 
 async def range_user_gift_all(room_id: int, start: int = 0, end: int = -1) -> List[Tuple[str, float]]:
-    await zunionstore(f"TempGiftTotal:{room_id}", [f"UserGiftProfit:{room_id}", f"UserGiftTotal:{room_id}"])
-    result = await zrangewithscoresf1(f"TempGiftTotal:{room_id}", start, end)
-    await delete(f"TempGiftTotal:{room_id}")
-    return result
+    return await zrangewithscoresf1(f"UserGiftAll:{room_id}", start, end)
 
 
 async def rev_range_user_gift_all(room_id: int, start: int = 0, end: int = -1) -> List[Tuple[str, float]]:
-    await zunionstore(f"TempGiftTotal:{room_id}", [f"UserGiftProfit:{room_id}", f"UserGiftTotal:{room_id}"])
-    result = await zrevrangewithscoresf1(f"TempGiftTotal:{room_id}", start, end)
-    await delete(f"TempGiftTotal:{room_id}")
-    return result
-
+    return await zrevrangewithscoresf1(f"UserGiftAll:{room_id}", start, end)
 
 # 房间礼物时间分布
 
@@ -747,6 +822,10 @@ async def get_room_gift_time(room_id: int) -> List[Tuple[str, float]]:
     return await hgetalltuplef1(f"RoomGiftTime:{room_id}")
 
 
+async def rank_user_gift_all(room_id: int, uid: int) -> Tuple[int, int, Optional[float]]:
+    return await zparallelrankf1(f"UserGiftAll:{room_id}", uid)
+
+
 async def incr_room_gift_time(room_id: int, timestamp: int, price: float) -> float:
     return await hincrbyfloat(f"RoomGiftTime:{room_id}", timestamp, price)
 
@@ -803,8 +882,12 @@ async def rev_range_user_sc_profit(room_id: int, start: int = 0, end: int = -1)
     return await zrevrangewithscoresi(f"UserScProfit:{room_id}", start, end)
 
 
+async def rank_user_sc_profit(room_id: int, uid: int) -> Tuple[int, int, Optional[int]]:
+    return await zparallelranki(f"UserScProfit:{room_id}", uid)
+
+
 async def incr_user_sc_profit(room_id: int, uid: int, price: int) -> float:
-    return await zincrby(f"UserScProfit:{room_id}", uid, price)
+    return await zincrbymulti([f"UserScProfit:{room_id}", f"UserScAll:{room_id}"], uid, price)
 
 
 async def delete_user_sc_profit(room_id: int):
@@ -824,29 +907,19 @@ async def accumulate_user_sc_total(room_id: int):
 # 用户总 SC 价值
 
 async def len_user_sc_all(room_id: int) -> int:
-    return len(
-        set(await zrange(f"UserScProfit:{room_id}", 0, -1))
-        .union(set(await zrange(f"UserScTotal:{room_id}", 0, -1)))
-    )
+    return await zcard(f"UserScAll:{room_id}")
 
 
 async def get_user_sc_all(room_id: int, uid: int) -> int:
-    return await get_user_sc_profit(room_id, uid) + await get_user_sc_total(room_id, uid)
+    return int(await zscore(f"UserScAll:{room_id}", uid))
 
 
 async def range_user_sc_all(room_id: int, start: int = 0, end: int = -1) -> List[Tuple[str, int]]:
-    await zunionstore(f"TempScTotal:{room_id}", [f"UserScProfit:{room_id}", f"UserScTotal:{room_id}"])
-    result = await zrangewithscoresi(f"TempScTotal:{room_id}", start, end)
-    await delete(f"TempScTotal:{room_id}")
-    return result
+    return await zrangewithscoresi(f"UserScAll:{room_id}", start, end)
 
 
 async def rev_range_user_sc_all(room_id: int, start: int = 0, end: int = -1) -> List[Tuple[str, int]]:
-    await zunionstore(f"TempScTotal:{room_id}", [f"UserScProfit:{room_id}", f"UserScTotal:{room_id}"])
-    result = await zrevrangewithscoresi(f"TempScTotal:{room_id}", start, end)
-    await delete(f"TempScTotal:{room_id}")
-    return result
-
+    return await zrevrangewithscoresi(f"UserScAll:{room_id}", start, end)
 
 # 房间 SC 时间分布
 
@@ -854,6 +927,10 @@ async def get_room_sc_time(room_id: int) -> List[Tuple[str, int]]:
     return await hgetalltuplei(f"RoomScTime:{room_id}")
 
 
+async def rank_user_sc_all(room_id: int, uid: int) -> Tuple[int, int, Optional[int]]:
+    return await zparallelranki(f"UserScAll:{room_id}", uid)
+
+
 async def incr_room_sc_time(room_id: int, timestamp: int, price: int) -> int:
     return await hincrby(f"RoomScTime:{room_id}", timestamp, price)
 
@@ -967,7 +1044,9 @@ async def rev_range_user_governor_count(room_id: int, start: int = 0, end: int =
 
 
 async def incr_user_guard_count(type_str: str, room_id: int, uid: int, month: int) -> float:
-    return await zincrby(f"User{type_str}Count:{room_id}", uid, month)
+    return await zincrbymulti(
+        [f"User{type_str}Count:{room_id}", f"User{type_str}All:{room_id}", f"UserGuardAll:{room_id}"], uid, month
+    )
 
 
 async def delete_user_guard_count(room_id: int):
@@ -999,48 +1078,31 @@ async def accumulate_user_guard_total(room_id: int):
 # 用户总大航海数量
 
 async def len_user_captain_all(room_id: int) -> int:
-    return len(
-        set(await zrange(f"UserCaptainCount:{room_id}", 0, -1))
-        .union(set(await zrange(f"UserCaptainTotal:{room_id}", 0, -1)))
-    )
+    return await zcard(f"UserCaptainAll:{room_id}")
 
 
 async def len_user_commander_all(room_id: int) -> int:
-    return len(
-        set(await zrange(f"UserCommanderCount:{room_id}", 0, -1))
-        .union(set(await zrange(f"UserCommanderTotal:{room_id}", 0, -1)))
-    )
+    return await zcard(f"UserCommanderAll:{room_id}")
 
 
 async def len_user_governor_all(room_id: int) -> int:
-    return len(
-        set(await zrange(f"UserGovernorCount:{room_id}", 0, -1))
-        .union(set(await zrange(f"UserGovernorTotal:{room_id}", 0, -1)))
-    )
+    return await zcard(f"UserGovernorAll:{room_id}")
 
 
 async def len_user_guard_all(room_id: int) -> int:
-    return len(
-        set(await zrange(f"UserCaptainCount:{room_id}", 0, -1))
-        .union(set(await zrange(f"UserCaptainTotal:{room_id}", 0, -1)))
-        .union(set(await zrange(f"UserCommanderCount:{room_id}", 0, -1)))
-        .union(set(await zrange(f"UserCommanderTotal:{room_id}", 0, -1)))
-        .union(set(await zrange(f"UserGovernorCount:{room_id}", 0, -1)))
-        .union(set(await zrange(f"UserGovernorTotal:{room_id}", 0, -1)))
-    )
+    return await zcard(f"UserGuardAll:{room_id}")
 
 
 async def get_user_captain_all(room_id: int, uid: int) -> int:
-    return await get_user_captain_count(room_id, uid) + await get_user_captain_total(room_id, uid)
+    return int(await zscore(f"UserCaptainAll:{room_id}", uid))
 
 
 async def get_user_commander_all(room_id: int, uid: int) -> int:
-    return await get_user_commander_count(room_id, uid) + await get_user_commander_total(room_id, uid)
+    return int(await zscore(f"UserCommanderAll:{room_id}", uid))
 
 
 async def get_user_governor_all(room_id: int, uid: int) -> int:
-    return await get_user_governor_count(room_id, uid) + await get_user_governor_total(room_id, uid)
-
+    return int(await zscore(f"UserGovernorAll:{room_id}", uid))
 
 # 房间大航海时间分布
 
@@ -1058,69 +1120,394 @@ async def delete_room_guard_time(room_id: int):
 
 # 累计和重置数据
 
-async def accumulate_data(room_id: int):
-    # 累计弹幕数
-    await accumulate_room_danmu_total(room_id)
-    await accumulate_user_danmu_total(room_id)
-
-    # 累计盲盒数
-    await accumulate_room_box_total(room_id)
-    await accumulate_user_box_total(room_id)
-
-    # 累计盲盒盈亏
-    await accumulate_room_box_profit_total(room_id)
-    await accumulate_user_box_profit_total(room_id)
-
-    # 累计礼物收益
-    await accumulate_room_gift_total(room_id)
-    await accumulate_user_gift_total(room_id)
+# 累计数据时需要将本场直播数据累加到累计数据中的键，格式为 (本场直播数据键, 累计数据键)
+__ACCUMULATE_HASH_KEYS = [
+    ("RoomDanmuCount", "RoomDanmuTotal"),
+    ("RoomBoxCount", "RoomBoxTotal"),
+    ("RoomScProfit", "RoomScTotal"),
+    ("RoomCaptainCount", "RoomCaptainTotal"),
+    ("RoomCommanderCount", "RoomCommanderTotal"),
+    ("RoomGovernorCount", "RoomGovernorTotal")
+]
+__ACCUMULATE_HASH_FLOAT_KEYS = [
+    ("RoomBoxProfit", "RoomBoxProfitTotal"),
+    ("RoomGiftProfit", "RoomGiftTotal")
+]
+__ACCUMULATE_ZSET_KEYS = [
+    ("UserDanmuCount:{}", "UserDanmuTotal:{}"),
+    ("UserBoxCount:{}", "UserBoxTotal:{}"),
+    ("UserBoxProfit:{}", "UserBoxProfitTotal:{}"),
+    ("UserGiftProfit:{}", "UserGiftTotal:{}"),
+    ("UserScProfit:{}", "UserScTotal:{}"),
+    ("UserCaptainCount:{}", "UserCaptainTotal:{}"),
+    ("UserCommanderCount:{}", "UserCommanderTotal:{}"),
+    ("UserGovernorCount:{}", "UserGovernorTotal:{}")
+]
+
+# 重置数据时需要清空的键
+__RESET_KEYS = [
+    "RoomDanmu:{}", "RoomDanmuWords:{}",
+    "RoomDanmuTime:{}", "RoomBoxTime:{}", "RoomGiftTime:{}", "RoomScTime:{}", "RoomGuardTime:{}",
+    "RoomBoxProfitRecord:{}"
+]
+
+# 累计和重置数据脚本，KEYS 依次为整数哈希键对、浮点数哈希键对、有序集合键对和需清空的键
+# ARGV 依次为房间号、整数哈希键对数、浮点数哈希键对数、有序集合键对数、是否累计、是否重置
+__ACCUMULATE_AND_RESET_SCRIPT = """
+local room = ARGV[1]
+local hash_count, float_count, zset_count = tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local accumulate, reset = ARGV[5] == "1", ARGV[6] == "1"
+
+local index = 1
+for _ = 1, hash_count + float_count do
+    if accumulate then
+        local value = redis.call("HGET", KEYS[index], room) or "0"
+        if index <= hash_count * 2 then
+            redis.call("HINCRBY", KEYS[index + 1], room, value)
+        else
+            redis.call("HINCRBYFLOAT", KEYS[index + 1], room, value)
+        end
+    end
+    if reset then
+        redis.call("HSET", KEYS[index], room, 0)
+    end
+    index = index + 2
+end
+
+for _ = 1, zset_count do
+    if accumulate then
+        redis.call("ZUNIONSTORE", KEYS[index + 1], 2, KEYS[index + 1], KEYS[index])
+    end
+    if reset then
+        redis.call("DEL", KEYS[index])
+    end
+    index = index + 2
+end
+
+if reset then
+    for i = index, #KEYS do
+        redis.call("DEL", KEYS[i])
+    end
+end
+"""
+
+
+def __accumulate_and_reset_args(room_id: int, accumulate: bool, reset: bool) -> Tuple[List[str], List[Any]]:
+    keys_ = []
+    for count_key, total_key in __ACCUMULATE_HASH_KEYS + __ACCUMULATE_HASH_FLOAT_KEYS:
+        keys_.extend([count_key, total_key])
+    for count_key, total_key in __ACCUMULATE_ZSET_KEYS:
+        keys_.extend([count_key.format(room_id), total_key.format(room_id)])
+    keys_.extend([key.format(room_id) for key in __RESET_KEYS])
+
+    args = [
+        room_id, len(__ACCUMULATE_HASH_KEYS), len(__ACCUMULATE_HASH_FLOAT_KEYS), len(__ACCUMULATE_ZSET_KEYS),
+        int(accumulate), int(reset)
+    ]
+    return keys_, args
 
-    # 累计 SC 收益
-    await accumulate_room_sc_total(room_id)
-    await accumulate_user_sc_total(room_id)
 
-    # 累计大航海数
-    await accumulate_room_guard_total(room_id)
-    await accumulate_user_guard_total(room_id)
+async def accumulate_data(room_id: int):
+    keys_, args = __accumulate_and_reset_args(room_id, True, False)
+    await __accumulate_and_reset_script(keys=keys_, args=args)
 
 
 async def reset_data(room_id: int):
-    # 清空弹幕记录
-    await delete_room_danmu(room_id)
-
-    # 清空数据分布
-    await delete_room_danmu_time(room_id)
-    await delete_room_box_time(room_id)
-    await delete_room_gift_time(room_id)
-    await delete_room_sc_time(room_id)
-    await delete_room_guard_time(room_id)
-
-    # 重置弹幕数
-    await reset_room_danmu_count(room_id)
-    await delete_user_danmu_count(room_id)
-
-    # 重置盲盒数
-    await reset_room_box_count(room_id)
-    await delete_user_box_count(room_id)
-
-    # 重置盲盒盈亏
-    await reset_room_box_profit(room_id)
-    await delete_user_box_profit(room_id)
-
-    # 清空盲盒盈亏记录
-    await delete_room_box_profit_record(room_id)
-
-    # 重置礼物收益
-    await reset_room_gift_profit(room_id)
-    await delete_user_gift_profit(room_id)
-
-    # 重置 SC 收益
-    await reset_room_sc_profit(room_id)
-    await delete_user_sc_profit(room_id)
-
-    # 重置大航海数
-    await reset_room_guard_count(room_id)
-    await delete_user_guard_count(room_id)
+    keys_, args = __accumulate_and_reset_args(room_id, False, True)
+    await __accumulate_and_reset_script(keys=keys_, args=args)
+
+
+async def accumulate_and_reset_data(room_id: int):
+    keys_, args = __accumulate_and_reset_args(room_id, True, True)
+    await __accumulate_and_reset_script(keys=keys_, args=args)
+
+
+async def accumulate_and_reset_data_bulk(room_ids: List[int]):
+    if not room_ids:
+        return
+    pipe = __redis.pipeline(transaction=False)
+    for room_id in room_ids:
+        keys_, args = __accumulate_and_reset_args(room_id, True, True)
+        await __accumulate_and_reset_script(keys=keys_, args=args, client=pipe)
+    await pipe.execute()
+
+
+# 用户总数据迁移
+
+# 用户总数据有序集合，格式为 (本场直播数据键, 累计数据键, 总数据键)
+__USER_ALL_KEYS = [
+    ("UserDanmuCount", "UserDanmuTotal", "UserDanmuAll"),
+    ("UserBoxCount", "UserBoxTotal", "UserBoxAll"),
+    ("UserBoxProfit", "UserBoxProfitTotal", "UserBoxProfitAll"),
+    ("UserGiftProfit", "UserGiftTotal", "UserGiftAll"),
+    ("UserScProfit", "UserScTotal", "UserScAll"),
+    ("UserCaptainCount", "UserCaptainTotal", "UserCaptainAll"),
+    ("UserCommanderCount", "UserCommanderTotal", "UserCommanderAll"),
+    ("UserGovernorCount", "UserGovernorTotal", "UserGovernorAll")
+]
+
+# 用户总大航海数据有序集合，合并后的有序集合用于统计总大航海人数
+__USER_GUARD_ALL_KEYS = ("UserCaptainAll", "UserCommanderAll", "UserGovernorAll")
+
+
+async def migrate_user_all():
+    if await exists("UserAllMigrated"):
+        return
+
+    logger.info("开始根据已有数据生成用户总数据, 仅需执行一次")
+    pipe = __redis.pipeline(transaction=False)
+    for count_key, total_key, all_key in __USER_ALL_KEYS:
+        rooms = {key.split(":")[1] for key in await keys(f"{count_key}:*") + await keys(f"{total_key}:*")}
+        for room_id in rooms:
+            pipe.zunionstore(f"{all_key}:{room_id}", [f"{count_key}:{room_id}", f"{total_key}:{room_id}"])
+    pipe.set("UserAllMigrated", 1)
+    await pipe.execute()
+    logger.success("用户总数据生成完毕")
+
+
+async def migrate_user_guard_all():
+    if await exists("UserGuardAllMigrated"):
+        return
+
+    logger.info("开始根据已有数据生成用户总大航海数据, 仅需执行一次")
+    pipe = __redis.pipeline(transaction=False)
+    rooms = {key.split(":")[1] for all_key in __USER_GUARD_ALL_KEYS for key in await keys(f"{all_key}:*")}
+    for room_id in rooms:
+        pipe.zunionstore(f"UserGuardAll:{room_id}", [f"{key}:{room_id}" for key in __USER_GUARD_ALL_KEYS])
+    pipe.set("UserGuardAllMigrated", 1)
+    await pipe.execute()
+    logger.success("用户总大航海数据生成完毕")
+
+
+# 批量写入直播统计数据
+
+def __pipe_live_stats(pipe, room_id: int, stats: "RoomStats"):
+    # 盲盒盈亏需使用写入后的结果还原盲盒盈亏记录，放在管道首位
+    if stats.box_profits:
+        pipe.hincrbyfloat("RoomBoxProfit", room_id, sum(stats.box_profits))
+
+    # 弹幕
+    if stats.danmu_count:
+        pipe.hincrby("RoomDanmuCount", room_id, stats.danmu_count)
+    for uid, count in stats.user_danmu_count.items():
+        pipe.zincrby(f"UserDanmuCount:{room_id}", count, uid)
+        pipe.zincrby(f"UserDanmuAll:{room_id}", count, uid)
+    if stats.danmu_contents:
+        pipe.rpush(f"RoomDanmu:{room_id}", *stats.danmu_contents)
+    for timestamp, count in stats.danmu_time.items():
+        pipe.hincrby(f"RoomDanmuTime:{room_id}", timestamp, count)
+
+    # 礼物
+    if stats.gift_profit:
+        pipe.hincrbyfloat("RoomGiftProfit", room_id, stats.gift_profit)
+    for uid, price in stats.user_gift_profit.items():
+        pipe.zincrby(f"UserGiftProfit:{room_id}", price, uid)
+        pipe.zincrby(f"UserGiftAll:{room_id}", price, uid)
+    for timestamp, price in stats.gift_time.items():
+        pipe.hincrbyfloat(f"RoomGiftTime:{room_id}", timestamp, price)
+
+    # 盲盒
+    if stats.box_count:
+        pipe.hincrby("RoomBoxCount", room_id, stats.box_count)
+    for uid, count in stats.user_box_count.items():
+        pipe.zincrby(f"UserBoxCount:{room_id}", count, uid)
+        pipe.zincrby(f"UserBoxAll:{room_id}", count, uid)
+    for uid, profit in stats.user_box_profit.items():
+        pipe.zincrby(f"UserBoxProfit:{room_id}", profit, uid)
+        pipe.zincrby(f"UserBoxProfitAll:{room_id}", profit, uid)
+    for timestamp, count in stats.box_time.items():
+        pipe.hincrby(f"RoomBoxTime:{room_id}", timestamp, count)
+
+    # SC（醒目留言）
+    if stats.sc_profit:
+        pipe.hincrby("RoomScProfit", room_id, stats.sc_profit)
+    for uid, price in stats.user_sc_profit.items():
+        pipe.zincrby(f"UserScProfit:{room_id}", price, uid)
+        pipe.zincrby(f"UserScAll:{room_id}", price, uid)
+    for timestamp, price in stats.sc_time.items():
+        pipe.hincrby(f"RoomScTime:{room_id}", timestamp, price)
+
+    # 大航海
+    for type_str, month in stats.guard_count.items():
+        pipe.hincrby(f"Room{type_str}Count", room_id, month)
+    for type_str, users in stats.user_guard_count.items():
+        for uid, month in users.items():
+            pipe.zincrby(f"User{type_str}Count:{room_id}", month, uid)
+            pipe.zincrby(f"User{type_str}All:{room_id}", month, uid)
+            pipe.zincrby(f"UserGuardAll:{room_id}", month, uid)
+    for timestamp, month in stats.guard_time.items():
+        pipe.hincrby(f"RoomGuardTime:{room_id}", timestamp, month)
+
+
+async def write_live_stats(room_id: int, stats: Optional["RoomStats"], reset: bool = False):
+    # 使用事务写入，写入失败时所有数据均未写入，调用方可将数据合并回缓冲中稍后重试
+    # 重置时在同一事务中累计并重置本场直播数据，写入的数据和重置之间不会插入其他数据
+    pipe = __redis.pipeline(transaction=True)
+    if stats is not None:
+        __pipe_live_stats(pipe, room_id, stats)
+    if reset:
+        keys_, args = __accumulate_and_reset_args(room_id, True, True)
+        await __accumulate_and_reset_script(keys=keys_, args=args, client=pipe)
+
+    result = await pipe.execute()
+
+    # 由写入后的盲盒盈亏倒推每次盲盒事件后的盈亏，还原盲盒盈亏记录，重置时盲盒盈亏记录已被清空，无需还原
+    if stats is not None and stats.box_profits and not reset:
+        profit = float(result[0])
+        records = []
+        for delta in reversed(stats.box_profits):
+            records.append(profit)
+            profit -= delta
+        records.reverse()
+        try:
+            await __redis.rpush(f"RoomBoxProfitRecord:{room_id}", *records)
+        except Exception as ex:
+            # 统计数据已写入，此处失败不可重试，否则会重复计入
+            logger.error(f"直播间 {room_id} 的盲盒盈亏记录写入 Redis 失败 {ex}")
+
+
+# 直播报告数据
+
+def __int_or_zero(value: Optional[bytes]) -> int:
+    return int(value) if value is not None else 0
+
+
+def __float1_or_zero(value: Optional[bytes]) -> float:
+    return float("{:.1f}".format(float(value))) if value is not None else 0.0
+
+
+def __int_or_minus(value: Optional[bytes]) -> int:
+    return int(value) if value is not None else -1
+
+
+def __hash_tuple_i(value: Dict[bytes, bytes]) -> List[Tuple[str, int]]:
+    return [(x.decode(), int(value[x])) for x in value]
+
+
+def __hash_tuple_f1(value: Dict[bytes, bytes]) -> List[Tuple[str, float]]:
+    return [(x.decode(), float("{:.1f}".format(float(value[x])))) for x in value]
+
+
+def __zset_tuple_i(value: List[Tuple[bytes, float]]) -> List[Tuple[str, int]]:
+    return [(x[0].decode(), int(x[1])) for x in value]
+
+
+def __zset_tuple_f1(value: List[Tuple[bytes, float]]) -> List[Tuple[str, float]]:
+    return [(x[0].decode(), float("{:.1f}".format(float(x[1])))) for x in value]
+
+
+def __list_f1(value: List[bytes]) -> List[float]:
+    return [float("{:.1f}".format(float(x))) for x in value]
+
+
+def __list_str(value: List[bytes]) -> List[str]:
+    return [x.decode() for x in value]
+
+
+async def get_live_report_data(room_id: int,
+                               uid: int,
+                               uname: str,
+                               rankings: Dict[str, int],
+                               danmu: bool = False,
+                               danmu_words: bool = False) -> Dict[str, Any]:
+    pipe = __redis.pipeline(transaction=False)
+    pipe.hget("StartTime", room_id).hget("EndTime", room_id).hget("RoomBoxProfit", room_id)
+    start_time, end_time, box_profit = await pipe.execute()
+    start_time = __int_or_zero(start_time)
+    end_time = __int_or_zero(end_time)
+    box_profit = __float1_or_zero(box_profit)
+
+    pipe = __redis.pipeline(transaction=False)
+    converters: List[Tuple[str, Callable[[Any], Any]]] = []
+
+    def add(name: str, converter: Callable[[Any], Any]):
+        converters.append((name, converter))
+
+    # 基础数据
+    pipe.hget(f"FansCount:{room_id}", start_time)
+    add("fans_count", __int_or_minus)
+    pipe.hget(f"FansMedalCount:{room_id}", start_time)
+    add("fans_medal_count", __int_or_minus)
+    pipe.hget(f"GuardCount:{room_id}", start_time)
+    add("guard_count", __int_or_minus)
+
+    # 盲盒盈亏记录，依次获取记录总数、添加本场记录后获取排名
+    member = f"{start_time}-{uid}-{uname}"
+    pipe.zcard("BoxProfitRecord").zadd("BoxProfitRecord", {member: box_profit}).zrank("BoxProfitRecord", member)
+    add("box_profit_record_count", int)
+    add("", lambda x: x)
+    add("box_profit_record_rank", __int_or_zero)
+
+    # 直播数据
+    pipe.hget("RoomDanmuCount", room_id)
+    add("danmu_count", __int_or_zero)
+    pipe.zcard(f"UserDanmuCount:{room_id}")
+    add("danmu_person_count", int)
+    pipe.hgetall(f"RoomDanmuTime:{room_id}")
+    add("danmu_diagram", __hash_tuple_i)
+    pipe.hget("RoomBoxCount", room_id)
+    add("box_count", __int_or_zero)
+    pipe.zcard(f"UserBoxCount:{room_id}")
+    add("box_person_count", int)
+    pipe.lrange(f"RoomBoxProfitRecord:{room_id}", 0, -1)
+    add("box_profit_diagram", __list_f1)
+    pipe.hgetall(f"RoomBoxTime:{room_id}")
+    add("box_diagram", __hash_tuple_i)
+    pipe.hget("RoomGiftProfit", room_id)
+    add("gift_profit", __float1_or_zero)
+    pipe.zcard(f"UserGiftProfit:{room_id}")
+    add("gift_person_count", int)
+    pipe.hgetall(f"RoomGiftTime:{room_id}")
+    add("gift_diagram", __hash_tuple_f1)
+    pipe.hget("RoomScProfit", room_id)
+    add("sc_profit", __int_or_zero)
+    pipe.zcard(f"UserScProfit:{room_id}")
+    add("sc_person_count", int)
+    pipe.hgetall(f"RoomScTime:{room_id}")
+    add("sc_diagram", __hash_tuple_i)
+    pipe.hget("RoomCaptainCount", room_id)
+    add("captain_count", __int_or_zero)
+    pipe.hget("RoomCommanderCount", room_id)
+    add("commander_count", __int_or_zero)
+    pipe.hget("RoomGovernorCount", room_id)
+    add("governor_count", __int_or_zero)
+    pipe.hgetall(f"RoomGuardTime:{room_id}")
+    add("guard_diagram", __hash_tuple_i)
+
+    # 排行榜
+    ranking_keys = {
+        "danmu": (f"UserDanmuCount:{room_id}", __zset_tuple_i),
+        "box": (f"UserBoxCount:{room_id}", __zset_tuple_i),
+        "box_profit": (f"UserBoxProfit:{room_id}", __zset_tuple_f1),
+        "gift": (f"UserGiftProfit:{room_id}", __zset_tuple_f1),
+        "sc": (f"UserScProfit:{room_id}", __zset_tuple_i),
+        "captain": (f"UserCaptainCount:{room_id}", __zset_tuple_i),
+        "commander": (f"UserCommanderCount:{room_id}", __zset_tuple_i),
+        "governor": (f"UserGovernorCount:{room_id}", __zset_tuple_i)
+    }
+    for name, count in rankings.items():
+        key, converter = ranking_keys[name]
+        pipe.zrevrange(key, 0, count - 1, True)
+        add(f"{name}_ranking", converter)
+
+    # 弹幕记录或弹幕词频
+    if danmu:
+        pipe.lrange(f"RoomDanmu:{room_id}", 0, -1)
+        add("all_danmu", __list_str)
+    if danmu_words:
+        words_limit = config.get("DANMU_CLOUD_WORDS_LIMIT")
+        pipe.zrevrange(f"RoomDanmuWords:{room_id}", 0, words_limit - 1 if words_limit > 0 else -1, True)
+        add("danmu_words", __zset_tuple_i)
+
+    result = {
+        "start_time": start_time,
+        "end_time": end_time,
+        "box_profit": box_profit
+    }
+    for (name, converter), value in zip(converters, await pipe.execute()):
+        if name:
+            result[name] = converter(value)
+    return result
 
 
 # 用户绑定
@@ -1199,3 +1586,16 @@ async def exists_dynamic(_id: int):
 
 async def add_dynamic(_id: int):
     await sadd("Dynamics", _id)
+
+
+# 用户资料缓存，昵称、头像地址和更新时间以 JSON 格式存储，头像图片以原始数据存储
+
+async def get_user_profiles(uids: List[Union[str, int]]) -> List[Optional[Dict[str, Any]]]:
+    if not uids:
+        return []
+    return [codec.loads(x) if x is not None else None for x in await __redis.hmget("UserProfile", uids)]
+
+
+async def set_user_profiles(profiles: Dict[Union[str, int], Dict[str, Any]]):
+    if profiles:
+        await __redis.hset("UserProfile", mapping={k: codec.dumps(v) for k, v in profiles.items()})
@@ -0,0 +1,141 @@
+"""
+图片渲染服务模块。绘图为 CPU 密集型任务，在独立进程中进行，避免绘图时阻塞事件循环导致直播间连接心跳超时
+传入的绘图函数及参数需可被序列化，绘图函数需为模块级函数或类方法
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Callable, Any, Dict
+
+from loguru import logger
+
+from . import config
+
+__executor: Optional[Executor] = None
+__semaphore: Optional[asyncio.Semaphore] = None
+__shared: Dict[str, asyncio.Future] = {}
+
+
+def __warm_up(user_config: Dict[str, Any]):
+    """
+    渲染进程初始化，同步主进程中的配置，并预先载入绘图所需的模块、字体和词典
+
+    Args:
+        user_config: 主进程中的用户自定义配置
+    """
+    config.use(**user_config)
+
+    import jieba
+    from PIL import ImageFont
+    from matplotlib import pyplot as plt
+    from ..painter import LiveReportGenerator, RankingGenerator, DynamicPicGenerator, DataCardGenerator  # noqa: F401
+
+    jieba.initialize()
+    plt.close(plt.figure())
+
+    resource_base_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "resource")
+    for font in (config.get("PAINTER_NORMAL_FONT"), config.get("PAINTER_BOLD_FONT"), config.get("DANMU_CLOUD_FONT")):
+        try:
+            ImageFont.truetype(os.path.join(resource_base_path, font), 30)
+        except OSError:
+            pass
+
+
+def __get_executor() -> Executor:
+    """
+    获取绘图执行器，首次调用时创建
+    仅在支持 fork 的系统中使用进程池，其他系统中创建新进程会重新执行启动脚本，因此使用线程池代替
+    """
+    global __executor
+    if __executor is None:
+        processes = config.get("RENDER_PROCESSES")
+        if processes > 0 and "fork" in multiprocessing.get_all_start_methods():
+            __executor = ProcessPoolExecutor(
+                processes, multiprocessing.get_context("fork"), __warm_up, (dict(config.user_config),)
+            )
+            logger.info(f"已启动 {processes} 个绘图进程")
+        else:
+            __executor = ThreadPoolExecutor(max(processes, 1), "render")
+    return __executor
+
+
+def start():
+    """
+    启动绘图执行器，需在启动事件循环和创建其他线程前调用
+    进程池在首次提交任务时才会创建绘图进程，因此此处提交一个空任务，使绘图进程在单线程时创建，避免在多线程进程中 fork 导致死锁
+    """
+    executor = __get_executor()
+    if isinstance(executor, ProcessPoolExecutor):
+        executor.submit(os.getpid).result()
+
+
+def __get_semaphore() -> asyncio.Semaphore:
+    global __semaphore
+    if __semaphore is None:
+        __semaphore = asyncio.Semaphore(config.get("RENDER_QUEUE_LIMIT"))
+    return __semaphore
+
+
+async def run(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    在绘图进程中执行绘图函数，同时等待绘制的任务数达到上限时，需等待其他任务完成后再提交
+
+    Args:
+        func: 绘图函数
+        args: 绘图函数参数
+
+    Returns:
+        绘图函数返回值
+    """
+    global __executor
+    loop = asyncio.get_running_loop()
+
+    async with __get_semaphore():
+        executor = __get_executor()
+        try:
+            return await loop.run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            # 此时已有其他线程在运行，在多线程进程中 fork 可能导致死锁，因此不再重新创建绘图进程，改为在线程中绘制
+            if __executor is executor:
+                logger.error("绘图进程异常退出, 之后将改为在线程中绘制图片, 重启 StarBot 后恢复使用绘图进程")
+                executor.shutdown(False)
+                __executor = ThreadPoolExecutor(max(config.get("RENDER_PROCESSES"), 1), "render")
+            return await loop.run_in_executor(__executor, func, *args)
+
+
+async def run_shared(key: str, func: Callable[..., Any], *args: Any) -> Any:
+    """
+    在绘图进程中执行绘图函数，键相同且同时进行的绘图任务共享同一绘图结果，仅绘制一次，绘制完成后即释放
+
+    Args:
+        key: 绘图任务的键，绘图函数及参数相同的任务需使用相同的键
+        func: 绘图函数
+        args: 绘图函数参数
+
+    Returns:
+        绘图函数返回值
+    """
+    future = __shared.get(key)
+    if future is None:
+        future = asyncio.ensure_future(run(func, *args))
+        __shared[key] = future
+
+        def on_done(_: asyncio.Future):
+            __shared.pop(key, None)
+
+        future.add_done_callback(on_done)
+
+    return await asyncio.shield(future)
+
+
+def close():
+    """
+    关闭绘图执行器
+    """
+    global __executor
+    if __executor is not None:
+        __executor.shutdown(False, cancel_futures=True)
+        __executor = None
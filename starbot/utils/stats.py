@@ -0,0 +1,289 @@
+"""
+直播间统计数据写回缓冲模块。开启后直播间事件产生的统计数据先在内存中合并，再定时或定量通过管道批量写入 Redis
+"""
+
+import asyncio
+import time
+from collections import Counter
+from typing import Optional, Dict, List
+
+from loguru import logger
+
+from . import config, redis
+
+__buffer: Dict[int, "RoomStats"] = {}
+__pending = 0
+__retry_at = 0.0
+__lock: Optional[asyncio.Lock] = None
+__flush_task: Optional[asyncio.Task] = None
+__timer_task: Optional[asyncio.Task] = None
+
+
+class RoomStats:
+    """
+    单个直播间尚未写入 Redis 的统计数据
+    """
+
+    def __init__(self):
+        # 已记录的事件数
+        self.events = 0
+
+        # 弹幕
+        self.danmu_count = 0
+        self.user_danmu_count = Counter()
+        self.danmu_contents: List[str] = []
+        self.danmu_time = Counter()
+
+        # 礼物
+        self.gift_profit = 0.0
+        self.user_gift_profit = Counter()
+        self.gift_time = Counter()
+
+        # 盲盒，盲盒盈亏按事件顺序保存，用于还原盲盒盈亏记录
+        self.box_count = 0
+        self.user_box_count = Counter()
+        self.box_profits: List[float] = []
+        self.user_box_profit = Counter()
+        self.box_time = Counter()
+
+        # SC（醒目留言）
+        self.sc_profit = 0
+        self.user_sc_profit = Counter()
+        self.sc_time = Counter()
+
+        # 大航海，键为 Captain、Commander、Governor
+        self.guard_count = Counter()
+        self.user_guard_count: Dict[str, Counter] = {}
+        self.guard_time = Counter()
+
+    def merge(self, other: "RoomStats"):
+        """
+        将晚于当前数据记录的统计数据合并到当前数据中
+
+        Args:
+            other: 要合并的统计数据
+        """
+        self.events += other.events
+
+        self.danmu_count += other.danmu_count
+        self.user_danmu_count.update(other.user_danmu_count)
+        self.danmu_contents.extend(other.danmu_contents)
+        self.danmu_time.update(other.danmu_time)
+
+        self.gift_profit += other.gift_profit
+        self.user_gift_profit.update(other.user_gift_profit)
+        self.gift_time.update(other.gift_time)
+
+        self.box_count += other.box_count
+        self.user_box_count.update(other.user_box_count)
+        self.box_profits.extend(other.box_profits)
+        self.user_box_profit.update(other.user_box_profit)
+        self.box_time.update(other.box_time)
+
+        self.sc_profit += other.sc_profit
+        self.user_sc_profit.update(other.user_sc_profit)
+        self.sc_time.update(other.sc_time)
+
+        self.guard_count.update(other.guard_count)
+        for type_str, users in other.user_guard_count.items():
+            self.user_guard_count.setdefault(type_str, Counter()).update(users)
+        self.guard_time.update(other.guard_time)
+
+
+def enabled() -> bool:
+    """
+    是否开启了统计数据写回缓冲
+    """
+    return config.get("STATS_WRITE_BEHIND")
+
+
+def __get(room_id: int) -> RoomStats:
+    stats = __buffer.get(room_id)
+    if stats is None:
+        stats = RoomStats()
+        __buffer[room_id] = stats
+    return stats
+
+
+def __count(stats: RoomStats):
+    """
+    记录一次事件，缓冲事件数达到上限时触发写入
+
+    Args:
+        stats: 记录事件的直播间统计数据
+    """
+    global __pending, __flush_task
+    stats.events += 1
+    __pending += 1
+
+    if __timer_task is None:
+        start()
+
+    # 写入失败后等待一个写入间隔再按事件数触发写入，避免 Redis 不可用时每个事件都触发一次写入
+    if __pending >= config.get("STATS_FLUSH_EVENTS") and time.monotonic() >= __retry_at \
+            and (__flush_task is None or __flush_task.done()):
+        __flush_task = asyncio.create_task(flush())
+
+
+def record_danmu(room_id: int, uid: int, timed: bool = False, content: Optional[str] = None):
+    """
+    记录弹幕事件
+
+    Args:
+        room_id: 房间号
+        uid: 发送者 UID，为 0 时不计入用户弹幕数
+        timed: 是否计入弹幕时间分布。默认：False
+        content: 需计入弹幕记录的弹幕内容，为 None 时不计入弹幕记录。默认：None
+    """
+    stats = __get(room_id)
+    stats.danmu_count += 1
+    if uid != 0:
+        stats.user_danmu_count[uid] += 1
+    if timed:
+        stats.danmu_time[int(time.time())] += 1
+    if content is not None:
+        stats.danmu_contents.append(content)
+    __count(stats)
+
+
+def record_gift(room_id: int, uid: int, price: float):
+    """
+    记录礼物事件
+
+    Args:
+        room_id: 房间号
+        uid: 赠送者 UID
+        price: 礼物价值
+    """
+    stats = __get(room_id)
+    stats.gift_profit += price
+    stats.user_gift_profit[uid] += price
+    stats.gift_time[int(time.time())] += price
+    __count(stats)
+
+
+def record_box(room_id: int, uid: int, count: int, profit: float):
+    """
+    记录盲盒事件
+
+    Args:
+        room_id: 房间号
+        uid: 赠送者 UID
+        count: 盲盒数量
+        profit: 盲盒盈亏
+    """
+    stats = __get(room_id)
+    stats.box_count += count
+    stats.user_box_count[uid] += count
+    stats.box_profits.append(profit)
+    stats.user_box_profit[uid] += profit
+    stats.box_time[int(time.time())] += 1
+    __count(stats)
+
+
+def record_sc(room_id: int, uid: int, price: int):
+    """
+    记录 SC（醒目留言）事件
+
+    Args:
+        room_id: 房间号
+        uid: 发送者 UID
+        price: SC 价值
+    """
+    stats = __get(room_id)
+    stats.sc_profit += price
+    stats.user_sc_profit[uid] += price
+    stats.sc_time[int(time.time())] += price
+    __count(stats)
+
+
+def record_guard(type_str: str, room_id: int, uid: int, month: int):
+    """
+    记录大航海事件
+
+    Args:
+        type_str: 大航海类型，可选 Captain、Commander、Governor
+        room_id: 房间号
+        uid: 开通者 UID
+        month: 开通月数
+    """
+    stats = __get(room_id)
+    stats.guard_count[type_str] += month
+    stats.user_guard_count.setdefault(type_str, Counter())[uid] += month
+    stats.guard_time[int(time.time())] += month
+    __count(stats)
+
+
+async def flush(room_id: Optional[int] = None, reset: bool = False) -> bool:
+    """
+    将缓冲中的统计数据写入 Redis
+
+    Args:
+        room_id: 仅写入指定房间号的数据，为 None 时写入全部数据。默认：None
+        reset: 是否在写入数据的同一事务中累计并重置指定房间号的本场直播数据，需同时指定房间号，未开启写回缓冲时同样生效。默认：False
+
+    Returns:
+        是否全部写入成功，写入失败时数据已放回缓冲中，且未累计和重置数据
+    """
+    global __pending, __retry_at, __lock
+    if __lock is None:
+        __lock = asyncio.Lock()
+
+    async with __lock:
+        if room_id is None:
+            rooms = list(__buffer.keys())
+        elif room_id in __buffer or reset:
+            rooms = [room_id]
+        else:
+            return True
+
+        success = True
+        for room in rooms:
+            # 写入期间产生的新事件记录在新的统计数据中，写入失败时再将两者合并
+            stats = __buffer.pop(room, None)
+            try:
+                await redis.write_live_stats(room, stats, reset)
+            except Exception as ex:
+                logger.error(f"直播间 {room} 的统计数据写入 Redis 失败, 将在下次写入时重试 {ex}")
+                success = False
+                if stats is not None:
+                    newer = __buffer.get(room)
+                    if newer is not None:
+                        stats.merge(newer)
+                    __buffer[room] = stats
+                __retry_at = time.monotonic() + config.get("STATS_FLUSH_INTERVAL") / 1000
+                continue
+            if stats is not None:
+                __pending -= stats.events
+
+        return success
+
+
+async def __timer():
+    """
+    定时写入任务
+    """
+    while True:
+        await asyncio.sleep(config.get("STATS_FLUSH_INTERVAL") / 1000)
+        if __buffer:
+            await flush()
+
+
+def start():
+    """
+    启动定时写入任务
+    """
+    global __timer_task
+    if __timer_task is None or __timer_task.done():
+        __timer_task = asyncio.create_task(__timer())
+
+
+async def close():
+    """
+    停止定时写入任务，并写入缓冲中剩余的统计数据
+    """
+    global __timer_task
+    if __timer_task is not None:
+        __timer_task.cancel()
+        __timer_task = None
+    await flush()
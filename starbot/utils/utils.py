@@ -1,20 +1,17 @@
 """
 通用工具库
 """
-import asyncio
-import bisect
 import json
 import os
 import time
-from io import BytesIO
-from typing import Tuple, List, Dict, Sized, Optional, Any, Union
+from typing import Tuple, List, Dict, Sized, Optional, Any, Union, Callable
 
 from PIL import Image, ImageDraw
 
-from . import config
+from . import config, image_cache
 from .Credential import Credential
-from .network import get_session, request
-from ..exception import ResponseCodeException
+from .network import request
+from ..exception import ResponseException
 
 
 def get_api(field: str) -> Dict:
@@ -60,12 +57,16 @@ def timestamp_format(timestamp: int, format_str: str) -> str:
     return time.strftime(format_str, time.localtime(timestamp))
 
 
-async def open_url_image(url: str) -> Optional[Image.Image]:
+async def open_url_image(url: str,
+                         variant: str = "",
+                         transform: Optional[Callable[[Image.Image], Image.Image]] = None) -> Optional[Image.Image]:
     """
-    读取网络图片
+    读取网络图片，优先使用缓存
 
     Args:
         url: 图片 URL
+        variant: 预处理方式的名称，同一图片不同预处理方式的结果分别缓存。默认：""
+        transform: 解码后的预处理函数，如缩放和裁剪为圆形，预处理结果会被缓存。默认：None
 
     Returns:
         读取到的图片，URL 为空时返回 None
@@ -73,10 +74,9 @@ async def open_url_image(url: str) -> Optional[Image.Image]:
     if not url:
         return None
 
-    response = await get_session().get(url)
-    image_data = await response.read()
-    image = Image.open(BytesIO(image_data))
-    response.close()
+    image = await image_cache.open_image(url, variant, transform)
+    if image is None:
+        raise ResponseException(f"读取图片失败: {url}")
 
     return image
 
@@ -172,7 +172,7 @@ async def get_live_info_by_uids(uids: List[int]) -> Dict[str, Any]:
 
 async def get_unames_and_faces_by_uids(uids: List[str]) -> Tuple[List[str], List[Image.Image]]:
     """
-    根据 UID 列表批量获取昵称和头像图片
+    根据 UID 列表批量获取昵称和头像图片，优先使用用户资料缓存
 
     Args:
         uids: UID 列表
@@ -180,35 +180,8 @@ async def get_unames_and_faces_by_uids(uids: List[str]) -> Tuple[List[str], List
     Returns:
         昵称列表和头像图片列表组成的元组
     """
-    resource_base_path = os.path.dirname(os.path.dirname(__file__))
-
-    async def illegal_face():
-        return Image.open(f"{resource_base_path}/resource/face.png")
-
-    infos_list = []
-    uid_lists = split_list(uids, 10)
-    for lst in uid_lists:
-        user_info_url = f"https://api.vc.bilibili.com/account/v1/user/cards?uids={','.join(lst)}"
-        try:
-            infos_list.extend(await request("GET", user_info_url, credential=get_credential()))
-        except ResponseCodeException:
-            failed_uids = []
-            failed_faces = []
-            for i in range(len(uids)):
-                failed_uids.append(f"昵称获取失败({uids[i]})")
-                failed_faces.append(await illegal_face())
-            return failed_uids, failed_faces
-    infos = dict(zip([x["mid"] for x in infos_list], infos_list))
-    unames = [infos[int(uid)]["name"] if int(uid) in infos else "" for uid in uids]
-    download_face_tasks = [
-        open_url_image(infos[int(uid)]["face"]) if int(uid) in infos else illegal_face() for uid in uids
-    ]
-    faces = list(await asyncio.gather(*download_face_tasks, return_exceptions=True))
-    for i in range(len(faces)):
-        if isinstance(faces[i], Exception):
-            faces[i] = await illegal_face()
-
-    return unames, faces
+    from . import profile
+    return await profile.get_unames_and_faces(uids)
 
 
 def remove_command_param_placeholder(param: str) -> str:
@@ -224,27 +197,6 @@ def remove_command_param_placeholder(param: str) -> str:
     return param.replace("[", "").replace("]", "").replace("［", "").replace("］", "").replace("【", "").replace("】", "")
 
 
-def get_parallel_ranking(score: Union[int, float],
-                         scores: List[Union[int, float]]) -> Tuple[int, int, Optional[Union[int, float]]]:
-    """
-    获取分数在分数列表中的排名，存在并列情况优先取高名次
-
-    Args:
-        score: 分数
-        scores: 从小到大有序分数列表
-
-    Returns:
-        名次、参与排名元素个数和距离上一名的差值组成的元组
-    """
-    index = bisect.bisect_right(scores, score)
-    total = len(scores)
-    rank = total - index + 1
-    diff = scores[index] - score if index < total else None
-    if isinstance(diff,float):
-        diff = float("{:.1f}".format(diff))
-    return rank, total, diff
-
-
 def get_ratio(count: Union[int, float], total: Union[int, float]) -> str:
     """
     获取数量在总数量中所占比例
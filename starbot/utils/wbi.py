@@ -1,10 +1,13 @@
 # https://socialsisteryi.github.io/bilibili-API-collect/docs/misc/sign/wbi.html#python
 
+import asyncio
 from functools import reduce
 from hashlib import md5
 import urllib.parse
 import time
+from typing import Optional, Tuple
 
+from starbot.utils import config
 from starbot.utils.network import request
 from starbot.utils.utils import get_credential
 
@@ -15,6 +18,10 @@ mixinKeyEncTab = [
     36, 20, 34, 44, 52
 ]
 
+__wbi_keys: Optional[Tuple[str, str]] = None
+__wbi_keys_time = 0.0
+__wbi_keys_lock: Optional[asyncio.Lock] = None
+
 
 def get_mixin_key(orig: str):
     return reduce(lambda s, i: s + orig[i], mixinKeyEncTab, '')[:32]
@@ -38,8 +45,23 @@ def enc_wbi(params: dict, img_key: str, sub_key: str):
 
 
 async def get_wbi_keys() -> tuple[str, str]:
-    """获取最新的 img_key 和 sub_key"""
-    result = await request("GET", "https://api.bilibili.com/x/web-interface/nav", credential=get_credential())
-    img_url = result['wbi_img']['img_url']
-    sub_url = result['wbi_img']['sub_url']
-    return img_url.rsplit('/', 1)[1].split('.')[0], sub_url.rsplit('/', 1)[1].split('.')[0]
+    """获取最新的 img_key 和 sub_key，缓存有效期内直接返回缓存，同时获取时仅请求一次"""
+    global __wbi_keys, __wbi_keys_time, __wbi_keys_lock
+    if __wbi_keys_lock is None:
+        __wbi_keys_lock = asyncio.Lock()
+
+    async with __wbi_keys_lock:
+        if __wbi_keys is None or time.time() - __wbi_keys_time >= config.get("WBI_KEYS_CACHE_TTL"):
+            result = await request("GET", "https://api.bilibili.com/x/web-interface/nav", credential=get_credential())
+            img_url = result['wbi_img']['img_url']
+            sub_url = result['wbi_img']['sub_url']
+            __wbi_keys = img_url.rsplit('/', 1)[1].split('.')[0], sub_url.rsplit('/', 1)[1].split('.')[0]
+            __wbi_keys_time = time.time()
+
+    return __wbi_keys
+
+
+def invalidate_wbi_keys():
+    """使缓存的 img_key 和 sub_key 失效，下次获取时重新请求"""
+    global __wbi_keys
+    __wbi_keys = None
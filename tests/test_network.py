@@ -0,0 +1,57 @@
+import asyncio
+from collections import OrderedDict
+
+import pytest
+
+from starbot.utils import config, network
+
+URL = "https://api.live.bilibili.com/live_user/v1/Master/info"
+
+
+@pytest.fixture
+def fake_request(monkeypatch):
+    """
+    替换实际发送请求的函数，按顺序返回预设结果，并记录请求次数
+    """
+    monkeypatch.setitem(config.user_config, "NETWORK_CACHE_TTL", {URL: 600})
+    monkeypatch.setattr(network, "__cache", OrderedDict())
+    monkeypatch.setattr(network, "__inflight", {})
+
+    calls = []
+    results = []
+
+    async def request(method, url, params=None, data=None, credential=None, no_csrf=False, json_body=False):
+        calls.append((method, url, params))
+        return results.pop(0)
+
+    monkeypatch.setattr(network, "__request", request)
+    return calls, results
+
+
+def test_cache_hit(fake_request):
+    calls, results = fake_request
+    results.append({"info": {"uid": 1}})
+
+    async def main():
+        first = await network.request("GET", URL, {"uid": 1})
+        second = await network.request("GET", URL, {"uid": 1})
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first == second == {"info": {"uid": 1}}
+    assert len(calls) == 1
+
+
+def test_none_not_cached(fake_request):
+    calls, results = fake_request
+    results.extend([None, {"info": {"uid": 1}}])
+
+    async def main():
+        first = await network.request("GET", URL, {"uid": 1})
+        second = await network.request("GET", URL, {"uid": 1})
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first is None
+    assert second == {"info": {"uid": 1}}
+    assert len(calls) == 2